@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import ArkaPlanIsi
+
+
+@admin.register(ArkaPlanIsi)
+class ArkaPlanIsiAdmin(admin.ModelAdmin):
+    list_display = ('id', 'tip', 'durum', 'olusturan', 'olusturma_tarihi', 'bitis_tarihi')
+    list_filter = ('durum', 'tip')
+    readonly_fields = ('baslama_tarihi', 'bitis_tarihi', 'hata_mesaji')
+    ordering = ('-olusturma_tarihi',)
@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class DownloadsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'downloads'
+    verbose_name = 'İndirmeler'
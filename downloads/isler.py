@@ -0,0 +1,69 @@
+"""
+Arka plan iş tipleri ve çalıştırıcı.
+
+IS_TIPLERI, iş tipini `(parametreler, dosya) -> dosya_adi` imzalı bir
+fonksiyona eşler; fonksiyon sonucu verilen geçici dosyaya yazar. isi_calistir
+worker süreçlerinde (downloads/management/commands/isleri_calistir.py)
+çağrılır ve sonucu ArkaPlanIsi.sonuc_dosyasi üzerinden ARKA_PLAN_DOSYA_ROOT'a
+(MEDIA_ROOT dışı, yalnızca downloads.views.is_indir ile indirilir) kaydeder.
+"""
+import tempfile
+import traceback
+
+from django.core.files import File
+
+IS_TIPLERI = {}
+
+
+def is_tipi(tip):
+    """Fonksiyonu verilen tipteki işlerin çalıştırıcısı olarak kaydet"""
+    def kaydet(fonksiyon):
+        IS_TIPLERI[tip] = fonksiyon
+        return fonksiyon
+    return kaydet
+
+
+def _excel_isi(veri_fonksiyonu):
+    def calistir(parametreler, dosya):
+        from rapor.excel import xlsx_yaz
+
+        veri = veri_fonksiyonu(parametreler)
+        xlsx_yaz(dosya, veri['sayfa_adi'], veri['basliklar'], veri['satirlar'])
+        return veri['dosya_adi']
+    return calistir
+
+
+def _rapor_aktarimlarini_kaydet():
+    from rapor.disa_aktarim import AKTARIMLAR
+
+    for tip, veri_fonksiyonu in AKTARIMLAR.items():
+        is_tipi(tip)(_excel_isi(veri_fonksiyonu))
+
+
+_rapor_aktarimlarini_kaydet()
+
+
+def isi_calistir(is_id):
+    """
+    Alınmış ('calisiyor') bir işi çalıştırıp sonucunu kaydet.
+
+    Worker süreçlerinde çalışır; hatalar işe yazılır, dışarı taşınmaz.
+    Dönüş: işin son durumu.
+    """
+    from .models import ArkaPlanIsi
+
+    isi = ArkaPlanIsi.objects.get(pk=is_id)
+    calistirici = IS_TIPLERI.get(isi.tip)
+    if calistirici is None:
+        isi.bitir(f"Bilinmeyen iş tipi: {isi.tip}")
+        return isi.durum
+
+    try:
+        with tempfile.TemporaryFile() as dosya:
+            dosya_adi = calistirici(isi.parametreler, dosya)
+            dosya.seek(0)
+            isi.sonuc_dosyasi.save(dosya_adi, File(dosya), save=False)
+        isi.bitir()
+    except Exception:
+        isi.bitir(traceback.format_exc())
+    return isi.durum
@@ -0,0 +1,105 @@
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from downloads.isler import isi_calistir
+from downloads.models import ArkaPlanIsi
+
+TEMIZLEME_ARALIGI = 3600  # Süresi dolan iş dosyaları en fazla saatte bir silinir (saniye)
+
+
+def _surec_baslat():
+    # Ctrl-C yalnızca ana süreci durdurur; çalışan iş yarıda kesilmeden biter
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # spawn ile başlayan süreçlerde (Windows) Django'nun yeniden kurulması gerekir
+    django.setup()
+
+
+def _durdur(signum, frame):
+    # SIGTERM (systemd, docker stop) Ctrl-C gibi düzenli kapanışa yönlendirilir
+    raise KeyboardInterrupt
+
+
+class Command(BaseCommand):
+    help = 'Runs queued background jobs (report exports) in a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Number of worker processes (default: 2)')
+        parser.add_argument('--tek-sefer', action='store_true', help='Exit once the queue is empty')
+        parser.add_argument('--bekleme', type=float, default=2.0, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--sifirla', action='store_true',
+                            help='Requeue jobs left running by a crashed worker before starting')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        if options['sifirla']:
+            sayi = ArkaPlanIsi.takilanlari_sifirla()
+            self.stdout.write(f'{sayi} interrupted job(s) requeued')
+
+        signal.signal(signal.SIGTERM, _durdur)
+        # Alt süreçler ebeveynin veritabanı bağlantısını paylaşmamalı
+        connections.close_all()
+        calisan = {}
+        tamamlanan = hatali = 0
+        son_temizleme = None
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_surec_baslat) as havuz:
+            try:
+                while True:
+                    if son_temizleme is None or time.monotonic() - son_temizleme >= TEMIZLEME_ARALIGI:
+                        son_temizleme = time.monotonic()
+                        silinen = ArkaPlanIsi.suresi_dolanlari_sil()
+                        if silinen:
+                            self.stdout.write(f'{silinen} expired job(s) and their files removed')
+
+                    while len(calisan) < workers:
+                        is_id = ArkaPlanIsi.siradaki_isi_al()
+                        if is_id is None:
+                            break
+                        connections.close_all()
+                        try:
+                            calisan[havuz.submit(isi_calistir, is_id)] = is_id
+                        except BrokenProcessPool:
+                            # Bir alt süreç öldürüldü (ör. bellek yetersizliği); alınan iş kuyruğa döner
+                            ArkaPlanIsi.takilanlari_sifirla([is_id])
+                            raise CommandError('A worker process died; restart the command')
+                        self.stdout.write(f'Job #{is_id} started')
+
+                    if not calisan:
+                        if options['tek_sefer']:
+                            break
+                        time.sleep(options['bekleme'])
+                        continue
+
+                    bitenler, _ = wait(calisan, timeout=options['bekleme'], return_when=FIRST_COMPLETED)
+                    for future in bitenler:
+                        is_id = calisan.pop(future)
+                        try:
+                            durum = future.result()
+                        except Exception as e:
+                            # Süreç çöktüyse (BrokenProcessPool vb.) iş hata olarak kapatılır
+                            ArkaPlanIsi.objects.get(pk=is_id).bitir(f'{type(e).__name__}: {e}')
+                            durum = 'hata'
+                        if durum == 'tamamlandi':
+                            tamamlanan += 1
+                            self.stdout.write(self.style.SUCCESS(f'Job #{is_id} finished'))
+                        else:
+                            hatali += 1
+                            self.stdout.write(self.style.ERROR(f'Job #{is_id} failed'))
+            except KeyboardInterrupt:
+                self.stdout.write(self.style.WARNING('Stopping; waiting for running jobs'))
+            finally:
+                # Havuz kapanırken yalnızca çalışan işler beklenir
+                havuz.shutdown(wait=True, cancel_futures=True)
+                if calisan:
+                    # Bitmeden kapanan (ör. süreci öldürülen) işler kuyruğa geri döner
+                    sayi = ArkaPlanIsi.takilanlari_sifirla(list(calisan.values()))
+                    if sayi:
+                        self.stdout.write(self.style.WARNING(f'{sayi} interrupted job(s) requeued'))
+
+        self.stdout.write(self.style.SUCCESS(f'{tamamlanan} job(s) finished, {hatali} failed'))
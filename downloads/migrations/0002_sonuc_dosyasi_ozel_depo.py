@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:20
+
+import os
+import uuid
+
+import downloads.models
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import migrations, models
+
+
+def dosyalari_tasi(apps, schema_editor):
+    """MEDIA_ROOT altındaki (nginx'in herkese açık sunduğu) eski sonuç dosyalarını özel depoya taşı"""
+    ArkaPlanIsi = apps.get_model('downloads', 'ArkaPlanIsi')
+    eski_depo = FileSystemStorage(location=settings.MEDIA_ROOT)
+    yeni_depo = FileSystemStorage(location=settings.ARKA_PLAN_DOSYA_ROOT)
+
+    for isi in ArkaPlanIsi.objects.exclude(sonuc_dosyasi='').only('pk', 'sonuc_dosyasi', 'olusturma_tarihi'):
+        eski_ad = isi.sonuc_dosyasi.name
+        if not eski_depo.exists(eski_ad):
+            continue
+        dosya_adi = os.path.basename(eski_ad)
+        with eski_depo.open(eski_ad, 'rb') as dosya:
+            yeni_ad = yeni_depo.save(f"{isi.olusturma_tarihi:%Y/%m}/{uuid.uuid4().hex}/{dosya_adi}", dosya)
+        ArkaPlanIsi.objects.filter(pk=isi.pk).update(sonuc_dosyasi=yeni_ad)
+        eski_depo.delete(eski_ad)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('downloads', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='arkaplanisi',
+            name='sonuc_dosyasi',
+            field=models.FileField(blank=True, max_length=255, storage=downloads.models.sonuc_deposu, upload_to=downloads.models.sonuc_yolu, verbose_name='Sonuç Dosyası'),
+        ),
+        migrations.RunPython(dosyalari_tasi, migrations.RunPython.noop),
+    ]
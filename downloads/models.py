@@ -0,0 +1,118 @@
+import os
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.utils import timezone
+
+
+def sonuc_deposu():
+    """Sonuç dosyalarının deposu: MEDIA_ROOT dışında, URL'siz (dosyalar yalnızca is_indir ile sunulur)"""
+    return FileSystemStorage(location=settings.ARKA_PLAN_DOSYA_ROOT, base_url=None)
+
+
+def sonuc_yolu(isi, dosya_adi):
+    """yyyy/mm/<rastgele>/<dosya_adi>: dosya adı tahmin edilemez, indirilen ad korunur"""
+    return f"{timezone.now():%Y/%m}/{uuid.uuid4().hex}/{dosya_adi}"
+
+
+class ArkaPlanIsi(models.Model):
+    """
+    Uzun süren rapor/dışa aktarım işleri için veritabanı tabanlı kuyruk.
+
+    View'lar işi kuyruğa ekleyip hemen döner; `isleri_calistir` komutu işleri
+    süreç havuzunda çalıştırır ve sonucu ARKA_PLAN_DOSYA_ROOT altına (MEDIA_ROOT
+    dışı) kaydeder. Biten işler ARKA_PLAN_DOSYA_SURE_GUN gün sonra dosyalarıyla
+    birlikte silinir (suresi_dolanlari_sil).
+    """
+    DURUMLAR = [
+        ('bekliyor', 'Bekliyor'),
+        ('calisiyor', 'Çalışıyor'),
+        ('tamamlandi', 'Tamamlandı'),
+        ('hata', 'Hata'),
+    ]
+
+    tip = models.CharField(max_length=50, verbose_name="İş Tipi")
+    parametreler = models.JSONField(default=dict, blank=True, verbose_name="Parametreler")
+    durum = models.CharField(max_length=20, choices=DURUMLAR, default='bekliyor', verbose_name="Durum")
+    sonuc_dosyasi = models.FileField(upload_to=sonuc_yolu, storage=sonuc_deposu, max_length=255, blank=True,
+                                     verbose_name="Sonuç Dosyası")
+    hata_mesaji = models.TextField(blank=True, verbose_name="Hata Mesajı")
+    olusturan = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, verbose_name="Oluşturan")
+    olusturma_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturma Tarihi")
+    baslama_tarihi = models.DateTimeField(null=True, blank=True, verbose_name="Başlama Tarihi")
+    bitis_tarihi = models.DateTimeField(null=True, blank=True, verbose_name="Bitiş Tarihi")
+
+    class Meta:
+        verbose_name = "Arka Plan İşi"
+        verbose_name_plural = "Arka Plan İşleri"
+        ordering = ['-olusturma_tarihi']
+        indexes = [
+            models.Index(fields=['durum', 'id'], name='arka_plan_isi_durum_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.tip} ({self.get_durum_display()})"
+
+    @classmethod
+    def kuyruga_ekle(cls, tip, parametreler=None, kullanici=None):
+        """Yeni iş oluştur; çalıştırma işi `isleri_calistir` komutuna bırakılır"""
+        return cls.objects.create(
+            tip=tip,
+            parametreler=parametreler or {},
+            olusturan=kullanici if kullanici is not None and kullanici.is_authenticated else None,
+        )
+
+    @classmethod
+    def siradaki_isi_al(cls):
+        """
+        En eski bekleyen işi 'calisiyor' olarak işaretleyip döndür, yoksa None.
+
+        Koşullu UPDATE sayesinde aynı anda çalışan birden fazla worker aynı işi alamaz.
+        """
+        while True:
+            is_id = cls.objects.filter(durum='bekliyor').order_by('id').values_list('id', flat=True).first()
+            if is_id is None:
+                return None
+            if cls.objects.filter(pk=is_id, durum='bekliyor').update(durum='calisiyor', baslama_tarihi=timezone.now()):
+                return is_id
+
+    @classmethod
+    def takilanlari_sifirla(cls, is_idleri=None):
+        """Yarıda kalan ('calisiyor') işleri yeniden kuyruğa al; is_idleri verilmezse tümünü"""
+        isler = cls.objects.filter(durum='calisiyor')
+        if is_idleri is not None:
+            isler = isler.filter(pk__in=is_idleri)
+        return isler.update(durum='bekliyor', baslama_tarihi=None)
+
+    @classmethod
+    def suresi_dolanlari_sil(cls, gun=None):
+        """ARKA_PLAN_DOSYA_SURE_GUN günden önce biten işleri sonuç dosyalarıyla sil, silinen iş sayısını döndür"""
+        gun = settings.ARKA_PLAN_DOSYA_SURE_GUN if gun is None else gun
+        isler = list(cls.objects.filter(
+            durum__in=['tamamlandi', 'hata'], bitis_tarihi__lt=timezone.now() - timedelta(days=gun)
+        ))
+        for isi in isler:
+            if isi.sonuc_dosyasi:
+                klasor = os.path.dirname(isi.sonuc_dosyasi.path)
+                isi.sonuc_dosyasi.delete(save=False)
+                try:
+                    # Dosyanın rastgele adlı klasörü de kaldırılır
+                    os.rmdir(klasor)
+                except OSError:
+                    pass
+        return cls.objects.filter(pk__in=[isi.pk for isi in isler]).delete()[0]
+
+    def bitir(self, hata_mesaji=''):
+        self.durum = 'hata' if hata_mesaji else 'tamamlandi'
+        self.hata_mesaji = hata_mesaji
+        self.bitis_tarihi = timezone.now()
+        self.save(update_fields=['durum', 'hata_mesaji', 'sonuc_dosyasi', 'bitis_tarihi'])
+
+    @property
+    def sure(self):
+        if self.baslama_tarihi and self.bitis_tarihi:
+            return self.bitis_tarihi - self.baslama_tarihi
+        return None
@@ -3,7 +3,7 @@ from . import views
 
 app_name = 'downloads'
 
-# Print Agent artık local kullanıldığı için URL'ler kaldırıldı
 urlpatterns = [
-    # Buraya ileride başka download linkleri eklenebilir
-]
\ No newline at end of file
+    path('is/<int:is_id>/', views.is_durumu, name='is_durumu'),
+    path('is/<int:is_id>/indir/', views.is_indir, name='is_indir'),
+]
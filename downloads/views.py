@@ -1,12 +1,50 @@
 """
 Download Views - NuviaButik Downloads
+
+Arka plan işlerinin (rapor dışa aktarımları) durumu ve sonuç dosyaları.
 """
 
-from django.http import HttpResponse, Http404, FileResponse
-from django.shortcuts import render
-from django.conf import settings
-import os
-from pathlib import Path
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+
+from .models import ArkaPlanIsi
+
+
+def _kullanicinin_isi(request, is_id):
+    isi = get_object_or_404(ArkaPlanIsi, pk=is_id)
+    if not request.user.is_staff and isi.olusturan_id != request.user.pk:
+        raise Http404
+    return isi
+
+
+@login_required
+def is_durumu(request, is_id):
+    """İşin durumunu JSON olarak döndür; tamamlandıysa indirme adresi de eklenir"""
+    isi = _kullanicinin_isi(request, is_id)
+    veri = {
+        'success': True,
+        'is_id': isi.pk,
+        'tip': isi.tip,
+        'durum': isi.durum,
+        'durum_adi': isi.get_durum_display(),
+    }
+    if isi.durum == 'tamamlandi' and isi.sonuc_dosyasi:
+        veri['indir_url'] = reverse('downloads:is_indir', args=[isi.pk])
+    elif isi.durum == 'hata':
+        veri['hata'] = isi.hata_mesaji.strip().splitlines()[-1] if isi.hata_mesaji.strip() else ''
+    return JsonResponse(veri)
+
 
-# Bu app artık Print Agent indirme için kullanılmıyor
-# Local Print Agent kullanıldığı için sunucu tabanlı indirme kaldırıldı
\ No newline at end of file
+@login_required
+def is_indir(request, is_id):
+    """Tamamlanmış işin sonuç dosyasını indir"""
+    isi = _kullanicinin_isi(request, is_id)
+    if isi.durum != 'tamamlandi' or not isi.sonuc_dosyasi:
+        raise Http404
+    try:
+        dosya = isi.sonuc_dosyasi.open('rb')
+    except FileNotFoundError:
+        raise Http404
+    return FileResponse(dosya, as_attachment=True, filename=isi.sonuc_dosyasi.name.rsplit('/', 1)[-1])
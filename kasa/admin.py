@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Kasa, KasaHareket, KasaVirman, KasaCikis, KasaGiris
+from .models import Kasa, KasaHareket, KasaGunlukOzet, KasaVirman, KasaCikis, KasaGiris
 
 
 @admin.register(Kasa)
@@ -18,6 +18,13 @@ class KasaHareketAdmin(admin.ModelAdmin):
     ordering = ('-tarih',)
 
 
+@admin.register(KasaGunlukOzet)
+class KasaGunlukOzetAdmin(admin.ModelAdmin):
+    list_display = ('kasa', 'tarih', 'giris', 'cikis', 'hareket_sayisi')
+    list_filter = ('kasa', 'tarih')
+    ordering = ('-tarih',)
+
+
 @admin.register(KasaVirman)
 class KasaVirmanAdmin(admin.ModelAdmin):
     list_display = ('kaynak_kasa', 'hedef_kasa', 'tutar', 'tarih', 'kullanici')
@@ -0,0 +1,85 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from kasa.models import Kasa, KasaGunlukOzet
+
+
+class Command(BaseCommand):
+    help = 'Kasa bakiyelerini ve günlük özetleri ham kasa hareketleriyle karşılaştırır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kasa', type=int, action='append', help='Yalnızca bu kasa (birden fazla verilebilir)')
+        parser.add_argument('--duzelt', action='store_true', help='Farkları hareketlerden hesaplanan değerlerle düzelt')
+
+    def handle(self, *args, **options):
+        kasa_idleri = options['kasa']
+        kasalar = Kasa.objects.all()
+        if kasa_idleri:
+            kasalar = kasalar.filter(pk__in=kasa_idleri)
+        kasalar = {kasa.pk: kasa for kasa in kasalar}
+
+        bakiye_farklari, ozet_farklari = self._farklar(kasalar)
+        for kasa, beklenen in bakiye_farklari:
+            self.stdout.write(self.style.WARNING(
+                f'{kasa.ad}: hareket bakiyesi {kasa.hareket_bakiyesi}₺, hareketlerden {beklenen}₺'
+            ))
+        for (kasa_id, tarih), beklenen, ozet in ozet_farklari:
+            mevcut = (ozet.giris, ozet.cikis, ozet.hareket_sayisi) if ozet else (Decimal('0'), Decimal('0'), 0)
+            self.stdout.write(self.style.WARNING(
+                f'{kasalar[kasa_id].ad} {tarih}: özet +{mevcut[0]}/-{mevcut[1]} ({mevcut[2]} hareket), '
+                f'hareketlerden +{beklenen[0]}/-{beklenen[1]} ({beklenen[2]} hareket)'
+            ))
+
+        if not bakiye_farklari and not ozet_farklari:
+            ozet_sayisi = KasaGunlukOzet.objects.filter(kasa_id__in=list(kasalar)).count()
+            self.stdout.write(self.style.SUCCESS(f'{len(kasalar)} kasa, {ozet_sayisi} günlük özet tutarlı'))
+            return
+
+        if not options['duzelt']:
+            self.stdout.write(self.style.ERROR(
+                f'{len(bakiye_farklari)} bakiye, {len(ozet_farklari)} günlük özet farkı bulundu (düzeltmek için --duzelt)'
+            ))
+            return
+
+        with transaction.atomic():
+            # Kasalar kilitlenir ve farklar kilit altında yeniden hesaplanır; düzeltme
+            # sırasında yazılan hareketler bakiyeyi kilit bırakılınca günceller
+            kasalar = {kasa.pk: kasa for kasa in Kasa.objects.select_for_update().filter(pk__in=list(kasalar))}
+            bakiye_farklari, ozet_farklari = self._farklar(kasalar)
+            for kasa, beklenen in bakiye_farklari:
+                Kasa.objects.filter(pk=kasa.pk).update(hareket_bakiyesi=beklenen)
+            for (kasa_id, tarih), (giris, cikis, adet), ozet in ozet_farklari:
+                if not adet:
+                    ozet.delete()
+                else:
+                    KasaGunlukOzet.objects.update_or_create(
+                        kasa_id=kasa_id, tarih=tarih,
+                        defaults={'giris': giris, 'cikis': cikis, 'hareket_sayisi': adet},
+                    )
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(bakiye_farklari)} bakiye, {len(ozet_farklari)} günlük özet düzeltildi'
+        ))
+
+    def _farklar(self, kasalar):
+        """Hareketlerden hesaplananla uyuşmayan bakiyeler [(kasa, beklenen)] ve özetler [((kasa_id, tarih), beklenen, ozet)]"""
+        beklenen_ozetler, beklenen_netler = KasaGunlukOzet.hareketlerden_hesapla(list(kasalar))
+        mevcut_ozetler = {
+            (ozet.kasa_id, ozet.tarih): ozet
+            for ozet in KasaGunlukOzet.objects.filter(kasa_id__in=list(kasalar))
+        }
+
+        bakiye_farklari = [
+            (kasa, beklenen_netler.get(kasa.pk, Decimal('0')))
+            for kasa in kasalar.values()
+            if kasa.hareket_bakiyesi != beklenen_netler.get(kasa.pk, Decimal('0'))
+        ]
+        ozet_farklari = []
+        for anahtar in sorted(set(beklenen_ozetler) | set(mevcut_ozetler), key=lambda a: (a[0], a[1])):
+            beklenen = beklenen_ozetler.get(anahtar, (Decimal('0'), Decimal('0'), 0))
+            ozet = mevcut_ozetler.get(anahtar)
+            mevcut = (ozet.giris, ozet.cikis, ozet.hareket_sayisi) if ozet else (Decimal('0'), Decimal('0'), 0)
+            if mevcut != beklenen:
+                ozet_farklari.append((anahtar, beklenen, ozet))
+        return bakiye_farklari, ozet_farklari
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:17
+
+import django.db.models.deletion
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def bakiye_ve_ozetleri_olustur(apps, schema_editor):
+    """Mevcut kasa hareketlerinden hareket bakiyelerini ve günlük özetleri doldur"""
+    Kasa = apps.get_model('kasa', 'Kasa')
+    KasaHareket = apps.get_model('kasa', 'KasaHareket')
+    KasaGunlukOzet = apps.get_model('kasa', 'KasaGunlukOzet')
+
+    satirlar = (
+        KasaHareket.objects.annotate(gun=TruncDate('tarih'))
+        .values('kasa_id', 'gun')
+        .annotate(giris=Sum('tutar', filter=Q(tip='giris')), cikis=Sum('tutar', filter=Q(tip='cikis')), adet=Count('id'))
+        .order_by()
+    )
+    ozetler = []
+    netler = {}
+    for satir in satirlar:
+        giris = satir['giris'] or Decimal('0')
+        cikis = satir['cikis'] or Decimal('0')
+        ozetler.append(KasaGunlukOzet(
+            kasa_id=satir['kasa_id'], tarih=satir['gun'], giris=giris, cikis=cikis, hareket_sayisi=satir['adet']
+        ))
+        netler[satir['kasa_id']] = netler.get(satir['kasa_id'], Decimal('0')) + giris - cikis
+    KasaGunlukOzet.objects.bulk_create(ozetler, batch_size=1000)
+    for kasa_id, net in netler.items():
+        Kasa.objects.filter(pk=kasa_id).update(hareket_bakiyesi=net)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kasa', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kasa',
+            name='hareket_bakiyesi',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=15, verbose_name='Hareket Bakiyesi'),
+        ),
+        migrations.CreateModel(
+            name='KasaGunlukOzet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tarih', models.DateField(verbose_name='Tarih')),
+                ('giris', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Toplam Giriş')),
+                ('cikis', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Toplam Çıkış')),
+                ('hareket_sayisi', models.IntegerField(default=0, verbose_name='Hareket Sayısı')),
+                ('kasa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gunluk_ozetler', to='kasa.kasa', verbose_name='Kasa')),
+            ],
+            options={
+                'verbose_name': 'Kasa Günlük Özeti',
+                'verbose_name_plural': 'Kasa Günlük Özetleri',
+                'ordering': ['-tarih', 'kasa'],
+                'unique_together': {('kasa', 'tarih')},
+            },
+        ),
+        migrations.RunPython(bakiye_ve_ozetleri_olustur, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
 from django.conf import settings
 from django.utils import timezone
 from decimal import Decimal
@@ -18,6 +19,9 @@ class Kasa(models.Model):
     tip = models.CharField(max_length=20, choices=KASA_TIPLERI, verbose_name="Kasa Tipi")
     aciklama = models.TextField(blank=True, null=True, verbose_name="Açıklama")
     baslangic_bakiye = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Başlangıç Bakiyesi")
+    # Hareketlerin net toplamı (giriş - çıkış); her hareketle birlikte güncellenir
+    hareket_bakiyesi = models.DecimalField(max_digits=15, decimal_places=2, default=0, editable=False,
+                                           verbose_name="Hareket Bakiyesi")
     aktif = models.BooleanField(default=True, verbose_name="Aktif")
     olusturma_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturma Tarihi")
     
@@ -28,19 +32,27 @@ class Kasa(models.Model):
     
     def __str__(self):
         return f"{self.ad} ({self.get_tip_display()})"
-    
+
+    def save(self, *args, **kwargs):
+        # hareket_bakiyesi yalnızca KasaHareket'in F() güncellemeleriyle değişir; mevcut kasa
+        # kaydedilirken yazılmaz, yoksa yükleme ile kayıt arasındaki hareketler kaybolur
+        if not self._state.adding and self.pk is not None:
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                update_fields = [
+                    alan.name for alan in self._meta.concrete_fields
+                    if not alan.primary_key and alan.name != 'hareket_bakiyesi'
+                ]
+            kwargs['update_fields'] = [alan for alan in update_fields if alan != 'hareket_bakiyesi']
+            super().save(*args, **kwargs)
+            self.hareket_bakiyesi = Kasa.objects.filter(pk=self.pk).values_list('hareket_bakiyesi', flat=True).get()
+            return
+        super().save(*args, **kwargs)
+
     @property
     def guncel_bakiye(self):
-        """Güncel kasa bakiyesini hesapla"""
-        toplam_giris = self.hareketler.filter(tip='giris').aggregate(
-            toplam=models.Sum('tutar')
-        )['toplam'] or Decimal('0')
-        
-        toplam_cikis = self.hareketler.filter(tip='cikis').aggregate(
-            toplam=models.Sum('tutar')
-        )['toplam'] or Decimal('0')
-        
-        return self.baslangic_bakiye + toplam_giris - toplam_cikis
+        """Güncel kasa bakiyesi (başlangıç bakiyesi + hareket bakiyesi)"""
+        return self.baslangic_bakiye + self.hareket_bakiyesi
     
     def bakiye(self):
         """Güncel kasa bakiyesini hesapla - method versiyonu"""
@@ -53,6 +65,39 @@ class Kasa(models.Model):
         return self.hareketler.filter(tarih__date=bugun)
 
 
+class KasaHareketQuerySet(models.QuerySet):
+    """
+    Toplu silme ve güncellemelerde de Kasa.hareket_bakiyesi ve KasaGunlukOzet'i
+    güncel tutar (admin "seçilenleri sil" eylemi dahil).
+    """
+    BAKIYE_ALANLARI = ('kasa_id', 'tip', 'tutar', 'tarih')
+
+    def _bakiye_degerleri(self, kilitle=False):
+        queryset = self.order_by()
+        if kilitle:
+            queryset = queryset.select_for_update()
+        return list(queryset.values('pk', *self.BAKIYE_ALANLARI))
+
+    def delete(self):
+        with transaction.atomic():
+            eskiler = self._bakiye_degerleri(kilitle=True)
+            sonuc = super().delete()
+            KasaHareket.bakiyelere_isle(eskiler, isaret=-1)
+        return sonuc
+
+    def update(self, **kwargs):
+        alanlar = {alan[:-3] if alan.endswith('_id') else alan for alan in kwargs}
+        if not alanlar & {'kasa', 'tip', 'tutar', 'tarih'}:
+            return super().update(**kwargs)
+        with transaction.atomic():
+            eskiler = self._bakiye_degerleri(kilitle=True)
+            sonuc = super().update(**kwargs)
+            yeniler = KasaHareket.objects.filter(pk__in=[eski['pk'] for eski in eskiler])._bakiye_degerleri()
+            KasaHareket.bakiyelere_isle(eskiler, isaret=-1)
+            KasaHareket.bakiyelere_isle(yeniler)
+        return sonuc
+
+
 class KasaHareket(models.Model):
     """Kasa hareketleri"""
     HAREKET_TIPLERI = [
@@ -83,6 +128,8 @@ class KasaHareket(models.Model):
     # Sistem bilgileri
     kullanici = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, verbose_name="Kullanıcı")
     tarih = models.DateTimeField(default=timezone.now, verbose_name="Tarih")
+
+    objects = KasaHareketQuerySet.as_manager()
     
     class Meta:
         verbose_name = "Kasa Hareketi"
@@ -92,6 +139,141 @@ class KasaHareket(models.Model):
     def __str__(self):
         return f"{self.kasa.ad} - {self.get_tip_display()} - {self.tutar}₺"
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            if self.pk:
+                # Düzenlenen hareketin eski etkisini geri al
+                eski = KasaHareket.objects.filter(pk=self.pk).values('kasa_id', 'tip', 'tutar', 'tarih').first()
+                if eski:
+                    KasaHareket.bakiyelere_isle([eski], isaret=-1)
+            super().save(*args, **kwargs)
+            KasaHareket.bakiyelere_isle([self])
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            KasaHareket.bakiyelere_isle([self], isaret=-1)
+            return super().delete(*args, **kwargs)
+
+    @classmethod
+    def toplu_olustur(cls, hareketler):
+        """Hareketleri bulk_create ile yaz, kasa bakiyelerini ve günlük özetleri birlikte güncelle"""
+        with transaction.atomic():
+            hareketler = cls.objects.bulk_create(hareketler)
+            cls.bakiyelere_isle(hareketler)
+        return hareketler
+
+    @classmethod
+    def bakiyelere_isle(cls, hareketler, isaret=1):
+        """
+        Hareketlerin etkisini Kasa.hareket_bakiyesi ve KasaGunlukOzet'e ekle (isaret=-1 geri alır).
+
+        hareketler: KasaHareket nesneleri veya kasa_id/tip/tutar/tarih anahtarlı sözlükler.
+        Kasa başına tek bir F() UPDATE ve gün başına tek bir özet güncellemesi yapılır.
+        """
+        netler = {}
+        gunler = {}
+        for hareket in hareketler:
+            if isinstance(hareket, dict):
+                kasa_id, tip, tutar, tarih = hareket['kasa_id'], hareket['tip'], hareket['tutar'], hareket['tarih']
+            else:
+                kasa_id, tip, tutar, tarih = hareket.kasa_id, hareket.tip, hareket.tutar, hareket.tarih
+            tutar = Decimal(str(tutar))
+            gun = timezone.localdate(tarih) if timezone.is_aware(tarih) else tarih.date()
+            ozet = gunler.setdefault((kasa_id, gun), [Decimal('0'), Decimal('0'), 0])
+            if tip == 'giris':
+                netler[kasa_id] = netler.get(kasa_id, Decimal('0')) + tutar
+                ozet[0] += tutar
+            else:
+                netler[kasa_id] = netler.get(kasa_id, Decimal('0')) - tutar
+                ozet[1] += tutar
+            ozet[2] += 1
+
+        with transaction.atomic():
+            for kasa_id, net in netler.items():
+                if net:
+                    Kasa.objects.filter(pk=kasa_id).update(hareket_bakiyesi=F('hareket_bakiyesi') + isaret * net)
+            for (kasa_id, gun), (giris, cikis, adet) in gunler.items():
+                KasaGunlukOzet.ekle(kasa_id, gun, isaret * giris, isaret * cikis, isaret * adet)
+
+
+class KasaGunlukOzet(models.Model):
+    """Kasa başına günlük giriş/çıkış toplamları (KasaHareket'ten türetilir)"""
+    kasa = models.ForeignKey(Kasa, on_delete=models.CASCADE, related_name='gunluk_ozetler', verbose_name="Kasa")
+    tarih = models.DateField(verbose_name="Tarih")
+    giris = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Toplam Giriş")
+    cikis = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Toplam Çıkış")
+    hareket_sayisi = models.IntegerField(default=0, verbose_name="Hareket Sayısı")
+
+    class Meta:
+        verbose_name = "Kasa Günlük Özeti"
+        verbose_name_plural = "Kasa Günlük Özetleri"
+        ordering = ['-tarih', 'kasa']
+        unique_together = ['kasa', 'tarih']
+
+    def __str__(self):
+        return f"{self.kasa.ad} - {self.tarih} (+{self.giris}₺ / -{self.cikis}₺)"
+
+    @property
+    def net(self):
+        return self.giris - self.cikis
+
+    @classmethod
+    def ekle(cls, kasa_id, tarih, giris, cikis, adet):
+        """Günün özetine ekle; satır yoksa oluştur"""
+        guncellenen = cls.objects.filter(kasa_id=kasa_id, tarih=tarih).update(
+            giris=F('giris') + giris, cikis=F('cikis') + cikis, hareket_sayisi=F('hareket_sayisi') + adet
+        )
+        if guncellenen:
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(kasa_id=kasa_id, tarih=tarih, giris=giris, cikis=cikis, hareket_sayisi=adet)
+        except IntegrityError:
+            # Aynı anda başka bir işlem satırı oluşturdu
+            cls.objects.filter(kasa_id=kasa_id, tarih=tarih).update(
+                giris=F('giris') + giris, cikis=F('cikis') + cikis, hareket_sayisi=F('hareket_sayisi') + adet
+            )
+
+    @classmethod
+    def gun_toplamlari(cls, tarih, kasalar=None):
+        """{kasa_id: (giris, cikis)} - verilen gün için tek sorgu"""
+        queryset = cls.objects.filter(tarih=tarih)
+        if kasalar is not None:
+            queryset = queryset.filter(kasa__in=kasalar)
+        return {kasa_id: (giris, cikis) for kasa_id, giris, cikis in queryset.values_list('kasa_id', 'giris', 'cikis')}
+
+    @classmethod
+    def hareketlerden_hesapla(cls, kasa_idleri=None):
+        """
+        Ham KasaHareket kayıtlarından özetleri ve hareket bakiyelerini hesapla (veritabanına yazmaz).
+
+        ({(kasa_id, tarih): (giris, cikis, adet)}, {kasa_id: net}) döndürür.
+        """
+        from django.db.models import Count, Q, Sum
+        from django.db.models.functions import TruncDate
+
+        queryset = KasaHareket.objects.all()
+        if kasa_idleri is not None:
+            queryset = queryset.filter(kasa_id__in=kasa_idleri)
+        satirlar = (
+            queryset.annotate(gun=TruncDate('tarih'))
+            .values('kasa_id', 'gun')
+            .annotate(
+                giris=Sum('tutar', filter=Q(tip='giris')),
+                cikis=Sum('tutar', filter=Q(tip='cikis')),
+                adet=Count('id'),
+            )
+            .order_by()
+        )
+        ozetler = {}
+        netler = {}
+        for satir in satirlar:
+            giris = satir['giris'] or Decimal('0')
+            cikis = satir['cikis'] or Decimal('0')
+            ozetler[(satir['kasa_id'], satir['gun'])] = (giris, cikis, satir['adet'])
+            netler[satir['kasa_id']] = netler.get(satir['kasa_id'], Decimal('0')) + giris - cikis
+        return ozetler, netler
+
 
 class KasaVirman(models.Model):
     """Kasalar arası virman işlemleri"""
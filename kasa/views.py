@@ -5,7 +5,7 @@ from django.http import JsonResponse
 from django.db.models import Sum, Q
 from django.utils import timezone
 from datetime import datetime, timedelta
-from .models import Kasa, KasaHareket, KasaVirman, KasaCikis, KasaGiris
+from .models import Kasa, KasaHareket, KasaGunlukOzet, KasaVirman, KasaCikis, KasaGiris
 from decimal import Decimal
 import json
 
@@ -15,19 +15,13 @@ def kasa_dashboard(request):
     """Kasa ana sayfası"""
     kasalar = Kasa.objects.filter(aktif=True).order_by('tip', 'ad')
     
-    # Her kasa için güncel bakiye ve bugünkü hareketleri hesapla
+    # Bakiye kasa kaydında tutulur, bugünkü hareketler günlük özetten tek sorguda gelir
+    bugun = timezone.localdate()
+    bugunku_toplamlar = KasaGunlukOzet.gun_toplamlari(bugun, kasalar)
+    
     kasa_bilgileri = []
     for kasa in kasalar:
-        bugun = timezone.now().date()
-        bugunki_giris = kasa.hareketler.filter(
-            tip='giris', 
-            tarih__date=bugun
-        ).aggregate(toplam=Sum('tutar'))['toplam'] or Decimal('0')
-        
-        bugunki_cikis = kasa.hareketler.filter(
-            tip='cikis', 
-            tarih__date=bugun
-        ).aggregate(toplam=Sum('tutar'))['toplam'] or Decimal('0')
+        bugunki_giris, bugunki_cikis = bugunku_toplamlar.get(kasa.pk, (Decimal('0'), Decimal('0')))
         
         kasa_bilgileri.append({
             'kasa': kasa,
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from . import oturum
 from .models import CustomUser, UserSession, UserActivityLog, UserProfile
 
 
@@ -79,6 +80,14 @@ class UserSessionAdmin(admin.ModelAdmin):
         }),
     )
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        oturum.gecersiz_kil(obj.session_key)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        oturum.gecersiz_kil(obj.session_key)
+
 
 @admin.register(UserActivityLog)
 class UserActivityLogAdmin(admin.ModelAdmin):
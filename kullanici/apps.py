@@ -5,3 +5,6 @@ class KullaniciConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'kullanici'
     verbose_name = 'Kullanıcı Yönetimi'
+
+    def ready(self):
+        from . import signals  # noqa: F401 - sinyalleri kaydet
@@ -15,6 +15,8 @@ def role_required(*roles):
     def my_view(request):
         pass
     """
+    roles = frozenset(roles)
+
     def decorator(view_func):
         @wraps(view_func)
         @login_required
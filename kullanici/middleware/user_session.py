@@ -2,26 +2,20 @@ from django.utils.deprecation import MiddlewareMixin
 from django.contrib.auth import logout
 from django.shortcuts import redirect
 from django.urls import reverse
-from django.utils import timezone
-from kullanici.models import UserSession
+from kullanici import oturum
 
 
 class UserSessionMiddleware(MiddlewareMixin):
-    """Kullanıcı oturum yönetimi middleware'i"""
+    """Kullanıcı oturum yönetimi middleware'i (geçerlilik kullanici/oturum.py ile cache'lenir)"""
     
     def process_request(self, request):
         if request.user.is_authenticated:
             session_key = request.session.session_key
             
             if session_key:
-                try:
-                    user_session = UserSession.objects.get(
-                        user=request.user,
-                        session_key=session_key,
-                        is_active=True
-                    )
-                    # Oturum hala aktif
-                except UserSession.DoesNotExist:
-                    # Oturum bulunamadı, kullanıcıyı çıkart
+                if not oturum.gecerli_mi(request):
+                    # Oturum sonlandırılmış, kullanıcıyı çıkart
                     logout(request)
                     return redirect(reverse('kullanici:login'))
+                # Oturum hala aktif
+                oturum.yenile(request)
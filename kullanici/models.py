@@ -75,43 +75,48 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return f"{self.get_full_name() or self.username} ({self.get_role_display()})"
     
+    # Rol bazlı izinler (sıralı, görüntüleme için)
+    ROLE_PERMISSIONS = {
+        'admin': (
+            'add_user', 'change_user', 'delete_user', 'view_user',
+            'add_urun', 'change_urun', 'delete_urun', 'view_urun',
+            'add_satis', 'change_satis', 'delete_satis', 'view_satis',
+            'add_musteri', 'change_musteri', 'delete_musteri', 'view_musteri',
+            'add_gider', 'change_gider', 'delete_gider', 'view_gider',
+            'view_rapor', 'view_log',
+        ),
+        'manager': (
+            'view_user',
+            'add_urun', 'change_urun', 'view_urun',
+            'add_satis', 'change_satis', 'view_satis',
+            'add_musteri', 'change_musteri', 'view_musteri',
+            'add_gider', 'change_gider', 'view_gider',
+            'view_rapor', 'view_log',
+        ),
+        'cashier': (
+            'add_satis', 'view_satis',
+            'view_urun',
+            'add_musteri', 'change_musteri', 'view_musteri',
+        ),
+        'stock_clerk': (
+            'add_urun', 'change_urun', 'view_urun',
+            'view_satis',
+        ),
+        'viewer': (
+            'view_urun', 'view_satis', 'view_musteri', 'view_rapor',
+        ),
+    }
+    # İzin kontrolleri için import sırasında bir kez derlenir
+    ROLE_PERMISSION_SETS = {role: frozenset(permissions) for role, permissions in ROLE_PERMISSIONS.items()}
+    NO_PERMISSIONS = frozenset()
+    
     def get_role_permissions(self):
-        """Rol bazlı izinleri döndürür"""
-        role_permissions = {
-            'admin': [
-                'add_user', 'change_user', 'delete_user', 'view_user',
-                'add_urun', 'change_urun', 'delete_urun', 'view_urun',
-                'add_satis', 'change_satis', 'delete_satis', 'view_satis',
-                'add_musteri', 'change_musteri', 'delete_musteri', 'view_musteri',
-                'add_gider', 'change_gider', 'delete_gider', 'view_gider',
-                'view_rapor', 'view_log',
-            ],
-            'manager': [
-                'view_user',
-                'add_urun', 'change_urun', 'view_urun',
-                'add_satis', 'change_satis', 'view_satis',
-                'add_musteri', 'change_musteri', 'view_musteri',
-                'add_gider', 'change_gider', 'view_gider',
-                'view_rapor', 'view_log',
-            ],
-            'cashier': [
-                'add_satis', 'view_satis',
-                'view_urun',
-                'add_musteri', 'change_musteri', 'view_musteri',
-            ],
-            'stock_clerk': [
-                'add_urun', 'change_urun', 'view_urun',
-                'view_satis',
-            ],
-            'viewer': [
-                'view_urun', 'view_satis', 'view_musteri', 'view_rapor',
-            ],
-        }
-        return role_permissions.get(self.role, [])
+        """Rol bazlı izinleri döndürür (değiştirilemez, her çağrıda aynı tuple)"""
+        return self.ROLE_PERMISSIONS.get(self.role, ())
     
     def has_role_permission(self, permission):
         """Kullanıcının belirli bir izni var mı kontrol eder"""
-        return permission in self.get_role_permissions()
+        return permission in self.ROLE_PERMISSION_SETS.get(self.role, self.NO_PERMISSIONS)
 
 
 class UserSession(models.Model):
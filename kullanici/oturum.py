@@ -0,0 +1,99 @@
+"""
+Oturum geçerliliği önbelleği.
+
+UserSessionMiddleware her kimlik doğrulamalı istekte oturumun UserSession
+kaydının aktif olup olmadığına bakar. Sonuç oturum anahtarı başına Django
+cache'inde CACHE_SURE saniye tutulur; barkod okutma ve arama gibi sık AJAX
+çağrıları veritabanına gitmez.
+
+- UserSession kaydı yalnızca girişte (user_logged_in sinyali, signals.py)
+  oluşturulur. Kaydı olmayan (ör. admin panelinden silinmiş) veya kapatılmış
+  oturum geçersizdir; kullanıcının çıkışı yapılır.
+- Çıkışta ve yöneticinin oturumu sonlandırmasında (sonlandir) cache kaydı
+  commit sonrası silinir. Paylaşılmayan (LocMem) cache'te diğer worker'lar
+  sonlandırmayı en geç CACHE_SURE saniye sonra görür.
+
+Oturum verisi yalnızca değiştiğinde yazılır (SESSION_SAVE_EVERY_REQUEST
+kapalı); kayan süre için oturum en fazla YENILEME_ARALIGI saniyede bir
+yenilenir (yenile).
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+CACHE_ONEK = 'oturum'
+CACHE_SURE = 60  # Geçerlilik sonucunun cache'te kalma süresi (saniye)
+YENILEME_ARALIGI = 300  # Oturum süresi en fazla bu aralıkla uzatılır (saniye)
+YENILEME_ANAHTARI = '_oturum_yenilendi'
+
+# Sonlandırılmış oturumlar cache'te bu değerle tutulur (None "cache'te yok" demek)
+GECERSIZ = 0
+
+
+def _anahtar(session_key):
+    return f'{CACHE_ONEK}:{session_key}'
+
+
+def gecerli_mi(request):
+    """
+    request.user'ın bu oturumu hâlâ geçerli mi?
+
+    Cache'te oturumun sahibi olan kullanıcı id'si (geçerli) veya GECERSIZ
+    tutulur; ıskalamada tek sorgu yapılır. Kaydı bulunmayan oturum geçersiz
+    sayılır, burada yeniden oluşturulmaz.
+    """
+    from .models import UserSession
+
+    session_key = request.session.session_key
+    deger = cache.get(_anahtar(session_key))
+    if deger is not None:
+        return deger == request.user.pk
+
+    aktif = (
+        UserSession.objects.filter(user=request.user, session_key=session_key)
+        .order_by('-is_active').values_list('is_active', flat=True).first()
+    )
+    aktif = bool(aktif)
+    cache.set(_anahtar(session_key), request.user.pk if aktif else GECERSIZ, CACHE_SURE)
+    return aktif
+
+
+def kaydet(request, user):
+    """Oturumu UserSession olarak kaydet (girişte, signals.py)"""
+    from .models import UserSession
+    from .views import get_client_ip
+
+    return UserSession.objects.create(
+        user=user,
+        session_key=request.session.session_key,
+        ip_address=get_client_ip(request) or '127.0.0.1',
+        user_agent=request.META.get('HTTP_USER_AGENT', ''),
+    )
+
+
+def gecersiz_kil(session_key):
+    """Oturumun cache kaydını (transaction varsa commit sonrası) sil"""
+    if session_key:
+        transaction.on_commit(lambda: cache.delete(_anahtar(session_key)))
+
+
+def sonlandir(session_key):
+    """Oturumun aktif UserSession kayıtlarını kapat ve cache'ten düşür, kapatılan sayısını döndür"""
+    from .models import UserSession
+
+    if not session_key:
+        return 0
+    sonlanan = UserSession.objects.filter(session_key=session_key, is_active=True).update(
+        is_active=False, logout_time=timezone.now()
+    )
+    gecersiz_kil(session_key)
+    return sonlanan
+
+
+def yenile(request):
+    """Kayan oturum süresi: oturumu en fazla YENILEME_ARALIGI saniyede bir yazdır"""
+    simdi = int(time.time())
+    if simdi - request.session.get(YENILEME_ANAHTARI, 0) >= YENILEME_ARALIGI:
+        request.session[YENILEME_ANAHTARI] = simdi
@@ -0,0 +1,11 @@
+from django.contrib.auth.signals import user_logged_in
+from django.dispatch import receiver
+
+from . import oturum
+
+
+@receiver(user_logged_in)
+def oturumu_kaydet(sender, request, user, **kwargs):
+    """Girişte oturumu UserSession olarak kaydet; UserSessionMiddleware yalnızca kayıtlı oturumları geçerli sayar"""
+    if request is not None and hasattr(request, 'session') and request.session.session_key:
+        oturum.kaydet(request, user)
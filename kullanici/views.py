@@ -11,6 +11,7 @@ from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 import json
 
+from . import oturum
 from .models import CustomUser, UserSession, UserActivityLog, UserProfile
 from .forms import (
     CustomUserCreationForm, CustomUserChangeForm, UserProfileForm,
@@ -108,20 +109,8 @@ def custom_login_view(request):
 @login_required
 def custom_logout_view(request):
     """Özelleştirilmiş çıkış görünümü"""
-    # Oturum bilgilerini güncelle
-    session_key = request.session.session_key
-    if session_key:
-        try:
-            user_session = UserSession.objects.get(
-                user=request.user,
-                session_key=session_key,
-                is_active=True
-            )
-            user_session.logout_time = timezone.now()
-            user_session.is_active = False
-            user_session.save()
-        except UserSession.DoesNotExist:
-            pass
+    # Oturum bilgilerini güncelle (geçerlilik cache'i de silinir)
+    oturum.sonlandir(request.session.session_key)
     
     # Aktiviteyi logla
     log_user_activity(request.user, 'logout', request=request)
@@ -424,6 +413,8 @@ def terminate_session(request, session_id):
     session.logout_time = timezone.now()
     session.is_active = False
     session.save()
+    # Middleware'in cache'lediği geçerlilik kaydını da düşür
+    oturum.gecersiz_kil(session.session_key)
     
     # Aktiviteyi logla
     log_user_activity(
@@ -0,0 +1,49 @@
+import time
+
+from django.db import connection
+
+from . import performans
+
+_BITTI = object()
+
+
+class PerformansMiddleware:
+    """İstek başına sorgu sayısı, veritabanı süresi, toplam süre ve yanıt boyutu ölçümü (log/performans.py)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not performans.etkin():
+            return self.get_response(request)
+
+        sayac = performans.SorguSayaci()
+        baslangic = time.perf_counter()
+        with connection.execute_wrapper(sayac):
+            response = self.get_response(request)
+        performans.server_timing_yaz(request, response, sayac, time.perf_counter() - baslangic)
+
+        if response.streaming and not response.is_async:
+            # Akış yanıtlarında sorgular ve süre içerik tüketilirken de ölçülür
+            response.streaming_content = self._olcerek_akit(
+                request, response, response.streaming_content, sayac, baslangic
+            )
+        else:
+            performans.kaydet(request, response, sayac, time.perf_counter() - baslangic)
+        return response
+
+    def _olcerek_akit(self, request, response, icerik, sayac, baslangic):
+        icerik = iter(icerik)
+        boyut = 0
+        try:
+            while True:
+                # Sarmalayıcı her parça için ayrı kurulur; parçalar arasında
+                # çalışan kod (sunucu yazması, başka sarmalayıcılar) sayılmaz
+                with connection.execute_wrapper(sayac):
+                    parca = next(icerik, _BITTI)
+                if parca is _BITTI:
+                    break
+                boyut += len(parca)
+                yield parca
+        finally:
+            performans.kaydet(request, response, sayac, time.perf_counter() - baslangic, boyut=boyut)
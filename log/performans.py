@@ -0,0 +1,150 @@
+"""
+İstek başına sorgu sayısı ve süre ölçümü.
+
+PerformansMiddleware (log/middleware.py) her isteğin view adını, SQL sorgu
+sayısını, veritabanı süresini, toplam süreyi ve yanıt boyutunu ölçer:
+
+- Sorgular connection.execute_wrapper ile sayılır; DEBUG gerekmez.
+- Son PERFORMANS_KAYIT_LIMITI istek işlem içi halka tamponda (deque), view
+  başına toplamlar ayrı bir sözlükte tutulur. Veriler worker başınadır ve
+  yeniden başlatmada sıfırlanır.
+- Server-Timing başlığı (sorgu sayısı, DB süresi) yalnızca personel
+  kullanıcılara veya settings.PERFORMANS_SERVER_TIMING açıksa herkese eklenir.
+- Akış yanıtlarında (StreamingHttpResponse, FileResponse) ölçüm içerik
+  tüketildikten sonra kaydedilir; Server-Timing başlığı ise başlıklar
+  içerikten önce gönderildiği için yalnızca view süresini gösterir.
+- settings.PERFORMANS_BUTCELERI'nde view için tanımlı sorgu/süre bütçesi
+  aşılırsa 'stoktakip.performans' logger'ına uyarı yazılır. '*' anahtarı
+  bütçesi tanımlanmamış view'lar için varsayılandır.
+"""
+import logging
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+logger = logging.getLogger('stoktakip.performans')
+
+VARSAYILAN_KAYIT_LIMITI = 500
+
+_kilit = threading.Lock()
+_son_istekler = deque(maxlen=getattr(settings, 'PERFORMANS_KAYIT_LIMITI', VARSAYILAN_KAYIT_LIMITI))
+_view_toplamlari = {}
+
+
+def etkin():
+    return getattr(settings, 'PERFORMANS_OLCUMU', True)
+
+
+def butce(view_adi):
+    """View için {'sorgu': n, 'sure_ms': n} bütçesi (tanımlı değilse '*' veya boş)"""
+    butceler = getattr(settings, 'PERFORMANS_BUTCELERI', {})
+    return butceler.get(view_adi) or butceler.get('*') or {}
+
+
+class SorguSayaci:
+    """connection.execute_wrapper ile çalıştırılan sorguları sayar ve sürelerini toplar"""
+
+    def __init__(self):
+        self.sorgu = 0
+        self.sure = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        baslangic = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sure += time.perf_counter() - baslangic
+            self.sorgu += 1
+
+
+def _yanit_boyutu(response):
+    if response.streaming:
+        uzunluk = response.get('Content-Length')
+        return int(uzunluk) if uzunluk and uzunluk.isdigit() else None
+    return len(response.content)
+
+
+def server_timing_gosterilsin(request):
+    if getattr(settings, 'PERFORMANS_SERVER_TIMING', False):
+        return True
+    kullanici = getattr(request, 'user', None)
+    return bool(kullanici and kullanici.is_staff)
+
+
+def server_timing_yaz(request, response, sayac, sure):
+    """Server-Timing başlığını yaz (yalnızca personel veya PERFORMANS_SERVER_TIMING açıksa)"""
+    if server_timing_gosterilsin(request):
+        response['Server-Timing'] = f'db;dur={sayac.sure * 1000:.1f};desc="{sayac.sorgu} queries", app;dur={sure * 1000:.1f}'
+
+
+def kaydet(request, response, sayac, sure, boyut=None):
+    """Ölçümü tampona ve view toplamlarına ekle, bütçeyi kontrol et"""
+    eslesme = getattr(request, 'resolver_match', None)
+    view_adi = (eslesme.view_name if eslesme else None) or '-'
+    db_ms, toplam_ms = sayac.sure * 1000, sure * 1000
+
+    limitler = butce(view_adi)
+    asimlar = []
+    if limitler.get('sorgu') is not None and sayac.sorgu > limitler['sorgu']:
+        asimlar.append(f"{sayac.sorgu} sorgu > {limitler['sorgu']}")
+    if limitler.get('sure_ms') is not None and toplam_ms > limitler['sure_ms']:
+        asimlar.append(f"{toplam_ms:.0f} ms > {limitler['sure_ms']} ms")
+    if asimlar:
+        logger.warning('Performans bütçesi aşıldı: %s %s (%s)', view_adi, request.path, ', '.join(asimlar))
+
+    kayit = {
+        'zaman': time.time(),
+        'view': view_adi,
+        'yol': request.path,
+        'metot': request.method,
+        'durum': response.status_code,
+        'sorgu': sayac.sorgu,
+        'db_ms': db_ms,
+        'toplam_ms': toplam_ms,
+        'boyut': _yanit_boyutu(response) if boyut is None else boyut,
+        'asim': bool(asimlar),
+    }
+    with _kilit:
+        _son_istekler.append(kayit)
+        toplam = _view_toplamlari.get(view_adi)
+        if toplam is None:
+            toplam = _view_toplamlari[view_adi] = {
+                'view': view_adi, 'istek': 0, 'sorgu': 0, 'sorgu_max': 0,
+                'db_ms': 0.0, 'toplam_ms': 0.0, 'toplam_ms_max': 0.0, 'asim': 0,
+            }
+        toplam['istek'] += 1
+        toplam['sorgu'] += sayac.sorgu
+        toplam['sorgu_max'] = max(toplam['sorgu_max'], sayac.sorgu)
+        toplam['db_ms'] += db_ms
+        toplam['toplam_ms'] += toplam_ms
+        toplam['toplam_ms_max'] = max(toplam['toplam_ms_max'], toplam_ms)
+        toplam['asim'] += bool(asimlar)
+    return kayit
+
+
+def son_istekler(limit=None):
+    """En yeniden eskiye son ölçümler"""
+    with _kilit:
+        kayitlar = list(_son_istekler)
+    kayitlar.reverse()
+    return kayitlar[:limit] if limit else kayitlar
+
+
+def view_ozetleri():
+    """View başına ortalama/en yüksek değerler ve bütçeler, toplam süreye göre azalan"""
+    with _kilit:
+        toplamlar = [dict(toplam) for toplam in _view_toplamlari.values()]
+    for toplam in toplamlar:
+        toplam['sorgu_ort'] = toplam['sorgu'] / toplam['istek']
+        toplam['db_ms_ort'] = toplam['db_ms'] / toplam['istek']
+        toplam['toplam_ms_ort'] = toplam['toplam_ms'] / toplam['istek']
+        toplam['butce'] = butce(toplam['view'])
+    return sorted(toplamlar, key=lambda toplam: toplam['toplam_ms'], reverse=True)
+
+
+def sifirla():
+    with _kilit:
+        _son_istekler.clear()
+        _view_toplamlari.clear()
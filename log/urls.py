@@ -13,6 +13,9 @@ urlpatterns = [
     path('aktivite/<int:pk>/', views.aktivite_detay, name='aktivite_detay'),
     path('hata/<int:pk>/', views.hata_detay, name='hata_detay'),
     
+    # İstek performansı (sorgu sayısı / süre)
+    path('performans/', views.performans, name='performans'),
+    
     # Log temizleme
     path('temizle/', views.log_temizle, name='log_temizle'),
 ]
@@ -1,8 +1,9 @@
-from django.shortcuts import render, get_object_or_404
+from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.paginator import Paginator
 from django.db.models import Q
+from django.http import HttpResponseForbidden
 from .models import AktiviteLog, SistemHatasi, LoginLog
 
 
@@ -209,3 +210,30 @@ def log_temizle(request):
     
     context = {'stats': stats}
     return render(request, 'log/log_temizle.html', context)
+
+
+@login_required
+def performans(request):
+    """View başına sorgu sayısı, süre ve bütçe aşımları (worker içi ölçümler, sadece yetkili personel)"""
+    from . import performans as olcum
+
+    if not request.user.is_staff:
+        return HttpResponseForbidden("Bu sayfaya erişim yetkiniz bulunmuyor.")
+
+    if request.method == 'POST' and request.POST.get('action') == 'sifirla':
+        olcum.sifirla()
+        messages.success(request, 'Performans ölçümleri sıfırlandı.')
+        return redirect('log:performans')
+
+    sadece_asim = request.GET.get('asim') == '1'
+    son_istekler = olcum.son_istekler()
+    if sadece_asim:
+        son_istekler = [kayit for kayit in son_istekler if kayit['asim']]
+
+    context = {
+        'ozetler': olcum.view_ozetleri(),
+        'son_istekler': son_istekler[:100],
+        'sadece_asim': sadece_asim,
+        'etkin': olcum.etkin(),
+    }
+    return render(request, 'log/performans.html', context)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Musteri, Tahsilat, TahsilatDetay, MusteriGruplar
+from .models import Musteri, Tahsilat, TahsilatDetay, MusteriGruplar, MusteriGunlukOzet, MusteriIstatistik
 
 
 @admin.register(Musteri)
@@ -46,6 +46,21 @@ class TahsilatAdmin(admin.ModelAdmin):
     date_hierarchy = 'tahsilat_tarihi'
 
 
+@admin.register(MusteriGunlukOzet)
+class MusteriGunlukOzetAdmin(admin.ModelAdmin):
+    list_display = ['musteri', 'tarih', 'satis_tutari', 'tahsilat_tutari']
+    list_filter = ['tarih']
+    search_fields = ['musteri__ad', 'musteri__soyad', 'musteri__telefon']
+    raw_id_fields = ['musteri']
+
+
+@admin.register(MusteriIstatistik)
+class MusteriIstatistikAdmin(admin.ModelAdmin):
+    list_display = ['musteri', 'satis_sayisi', 'toplam_satis_tutari', 'son_satis_tarihi', 'tahsilat_sayisi', 'son_tahsilat_tarihi']
+    search_fields = ['musteri__ad', 'musteri__soyad', 'musteri__telefon']
+    raw_id_fields = ['musteri']
+
+
 @admin.register(MusteriGruplar)
 class MusteriGruplarAdmin(admin.ModelAdmin):
     list_display = ['ad', 'aciklama', 'indirim_orani', 'aktif']
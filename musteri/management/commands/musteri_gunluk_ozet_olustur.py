@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from musteri.models import MusteriGunlukOzet
+
+
+class Command(BaseCommand):
+    help = 'Müşteri günlük satış/tahsilat özetlerini (MusteriGunlukOzet) satış ve tahsilat kayıtlarından yeniden oluştur'
+
+    def handle(self, *args, **options):
+        adet = MusteriGunlukOzet.yeniden_olustur()
+        self.stdout.write(self.style.SUCCESS(f'{adet} günlük özet yeniden oluşturuldu'))
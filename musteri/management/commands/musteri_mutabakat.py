@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from musteri.models import Musteri, MusteriIstatistik
+
+
+class Command(BaseCommand):
+    help = 'Müşteri istatistiklerini ve açık hesap bakiyelerini satış, ödeme ve tahsilat kayıtlarıyla karşılaştırır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--musteri', type=int, action='append', help='Yalnızca bu müşteri (birden fazla verilebilir)')
+        parser.add_argument('--duzelt', action='store_true', help='İstatistik farklarını kayıtlardan yeniden hesapla (bakiyeler yalnızca raporlanır)')
+
+    def handle(self, *args, **options):
+        musteri_idleri = options['musteri']
+        istatistik_farklari = MusteriIstatistik.farklar(musteri_idleri)
+        bakiye_farklari = MusteriIstatistik.bakiye_farklari(musteri_idleri)
+        isimler = {
+            musteri.pk: str(musteri)
+            for musteri in Musteri.objects.filter(
+                pk__in={fark[0] for fark in istatistik_farklari} | {fark[0] for fark in bakiye_farklari}
+            )
+        }
+
+        for musteri_id, alan, kayitli, hesaplanan in istatistik_farklari:
+            self.stdout.write(self.style.WARNING(
+                f'{isimler.get(musteri_id, musteri_id)} {alan}: kayıtlı {kayitli}, kayıtlardan {hesaplanan}'
+            ))
+        for musteri_id, kayitli, hesaplanan in bakiye_farklari:
+            self.stdout.write(self.style.WARNING(
+                f'{isimler[musteri_id]}: açık hesap bakiyesi {kayitli}₺, satış ödemeleri ve tahsilatlardan {hesaplanan}₺'
+            ))
+
+        if not istatistik_farklari and not bakiye_farklari:
+            self.stdout.write(self.style.SUCCESS('Müşteri istatistikleri ve açık hesap bakiyeleri tutarlı'))
+            return
+
+        farkli_musteriler = sorted({musteri_id for musteri_id, *_ in istatistik_farklari})
+        if bakiye_farklari:
+            # Hesaplanan bakiye yalnızca satış ödemeleri ve tahsilatlardan gelir; elle girilen
+            # borç/alacak ve düzeltme hareketlerini içermez, bu yüzden otomatik yazılmaz
+            self.stdout.write(self.style.ERROR(
+                f'{len(bakiye_farklari)} müşteride açık hesap bakiyesi farkı bulundu; '
+                f'borç-alacak hareketleri incelenip elle düzeltilmelidir'
+            ))
+        if not farkli_musteriler:
+            return
+        if not options['duzelt']:
+            self.stdout.write(self.style.ERROR(
+                f'{len(farkli_musteriler)} müşteride istatistik farkı bulundu (düzeltmek için --duzelt)'
+            ))
+            return
+
+        with transaction.atomic():
+            MusteriIstatistik.yeniden_olustur(farkli_musteriler)
+        self.stdout.write(self.style.SUCCESS(f'{len(farkli_musteriler)} müşteride istatistik düzeltildi'))
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:46
+
+import django.db.models.deletion
+from django.conf import settings
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+
+
+def gunluk_ozetleri_olustur(apps, schema_editor):
+    """Mevcut tamamlanmış satışlar ve tahsilatlardan müşteri günlük özetlerini doldur"""
+    Satis = apps.get_model('satis', 'Satis')
+    Tahsilat = apps.get_model('musteri', 'Tahsilat')
+    MusteriGunlukOzet = apps.get_model('musteri', 'MusteriGunlukOzet')
+
+    kaynaklar = (
+        (Satis.objects.filter(durum='tamamlandi', musteri__isnull=False, satis_tarihi__isnull=False),
+         'satis_tarihi', 'toplam_tutar', 0),
+        (Tahsilat.objects.filter(durum='tahsil_edildi'), 'tahsilat_tarihi', 'tutar', 1),
+    )
+    ozetler = {}
+    for queryset, tarih_alani, tutar_alani, sira in kaynaklar:
+        satirlar = (
+            queryset.annotate(gun=TruncDate(tarih_alani))
+            .values('musteri_id', 'gun').annotate(toplam=Sum(tutar_alani)).order_by()
+        )
+        for satir in satirlar.iterator(chunk_size=2000):
+            ozet = ozetler.setdefault((satir['musteri_id'], satir['gun']), [Decimal('0'), Decimal('0')])
+            ozet[sira] += satir['toplam'] or 0
+    MusteriGunlukOzet.objects.bulk_create(
+        (
+            MusteriGunlukOzet(musteri_id=musteri_id, tarih=tarih, satis_tutari=satis, tahsilat_tutari=tahsilat)
+            for (musteri_id, tarih), (satis, tahsilat) in ozetler.items()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('musteri', '0002_tahsilat_taksit_sayisi'),
+        ('satis', '0010_satis_liste_indeksi'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MusteriGunlukOzet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tarih', models.DateField(verbose_name='Tarih')),
+                ('satis_tutari', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Satış Tutarı')),
+                ('tahsilat_tutari', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Tahsilat Tutarı')),
+            ],
+            options={
+                'verbose_name': 'Müşteri Günlük Özeti',
+                'verbose_name_plural': 'Müşteri Günlük Özetleri',
+                'ordering': ['-tarih', 'musteri'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='tahsilat',
+            index=models.Index(fields=['musteri', 'tahsilat_tarihi'], name='musteri_tah_musteri_d9f1d1_idx'),
+        ),
+        migrations.AddField(
+            model_name='musterigunlukozet',
+            name='musteri',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gunluk_ozetler', to='musteri.musteri', verbose_name='Müşteri'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='musterigunlukozet',
+            unique_together={('musteri', 'tarih')},
+        ),
+        migrations.RunPython(gunluk_ozetleri_olustur, migrations.RunPython.noop),
+    ]
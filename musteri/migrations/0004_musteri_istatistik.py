@@ -0,0 +1,63 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum
+
+
+def istatistikleri_olustur(apps, schema_editor):
+    """Mevcut tamamlanmış satışlar ve tahsilatlardan müşteri istatistiklerini doldur"""
+    Satis = apps.get_model('satis', 'Satis')
+    Tahsilat = apps.get_model('musteri', 'Tahsilat')
+    MusteriIstatistik = apps.get_model('musteri', 'MusteriIstatistik')
+
+    kaynaklar = (
+        ('satis', Satis.objects.filter(durum='tamamlandi', musteri__isnull=False, satis_tarihi__isnull=False),
+         'satis_tarihi', 'toplam_tutar'),
+        ('tahsilat', Tahsilat.objects.filter(durum='tahsil_edildi', tahsilat_tarihi__isnull=False),
+         'tahsilat_tarihi', 'tutar'),
+    )
+    istatistikler = {}
+    for tur, queryset, tarih_alani, tutar_alani in kaynaklar:
+        satirlar = (
+            queryset.values('musteri_id')
+            .annotate(sayi=Count('pk'), toplam=Sum(tutar_alani), son=Max(tarih_alani)).order_by()
+        )
+        for satir in satirlar.iterator(chunk_size=2000):
+            istatistikler.setdefault(satir['musteri_id'], {}).update({
+                f'{tur}_sayisi': satir['sayi'],
+                f'toplam_{tur}_tutari': satir['toplam'] or 0,
+                f'son_{tur}_tarihi': satir['son'],
+            })
+    MusteriIstatistik.objects.bulk_create(
+        (MusteriIstatistik(musteri_id=musteri_id, **degerler) for musteri_id, degerler in istatistikler.items()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('musteri', '0003_musteri_gunluk_ozet'),
+        ('satis', '0011_satis_musteri_indeksi'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MusteriIstatistik',
+            fields=[
+                ('musteri', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='istatistik', serialize=False, to='musteri.musteri', verbose_name='Müşteri')),
+                ('satis_sayisi', models.IntegerField(default=0, verbose_name='Satış Sayısı')),
+                ('toplam_satis_tutari', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Toplam Satış Tutarı')),
+                ('son_satis_tarihi', models.DateTimeField(blank=True, null=True, verbose_name='Son Satış Tarihi')),
+                ('tahsilat_sayisi', models.IntegerField(default=0, verbose_name='Tahsilat Sayısı')),
+                ('toplam_tahsilat_tutari', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Toplam Tahsilat Tutarı')),
+                ('son_tahsilat_tarihi', models.DateTimeField(blank=True, null=True, verbose_name='Son Tahsilat Tarihi')),
+            ],
+            options={
+                'verbose_name': 'Müşteri İstatistiği',
+                'verbose_name_plural': 'Müşteri İstatistikleri',
+            },
+        ),
+        migrations.RunPython(istatistikleri_olustur, migrations.RunPython.noop),
+    ]
@@ -79,25 +79,28 @@ class Musteri(models.Model):
             adres_parts.append(self.posta_kodu)
         return ", ".join(adres_parts)
 
+    @property
+    def _istatistik(self):
+        """Kayıtlı istatistik satırı; müşterinin henüz işlemi yoksa boş (kaydedilmemiş) satır"""
+        try:
+            return self.istatistik
+        except MusteriIstatistik.DoesNotExist:
+            return MusteriIstatistik(musteri=self)
+
     @property
     def toplam_satis_tutari(self):
         """Bu müşterinin toplam satış tutarı"""
-        from satis.models import Satis
-        satislar = Satis.objects.filter(musteri=self, durum='tamamlandi')
-        return sum([satis.toplam_tutar for satis in satislar])
+        return self._istatistik.toplam_satis_tutari
 
     @property
     def satis_sayisi(self):
         """Bu müşterinin toplam satış sayısı"""
-        from satis.models import Satis
-        return Satis.objects.filter(musteri=self, durum='tamamlandi').count()
+        return self._istatistik.satis_sayisi
 
     @property
     def son_satis_tarihi(self):
         """Son satış tarihi"""
-        from satis.models import Satis
-        son_satis = Satis.objects.filter(musteri=self, durum='tamamlandi').first()
-        return son_satis.satis_tarihi if son_satis else None
+        return self._istatistik.son_satis_tarihi
     
     @property 
     def toplam_borc(self):
@@ -107,24 +110,18 @@ class Musteri(models.Model):
     @property
     def veresiye_satislar(self):
         """Ödenmemiş veresiye satışları"""
+        from django.db.models import Exists, OuterRef
         from satis.models import Satis, Odeme
-        
-        # Açık hesap ödemesi olan satışları bul
-        acik_hesap_satis_ids = Odeme.objects.filter(
-            odeme_tipi='acik_hesap'
-        ).values_list('satis_id', flat=True)
-        
-        return Satis.objects.filter(
-            id__in=acik_hesap_satis_ids,
-            musteri=self,
-            durum='tamamlandi'
+
+        # Yalnızca bu müşterinin satışlarında açık hesap ödemesi aranır
+        return Satis.objects.filter(musteri=self, durum='tamamlandi').filter(
+            Exists(Odeme.objects.filter(satis=OuterRef('pk'), odeme_tipi='acik_hesap'))
         )
     
     @property
     def son_tahsilat_tarihi(self):
         """Son tahsilat tarihi"""
-        son_tahsilat = self.tahsilat_set.filter(durum='tahsil_edildi').first()
-        return son_tahsilat.tahsilat_tarihi if son_tahsilat else None
+        return self._istatistik.son_tahsilat_tarihi
     
     def borc_hareket_ekle(self, tutar, aciklama, satis_id=None, user=None):
         """Borç hareketi ekle"""
@@ -245,6 +242,9 @@ class Tahsilat(models.Model):
         verbose_name = "Tahsilat"
         verbose_name_plural = "Tahsilatlar"
         ordering = ['-tahsilat_tarihi']
+        indexes = [
+            models.Index(fields=['musteri', 'tahsilat_tarihi']),
+        ]
     
     def __str__(self):
         return f"{self.tahsilat_no} - {self.musteri} - {self.tutar}₺"
@@ -262,7 +262,25 @@ class Tahsilat(models.Model):
             self.musteri.acik_hesap_bakiye -= self.tutar
             self.musteri.save()
         
-        super().save(*args, **kwargs)
+        from django.db import transaction
+
+        with transaction.atomic():
+            eski = None
+            if self.pk:
+                eski = Tahsilat.objects.filter(pk=self.pk).values(
+                    'musteri_id', 'durum', 'tutar', 'tahsilat_tarihi').first()
+            super().save(*args, **kwargs)
+            MusteriGunlukOzet.tahsilat_degisti(eski, self)
+            MusteriIstatistik.tahsilat_degisti(eski, self)
+
+    def delete(self, *args, **kwargs):
+        from django.db import transaction
+
+        with transaction.atomic():
+            MusteriGunlukOzet.tahsilat_degisti(self, None)
+            sonuc = super().delete(*args, **kwargs)
+            MusteriIstatistik.tahsilat_degisti(self, None)
+            return sonuc
 
 
 class TahsilatDetay(models.Model):
@@ -313,3 +331,337 @@ class BorcAlacakHareket(models.Model):
     
     def __str__(self):
         return f"{self.musteri} - {self.get_hareket_tipi_display()} - {self.tutar}₺"
+
+
+def _katki(kayit, durum, tutar_alani, tarih_alani):
+    """Satış/tahsilat kaydının (nesne veya values() sözlüğü) özetlere katkısı: (musteri_id, tarih, tutar) veya None"""
+    if kayit is None:
+        return None
+    if not isinstance(kayit, dict):
+        kayit = {alan: getattr(kayit, alan) for alan in ('musteri_id', 'durum', tutar_alani, tarih_alani)}
+    if kayit['musteri_id'] is None or kayit['durum'] != durum or kayit[tarih_alani] is None:
+        return None
+    return kayit['musteri_id'], kayit[tarih_alani], kayit[tutar_alani]
+
+
+class MusteriGunlukOzet(models.Model):
+    """
+    Müşteri başına günlük tamamlanmış satış ve tahsilat toplamları.
+
+    Satis ve Tahsilat kayıt/silme işlemlerinde güncellenir; borç-alacak
+    listesindeki son 30 gün tutarları müşteri başına en fazla 31 satırdan
+    okunabilir (settings.MUSTERI_GUNLUK_OZET). bulk_create/update() ile yazılan
+    kayıtlar özeti güncellemez; musteri_gunluk_ozet_olustur ile yeniden hesaplanır.
+    """
+    musteri = models.ForeignKey(Musteri, on_delete=models.CASCADE, related_name='gunluk_ozetler', verbose_name="Müşteri")
+    tarih = models.DateField(verbose_name="Tarih")
+    satis_tutari = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Satış Tutarı")
+    tahsilat_tutari = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Tahsilat Tutarı")
+
+    class Meta:
+        verbose_name = "Müşteri Günlük Özeti"
+        verbose_name_plural = "Müşteri Günlük Özetleri"
+        ordering = ['-tarih', 'musteri']
+        unique_together = ['musteri', 'tarih']
+
+    def __str__(self):
+        return f"{self.musteri} - {self.tarih} (satış {self.satis_tutari}₺ / tahsilat {self.tahsilat_tutari}₺)"
+
+    @classmethod
+    def ekle(cls, musteri_id, tarih, satis_tutari=0, tahsilat_tutari=0):
+        """Günün özetine ekle; satır yoksa oluştur"""
+        from django.db import IntegrityError, transaction
+        from django.db.models import F
+
+        degisim = {'satis_tutari': F('satis_tutari') + satis_tutari, 'tahsilat_tutari': F('tahsilat_tutari') + tahsilat_tutari}
+        if cls.objects.filter(musteri_id=musteri_id, tarih=tarih).update(**degisim):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(musteri_id=musteri_id, tarih=tarih, satis_tutari=satis_tutari, tahsilat_tutari=tahsilat_tutari)
+        except IntegrityError:
+            # Aynı anda başka bir işlem satırı oluşturdu
+            cls.objects.filter(musteri_id=musteri_id, tarih=tarih).update(**degisim)
+
+    @staticmethod
+    def _gun(tarih):
+        return timezone.localdate(tarih) if timezone.is_aware(tarih) else tarih.date()
+
+    @classmethod
+    def _degisti(cls, eski, yeni, alan):
+        if eski is not None:
+            eski = (eski[0], cls._gun(eski[1]), eski[2])
+        if yeni is not None:
+            yeni = (yeni[0], cls._gun(yeni[1]), yeni[2])
+        if eski == yeni:
+            return
+        if eski is not None:
+            cls.ekle(eski[0], eski[1], **{alan: -eski[2]})
+        if yeni is not None:
+            cls.ekle(yeni[0], yeni[1], **{alan: yeni[2]})
+
+    @classmethod
+    def satis_degisti(cls, eski, yeni):
+        """Satışın eski ve yeni halinin (None: yok) farkını özete işle"""
+        cls._degisti(
+            _katki(eski, 'tamamlandi', 'toplam_tutar', 'satis_tarihi'),
+            _katki(yeni, 'tamamlandi', 'toplam_tutar', 'satis_tarihi'),
+            'satis_tutari',
+        )
+
+    @classmethod
+    def tahsilat_degisti(cls, eski, yeni):
+        """Tahsilatın eski ve yeni halinin (None: yok) farkını özete işle"""
+        cls._degisti(
+            _katki(eski, 'tahsil_edildi', 'tutar', 'tahsilat_tarihi'),
+            _katki(yeni, 'tahsil_edildi', 'tutar', 'tahsilat_tarihi'),
+            'tahsilat_tutari',
+        )
+
+    @classmethod
+    def kayitlardan_hesapla(cls, musteri_idleri=None):
+        """Satis ve Tahsilat kayıtlarından özetleri hesapla (veritabanına yazmaz): {(musteri_id, tarih): [satis, tahsilat]}"""
+        from decimal import Decimal
+
+        from django.db.models import Sum
+        from django.db.models.functions import TruncDate
+        from satis.models import Satis
+
+        kaynaklar = (
+            (Satis.objects.filter(durum='tamamlandi', musteri__isnull=False, satis_tarihi__isnull=False),
+             'satis_tarihi', 'toplam_tutar', 0),
+            (Tahsilat.objects.filter(durum='tahsil_edildi'), 'tahsilat_tarihi', 'tutar', 1),
+        )
+        ozetler = {}
+        for queryset, tarih_alani, tutar_alani, sira in kaynaklar:
+            if musteri_idleri is not None:
+                queryset = queryset.filter(musteri_id__in=musteri_idleri)
+            satirlar = (
+                queryset.annotate(gun=TruncDate(tarih_alani))
+                .values('musteri_id', 'gun').annotate(toplam=Sum(tutar_alani)).order_by()
+            )
+            for satir in satirlar.iterator(chunk_size=2000):
+                ozet = ozetler.setdefault((satir['musteri_id'], satir['gun']), [Decimal('0'), Decimal('0')])
+                ozet[sira] += satir['toplam'] or 0
+        return ozetler
+
+    @classmethod
+    def yeniden_olustur(cls, musteri_idleri=None):
+        """Özetleri kayıtlardan yeniden yaz, yazılan satır sayısını döndür"""
+        from django.db import transaction
+
+        ozetler = cls.kayitlardan_hesapla(musteri_idleri)
+        with transaction.atomic():
+            eskiler = cls.objects.all()
+            if musteri_idleri is not None:
+                eskiler = eskiler.filter(musteri_id__in=musteri_idleri)
+            eskiler.delete()
+            cls.objects.bulk_create(
+                [
+                    cls(musteri_id=musteri_id, tarih=tarih, satis_tutari=satis, tahsilat_tutari=tahsilat)
+                    for (musteri_id, tarih), (satis, tahsilat) in ozetler.items()
+                ],
+                batch_size=1000,
+            )
+        return len(ozetler)
+
+
+class MusteriIstatistik(models.Model):
+    """
+    Müşterinin tüm zamanlara ait satış ve tahsilat istatistikleri.
+
+    Musteri.toplam_satis_tutari, satis_sayisi, son_satis_tarihi ve
+    son_tahsilat_tarihi buradan okunur; listelerde select_related('istatistik')
+    ile satır başına sorgu gerekmez. Satis ve Tahsilat kayıt/silme işlemlerinde
+    (satış, iptal, iade, tahsilat) artımlı güncellenir. bulk_create/update() ile
+    yazılan kayıtlar güncellemez; musteri_mutabakat ile kayıtlarla
+    karşılaştırılır ve (--duzelt) yeniden hesaplanır.
+    """
+    # Tür -> (kaynak model, sayılan durum, tutar alanı, tarih alanı)
+    TURLER = {
+        'satis': ('satis.Satis', 'tamamlandi', 'toplam_tutar', 'satis_tarihi'),
+        'tahsilat': ('musteri.Tahsilat', 'tahsil_edildi', 'tutar', 'tahsilat_tarihi'),
+    }
+    ALANLAR = (
+        'satis_sayisi', 'toplam_satis_tutari', 'son_satis_tarihi',
+        'tahsilat_sayisi', 'toplam_tahsilat_tutari', 'son_tahsilat_tarihi',
+    )
+
+    musteri = models.OneToOneField(Musteri, on_delete=models.CASCADE, primary_key=True, related_name='istatistik', verbose_name="Müşteri")
+    satis_sayisi = models.IntegerField(default=0, verbose_name="Satış Sayısı")
+    toplam_satis_tutari = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Toplam Satış Tutarı")
+    son_satis_tarihi = models.DateTimeField(null=True, blank=True, verbose_name="Son Satış Tarihi")
+    tahsilat_sayisi = models.IntegerField(default=0, verbose_name="Tahsilat Sayısı")
+    toplam_tahsilat_tutari = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Toplam Tahsilat Tutarı")
+    son_tahsilat_tarihi = models.DateTimeField(null=True, blank=True, verbose_name="Son Tahsilat Tarihi")
+
+    class Meta:
+        verbose_name = "Müşteri İstatistiği"
+        verbose_name_plural = "Müşteri İstatistikleri"
+
+    def __str__(self):
+        return f"{self.musteri} - {self.satis_sayisi} satış / {self.toplam_satis_tutari}₺"
+
+    @classmethod
+    def _kaynak(cls, tur):
+        """Türün sayıldığı kayıtlar, tutar alanı ve tarih alanı"""
+        from django.apps import apps
+
+        model, durum, tutar_alani, tarih_alani = cls.TURLER[tur]
+        kayitlar = apps.get_model(model).objects.filter(
+            durum=durum, musteri__isnull=False, **{f'{tarih_alani}__isnull': False}
+        )
+        return kayitlar, tutar_alani, tarih_alani
+
+    @classmethod
+    def _isle(cls, musteri_id, tur, tutar, adet, tarih=None, son_tarih_yeniden=False):
+        """
+        Tutar ve adet farkını ekle; satır yoksa oluştur.
+
+        tarih verilirse son tarih ileri alınır. son_tarih_yeniden: son tarihi
+        taşıyan kayıt çıkmış olabilir, kayıtlardan yeniden bulunur.
+        """
+        from django.db import IntegrityError, transaction
+        from django.db.models import F, Max, Subquery, Value
+        from django.db.models.functions import Coalesce, Greatest
+
+        tutar_alani, sayi_alani, son_alani = f'toplam_{tur}_tutari', f'{tur}_sayisi', f'son_{tur}_tarihi'
+        degisim = {tutar_alani: F(tutar_alani) + tutar, sayi_alani: F(sayi_alani) + adet}
+        if son_tarih_yeniden:
+            kayitlar, _, tarih_alani = cls._kaynak(tur)
+            degisim[son_alani] = Subquery(
+                kayitlar.filter(musteri_id=musteri_id).order_by()
+                .values('musteri_id').annotate(son=Max(tarih_alani)).values('son')
+            )
+        elif tarih is not None:
+            degisim[son_alani] = Greatest(Coalesce(son_alani, Value(tarih)), Value(tarih))
+
+        if cls.objects.filter(musteri_id=musteri_id).update(**degisim):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(musteri_id=musteri_id, **{tutar_alani: tutar, sayi_alani: adet, son_alani: tarih})
+        except IntegrityError:
+            # Aynı anda başka bir işlem satırı oluşturdu
+            cls.objects.filter(musteri_id=musteri_id).update(**degisim)
+
+    @classmethod
+    def _degisti(cls, eski, yeni, tur):
+        if eski == yeni:
+            return
+        if eski is not None and yeni is not None and eski[0] == yeni[0]:
+            # Aynı müşteri (ör. kısmi iade): yalnızca tutar farkı
+            cls._isle(yeni[0], tur, yeni[2] - eski[2], 0, yeni[1], son_tarih_yeniden=yeni[1] < eski[1])
+            return
+        if eski is not None:
+            cls._isle(eski[0], tur, -eski[2], -1, son_tarih_yeniden=True)
+        if yeni is not None:
+            cls._isle(yeni[0], tur, yeni[2], 1, yeni[1])
+
+    @classmethod
+    def satis_degisti(cls, eski, yeni):
+        """Satışın eski ve yeni halinin (None: yok) farkını istatistiğe işle; kayıt yazıldıktan/silindikten sonra çağrılır"""
+        cls._degisti(
+            _katki(eski, 'tamamlandi', 'toplam_tutar', 'satis_tarihi'),
+            _katki(yeni, 'tamamlandi', 'toplam_tutar', 'satis_tarihi'),
+            'satis',
+        )
+
+    @classmethod
+    def tahsilat_degisti(cls, eski, yeni):
+        """Tahsilatın eski ve yeni halinin (None: yok) farkını istatistiğe işle; kayıt yazıldıktan/silindikten sonra çağrılır"""
+        cls._degisti(
+            _katki(eski, 'tahsil_edildi', 'tutar', 'tahsilat_tarihi'),
+            _katki(yeni, 'tahsil_edildi', 'tutar', 'tahsilat_tarihi'),
+            'tahsilat',
+        )
+
+    @classmethod
+    def kayitlardan_hesapla(cls, musteri_idleri=None):
+        """Satis ve Tahsilat kayıtlarından istatistikleri hesapla (veritabanına yazmaz): {musteri_id: {alan: değer}}"""
+        from django.db.models import Count, Max, Sum
+
+        istatistikler = {}
+        for tur in cls.TURLER:
+            kayitlar, tutar_alani, tarih_alani = cls._kaynak(tur)
+            if musteri_idleri is not None:
+                kayitlar = kayitlar.filter(musteri_id__in=musteri_idleri)
+            satirlar = (
+                kayitlar.values('musteri_id')
+                .annotate(sayi=Count('pk'), toplam=Sum(tutar_alani), son=Max(tarih_alani)).order_by()
+            )
+            for satir in satirlar.iterator(chunk_size=2000):
+                istatistikler.setdefault(satir['musteri_id'], {}).update({
+                    f'{tur}_sayisi': satir['sayi'],
+                    f'toplam_{tur}_tutari': satir['toplam'] or 0,
+                    f'son_{tur}_tarihi': satir['son'],
+                })
+        return istatistikler
+
+    @classmethod
+    def yeniden_olustur(cls, musteri_idleri=None):
+        """İstatistikleri kayıtlardan yeniden yaz, yazılan satır sayısını döndür"""
+        from django.db import transaction
+
+        istatistikler = cls.kayitlardan_hesapla(musteri_idleri)
+        with transaction.atomic():
+            eskiler = cls.objects.all()
+            if musteri_idleri is not None:
+                eskiler = eskiler.filter(musteri_id__in=musteri_idleri)
+            eskiler.delete()
+            cls.objects.bulk_create(
+                [cls(musteri_id=musteri_id, **degerler) for musteri_id, degerler in istatistikler.items()],
+                batch_size=1000,
+            )
+        return len(istatistikler)
+
+    @classmethod
+    def farklar(cls, musteri_idleri=None):
+        """Kayıtlı istatistiklerin kayıtlardan hesaplananla farkları: [(musteri_id, alan, kayıtlı, hesaplanan)]"""
+        hesaplanan = cls.kayitlardan_hesapla(musteri_idleri)
+        kayitlilar = cls.objects.all()
+        if musteri_idleri is not None:
+            kayitlilar = kayitlilar.filter(musteri_id__in=musteri_idleri)
+        kayitlilar = {istatistik.musteri_id: istatistik for istatistik in kayitlilar.iterator(chunk_size=2000)}
+
+        farklar = []
+        for musteri_id in sorted(set(hesaplanan) | set(kayitlilar)):
+            kayitli = kayitlilar.get(musteri_id) or cls(musteri_id=musteri_id)
+            beklenen = cls(musteri_id=musteri_id, **hesaplanan.get(musteri_id, {}))
+            for alan in cls.ALANLAR:
+                if getattr(kayitli, alan) != getattr(beklenen, alan):
+                    farklar.append((musteri_id, alan, getattr(kayitli, alan), getattr(beklenen, alan)))
+        return farklar
+
+    @staticmethod
+    def bakiye_farklari(musteri_idleri=None):
+        """
+        Açık hesap bakiyesi kayıtlarla uyuşmayan müşteriler: [(musteri_id, kayıtlı, hesaplanan)].
+
+        Hesaplanan bakiye: iptal edilmemiş satışların açık hesap ödemeleri
+        eksi tahsil edilmiş tahsilatlar.
+        """
+        from decimal import Decimal
+
+        from django.db.models import Sum
+        from satis.models import Odeme
+
+        borclar = Odeme.objects.filter(odeme_tipi='acik_hesap', satis__musteri__isnull=False).exclude(satis__durum='iptal')
+        tahsilatlar = Tahsilat.objects.filter(durum='tahsil_edildi')
+        musteriler = Musteri.objects.all()
+        if musteri_idleri is not None:
+            borclar = borclar.filter(satis__musteri_id__in=musteri_idleri)
+            tahsilatlar = tahsilatlar.filter(musteri_id__in=musteri_idleri)
+            musteriler = musteriler.filter(pk__in=musteri_idleri)
+
+        hesaplanan = {}
+        for satir in borclar.values('satis__musteri_id').annotate(toplam=Sum('tutar')).order_by():
+            hesaplanan[satir['satis__musteri_id']] = satir['toplam'] or Decimal('0')
+        for satir in tahsilatlar.values('musteri_id').annotate(toplam=Sum('tutar')).order_by():
+            hesaplanan[satir['musteri_id']] = hesaplanan.get(satir['musteri_id'], Decimal('0')) - (satir['toplam'] or 0)
+
+        return [
+            (musteri_id, bakiye, hesaplanan.get(musteri_id, Decimal('0')))
+            for musteri_id, bakiye in musteriler.order_by('pk').values_list('pk', 'acik_hesap_bakiye').iterator(chunk_size=2000)
+            if bakiye != hesaplanan.get(musteri_id, Decimal('0'))
+        ]
@@ -2,15 +2,55 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
-from django.db.models import Q, Sum
+from django.db.models import Count, DecimalField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.core.paginator import Paginator
 from .models import Musteri, Tahsilat, TahsilatDetay, BorcAlacakHareket
-from satis.models import Satis, Odeme
+from satis.models import Satis
 import json
 from decimal import Decimal
 
 
+def _borc_listesi_alanlari(gun_sayisi=30):
+    """
+    Borç-alacak listesi için müşteri başına alt sorgular: son gun_sayisi günün
+    satış/tahsilat toplamları. Son satış/tahsilat tarihleri MusteriIstatistik'ten okunur.
+
+    settings.MUSTERI_GUNLUK_OZET açıksa toplamlar MusteriGunlukOzet'ten (gün
+    bazında) okunur, kapalıysa satış ve tahsilat kayıtlarından hesaplanır.
+    """
+    from django.conf import settings
+    from .models import MusteriGunlukOzet
+
+    def toplam(queryset, alan):
+        return Coalesce(
+            Subquery(
+                queryset.filter(musteri=OuterRef('pk')).order_by()
+                .values('musteri').annotate(toplam=Sum(alan)).values('toplam'),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+            Value(Decimal('0')),
+        )
+
+    if getattr(settings, 'MUSTERI_GUNLUK_OZET', False):
+        # Bugün dahil son gun_sayisi takvim günü
+        ozetler = MusteriGunlukOzet.objects.filter(tarih__gt=timezone.localdate() - timezone.timedelta(days=gun_sayisi))
+        son_30gun_satis = toplam(ozetler, 'satis_tutari')
+        son_30gun_tahsilat = toplam(ozetler, 'tahsilat_tutari')
+    else:
+        baslangic = timezone.now() - timezone.timedelta(days=gun_sayisi)
+        son_30gun_satis = toplam(Satis.objects.filter(durum='tamamlandi', satis_tarihi__gte=baslangic), 'toplam_tutar')
+        son_30gun_tahsilat = toplam(
+            Tahsilat.objects.filter(durum='tahsil_edildi', tahsilat_tarihi__gte=baslangic), 'tutar'
+        )
+
+    return {
+        'son_30gun_satis': son_30gun_satis,
+        'son_30gun_tahsilat': son_30gun_tahsilat,
+    }
+
+
 @login_required
 def borc_alacak_listesi(request):
     """Müşteri borç-alacak listesi"""
@@ -34,42 +74,31 @@ def borc_alacak_listesi(request):
     elif durum == 'alacakli':
         musteriler = musteriler.filter(acik_hesap_bakiye__lt=0)
     
-    # Müşteri bazında istatistikler ekle
-    for musteri in musteriler:
-        # Son 30 günlük satışlar
-        musteri.son_30gun_satis = Satis.objects.filter(
-            musteri=musteri,
-            durum='tamamlandi',
-            satis_tarihi__gte=timezone.now() - timezone.timedelta(days=30)
-        ).aggregate(toplam=Sum('toplam_tutar'))['toplam'] or 0
-        
-        # Son 30 günlük tahsilatlar
-        musteri.son_30gun_tahsilat = Tahsilat.objects.filter(
-            musteri=musteri,
-            durum='tahsil_edildi',
-            tahsilat_tarihi__gte=timezone.now() - timezone.timedelta(days=30)
-        ).aggregate(toplam=Sum('tutar'))['toplam'] or 0
-    
-    # Sayfalama
-    paginator = Paginator(musteriler.order_by('-acik_hesap_bakiye'), 20)
+    # Özet istatistikler tek sorguda
+    ozet = musteriler.aggregate(
+        toplam_borc=Sum('acik_hesap_bakiye', filter=Q(acik_hesap_bakiye__gt=0)),
+        toplam_alacak=Sum('acik_hesap_bakiye', filter=Q(acik_hesap_bakiye__lt=0)),
+        borclu_musteri_sayisi=Count('id', filter=Q(acik_hesap_bakiye__gt=0)),
+        toplam_musteri_sayisi=Count('id'),
+    )
+    
+    # Son 30 gün tutarları alt sorgu, son işlem tarihleri istatistik satırından
+    paginator = Paginator(
+        musteriler.select_related('istatistik').annotate(**_borc_listesi_alanlari())
+        .order_by('-acik_hesap_bakiye', 'id'), 20
+    )
+    paginator.count = ozet['toplam_musteri_sayisi']  # COUNT tekrarlanmaz
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # Özet istatistikler
-    toplam_borc = musteriler.filter(acik_hesap_bakiye__gt=0).aggregate(
-        toplam=Sum('acik_hesap_bakiye'))['toplam'] or 0
-    toplam_alacak = abs(musteriler.filter(acik_hesap_bakiye__lt=0).aggregate(
-        toplam=Sum('acik_hesap_bakiye'))['toplam'] or 0)
-    borclu_musteri_sayisi = musteriler.filter(acik_hesap_bakiye__gt=0).count()
-    
     context = {
         'page_obj': page_obj,
         'search': search,
         'durum': durum,
-        'toplam_borc': toplam_borc,
-        'toplam_alacak': toplam_alacak,
-        'borclu_musteri_sayisi': borclu_musteri_sayisi,
-        'toplam_musteri_sayisi': musteriler.count(),
+        'toplam_borc': ozet['toplam_borc'] or 0,
+        'toplam_alacak': abs(ozet['toplam_alacak'] or 0),
+        'borclu_musteri_sayisi': ozet['borclu_musteri_sayisi'],
+        'toplam_musteri_sayisi': ozet['toplam_musteri_sayisi'],
     }
     
     return render(request, 'musteri/borc_alacak_listesi.html', context)
@@ -78,19 +107,10 @@ def borc_alacak_listesi(request):
 @login_required
 def musteri_borc_detay(request, musteri_id):
     """Müşteri borç detayı"""
-    musteri = get_object_or_404(Musteri, id=musteri_id)
+    musteri = get_object_or_404(Musteri.objects.select_related('istatistik'), id=musteri_id)
     
     # Veresiye satışlar (açık hesap ödemeli)
-    # Açık hesap ödemesi olan satışları bul
-    acik_hesap_satis_ids = Odeme.objects.filter(
-        odeme_tipi='acik_hesap'
-    ).values_list('satis_id', flat=True)
-    
-    odenmemis_satislar = Satis.objects.filter(
-        id__in=acik_hesap_satis_ids,
-        musteri=musteri,
-        durum='tamamlandi'
-    ).order_by('-satis_tarihi')
+    odenmemis_satislar = musteri.veresiye_satislar.order_by('-satis_tarihi')
     
     # Son hareketler
     hareketler = BorcAlacakHareket.objects.filter(
@@ -0,0 +1,220 @@
+"""
+Rapor dışa aktarımlarının veri kaynakları.
+
+Her fonksiyon istek parametrelerinden (request.GET veya arka plan işinin
+kaydedilmiş parametreleri) dosya adı, sayfa adı, başlıklar ve satır üreten
+bir generator döndürür. Aynı veri hem view'dan doğrudan indirilir
+(rapor/excel.py) hem de arka plan işi olarak dosyaya yazılır (downloads/isler.py).
+"""
+from datetime import date, datetime, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .excel import PARTI, parcala
+
+
+def _tarih(deger, varsayilan):
+    try:
+        return datetime.strptime(deger, '%Y-%m-%d').date() if deger else varsayilan
+    except (TypeError, ValueError):
+        return varsayilan
+
+
+def _id(deger):
+    """'None', boş veya sayı olmayan filtre değerlerini yok say"""
+    deger = str(deger or '').strip()
+    return int(deger) if deger.isdigit() else None
+
+
+def gunluk_satislar(parametreler):
+    """Günlük satış raporunun (tarih, satışlar) kaynağı"""
+    from satis.models import Satis
+
+    secili_tarih = _tarih(parametreler.get('tarih'), date.today())
+    return secili_tarih, Satis.objects.filter(satis_tarihi__date=secili_tarih, durum='tamamlandi')
+
+
+def gunluk_satis_excel_verisi(parametreler):
+    """Bir günün tamamlanmış satışları; ödeme tipleri parça başına tek sorguda"""
+    from satis.models import Odeme
+
+    secili_tarih, satislar = gunluk_satislar(parametreler)
+    satislar = satislar.order_by('id').values_list(
+        'id', 'satis_no', 'musteri__ad', 'musteri__soyad', 'toplam_tutar', 'satis_tarihi'
+    )
+    odeme_tipleri = dict(Odeme.ODEME_TIPLERI)
+
+    def satirlar():
+        for parca in parcala(satislar.iterator(chunk_size=PARTI)):
+            odemeler = {}
+            for satis_id, odeme_tipi in Odeme.objects.filter(
+                    satis_id__in=[satis[0] for satis in parca]).order_by('id').values_list('satis_id', 'odeme_tipi'):
+                tipler = odemeler.setdefault(satis_id, [])
+                etiket = odeme_tipleri.get(odeme_tipi, odeme_tipi)
+                if etiket not in tipler:
+                    tipler.append(etiket)
+
+            for satis_id, satis_no, musteri_ad, musteri_soyad, toplam_tutar, satis_tarihi in parca:
+                yield (
+                    satis_no,
+                    f"{musteri_ad} {musteri_soyad}" if musteri_ad is not None else 'Bilinmeyen',
+                    float(toplam_tutar),
+                    ' + '.join(odemeler.get(satis_id, [])) or 'Beklemede',
+                    timezone.localtime(satis_tarihi).strftime('%d.%m.%Y %H:%M'),
+                )
+
+    return {
+        'dosya_adi': f"gunluk_satis_{secili_tarih}.xlsx",
+        'sayfa_adi': f"Günlük Satış - {secili_tarih}",
+        'basliklar': ['Satış No', 'Müşteri', 'Toplam Tutar', 'Ödeme Tipi', 'Tarih'],
+        'satirlar': satirlar(),
+    }
+
+
+def stok_varyantlari(parametreler):
+    """Stok raporu filtreleriyle aktif varyantlar"""
+    from urun.models import UrunVaryanti
+
+    varyantlar = UrunVaryanti.objects.filter(
+        aktif=True,
+        urun__aktif=True
+    ).order_by('urun__kategori__ad', 'urun__ad')
+
+    arama = (parametreler.get('arama') or '').strip()
+    kategori_id = _id(parametreler.get('kategori'))
+    marka_id = _id(parametreler.get('marka'))
+    durum = parametreler.get('durum')
+    cinsiyet = parametreler.get('cinsiyet')
+
+    if arama:
+        varyantlar = varyantlar.filter(
+            Q(urun__ad__icontains=arama) |
+            Q(barkod__icontains=arama) |
+            Q(urun__urun_kodu__icontains=arama) |
+            Q(renk__ad__icontains=arama) |
+            Q(beden__ad__icontains=arama)
+        )
+    if kategori_id:
+        varyantlar = varyantlar.filter(urun__kategori_id=kategori_id)
+    if marka_id:
+        varyantlar = varyantlar.filter(urun__marka_id=marka_id)
+    if durum == 'tukendi':
+        varyantlar = varyantlar.filter(stok_miktari=0)
+    elif durum == 'kritik':
+        varyantlar = varyantlar.filter(stok_miktari__gt=0, stok_miktari__lte=5)
+    elif durum == 'normal':
+        varyantlar = varyantlar.filter(stok_miktari__gt=5)
+    if cinsiyet and cinsiyet not in ('None', 'hepsi'):
+        varyantlar = varyantlar.filter(urun__cinsiyet=cinsiyet)
+    return varyantlar
+
+
+def stok_excel_verisi(parametreler):
+    """Stok raporu filtreleriyle aktif varyantlar, varyant başına bir satır"""
+    from urun.models import Urun
+
+    cinsiyetler = dict(Urun.CINSIYET_SECENEKLERI)
+    satirlar_qs = stok_varyantlari(parametreler).values_list(
+        'urun__ad', 'renk__ad', 'beden__ad', 'barkod', 'urun__kategori__ad', 'urun__marka__ad',
+        'urun__cinsiyet', 'urun__alis_fiyati', 'urun__satis_fiyati', 'urun__kar_orani', 'stok_miktari',
+    )
+
+    def satirlar():
+        for (urun_ad, renk, beden, barkod, kategori, marka, cinsiyet,
+             alis_fiyati, satis_fiyati, kar_orani, stok_miktari) in satirlar_qs.iterator(chunk_size=PARTI):
+            varyant_adi = " - ".join(ad for ad in (renk, beden) if ad) or "Standart"
+
+            durum_text = "Normal"
+            if stok_miktari == 0:
+                durum_text = "Tükendi"
+            elif stok_miktari <= 5:
+                durum_text = "Kritik"
+
+            yield (
+                urun_ad, varyant_adi, barkod, kategori, marka or "-",
+                cinsiyetler.get(cinsiyet, cinsiyet),
+                float(alis_fiyati), float(satis_fiyati), float(kar_orani),
+                stok_miktari, durum_text,
+            )
+
+    return {
+        'dosya_adi': "stok_raporu.xlsx",
+        'sayfa_adi': "Stok Raporu",
+        'basliklar': ['Ürün Adı', 'Varyant', 'Barkod', 'Kategori', 'Marka', 'Cinsiyet',
+                      'Alış Fiyatı', 'Satış Fiyatı', 'Kar Oranı %', 'Stok Miktarı', 'Durum'],
+        'satirlar': satirlar(),
+    }
+
+
+def satici_raporu_donemi(parametreler, bugun=None):
+    """Satıcı raporu filtresinden (filtre, baslangic, bitis, baslik) hesapla"""
+    bugun = bugun or date.today()
+    filtre = parametreler.get('filtre', 'ay')  # gun, hafta, ay, ozel
+
+    if filtre == 'gun':
+        baslangic = bitis = bugun
+        baslik = f"Günlük Satış Raporu - {bugun.strftime('%d.%m.%Y')}"
+    elif filtre == 'hafta':
+        # Bu haftanın başından bugüne
+        baslangic = bugun - timedelta(days=bugun.weekday())
+        bitis = bugun
+        baslik = f"Haftalık Satış Raporu - {baslangic.strftime('%d.%m')} / {bugun.strftime('%d.%m.%Y')}"
+    elif filtre == 'ay':
+        # Bu ayın başından bugüne
+        baslangic = bugun.replace(day=1)
+        bitis = bugun
+        baslik = f"Aylık Satış Raporu - {baslangic.strftime('%B %Y')}"
+    else:  # ozel
+        baslangic = _tarih(parametreler.get('baslangic'), None)
+        bitis = _tarih(parametreler.get('bitis'), None)
+        if baslangic is None or bitis is None:
+            baslangic = bitis = bugun
+        baslik = f"Özel Dönem Satış Raporu - {baslangic.strftime('%d.%m.%Y')} / {bitis.strftime('%d.%m.%Y')}"
+
+    return filtre, baslangic, bitis, baslik
+
+
+def satici_raporu_excel_verisi(parametreler):
+    """Satıcı performans raporu, satıcı başına bir satır"""
+    from django.contrib.auth import get_user_model
+    from satis import raporlar
+
+    filtre, baslangic, bitis, baslik = satici_raporu_donemi(parametreler)
+    ozetler = raporlar.satici_ozetleri(baslangic, bitis)
+    urun_adetleri = raporlar.satici_urun_adetleri(baslangic, bitis)
+    en_cok_satanlar = raporlar.en_cok_satanlar(baslangic, bitis)
+    saticilar = get_user_model().objects.in_bulk([satici_id for satici_id in ozetler if satici_id is not None])
+    genel_toplam = sum(ozet['toplam_tutar'] or 0 for ozet in ozetler.values())
+
+    def satirlar():
+        for satici_id, ozet in sorted(ozetler.items(), key=lambda x: x[1]['toplam_tutar'] or 0, reverse=True):
+            satici = saticilar.get(satici_id)
+            if satici is None or not ozet['toplam_tutar']:
+                continue
+            en_cok_satan = en_cok_satanlar.get(satici_id) or {}
+            yield (
+                satici.get_full_name() or satici.username,
+                float(ozet['toplam_tutar']),
+                ozet['satis_sayisi'],
+                urun_adetleri.get(satici_id, 0),
+                float(ozet['ortalama_satis'] or 0),
+                en_cok_satan.get('urun__ad', '-'),
+                round(float(ozet['toplam_tutar'] / genel_toplam * 100), 2) if genel_toplam else 0,
+            )
+
+    return {
+        'dosya_adi': f"satici_raporu_{baslangic}_{bitis}.xlsx",
+        'sayfa_adi': baslik,
+        'basliklar': ['Satış Elemanı', 'Toplam Tutar', 'Satış Sayısı', 'Ürün Adedi',
+                      'Ortalama Satış', 'En Çok Satan Ürün', 'Pay %'],
+        'satirlar': satirlar(),
+    }
+
+
+# Arka plan işi olarak çalıştırılabilen dışa aktarımlar (downloads/isler.py)
+AKTARIMLAR = {
+    'gunluk_satis_excel': gunluk_satis_excel_verisi,
+    'stok_excel': stok_excel_verisi,
+    'satici_raporu_excel': satici_raporu_excel_verisi,
+}
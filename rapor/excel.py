@@ -0,0 +1,49 @@
+"""
+Akış (streaming) tabanlı Excel dışa aktarımı.
+
+openpyxl write-only modunda satırlar hücre nesnesi oluşturulmadan doğrudan
+geçici dosyaya yazılır, dosya da FileResponse (StreamingHttpResponse) ile
+parça parça gönderilir. Satırlar values_list() + iterator(chunk_size=...) ile
+okunduğundan bellek kullanımı satır sayısından bağımsızdır.
+"""
+import tempfile
+from itertools import islice
+
+from django.http import FileResponse
+from openpyxl import Workbook
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+PARTI = 2000  # Veritabanından tek seferde okunacak satır sayısı
+
+
+def parcala(iterable, boyut=PARTI):
+    """Bir iterable'ı en fazla `boyut` elemanlı listeler halinde döndür"""
+    iterator = iter(iterable)
+    while True:
+        parca = list(islice(iterator, boyut))
+        if not parca:
+            return
+        yield parca
+
+
+def xlsx_yaz(dosya, sayfa_adi, basliklar, satirlar):
+    """
+    Başlık ve satırlardan tek sayfalık .xlsx dosyasını açık dosya nesnesine yaz.
+
+    satirlar: her biri bir satırın hücre değerlerini içeren tuple/list üreten iterable
+    (generator olabilir; tamamı belleğe alınmaz).
+    """
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(title=sayfa_adi[:31])  # Excel sayfa adı sınırı
+    worksheet.append(basliklar)
+    for satir in satirlar:
+        worksheet.append(satir)
+    workbook.save(dosya)
+
+
+def xlsx_yanit(dosya_adi, sayfa_adi, basliklar, satirlar):
+    """xlsx_yaz ile geçici dosyaya yazıp indirme yanıtı döndür"""
+    dosya = tempfile.TemporaryFile()
+    xlsx_yaz(dosya, sayfa_adi, basliklar, satirlar)
+    dosya.seek(0)
+    return FileResponse(dosya, as_attachment=True, filename=dosya_adi, content_type=XLSX_CONTENT_TYPE)
@@ -1,9 +1,9 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
+from django.urls import reverse
 from django.db.models import Sum, Count, F
 from datetime import date, datetime, timedelta
-from openpyxl import Workbook
 from reportlab.pdfgen import canvas
 from satis.models import Satis, SatisDetay
 from urun.models import Urun
@@ -77,7 +77,7 @@ def stok_raporu(request):
     varyantlar = UrunVaryanti.objects.filter(
         aktif=True,
         urun__aktif=True
-    ).select_related('urun', 'urun__kategori', 'urun__marka', 'renk', 'beden').order_by('urun__kategori__ad', 'urun__ad')
+    ).order_by('urun__kategori__ad', 'urun__ad')
 
     # Arama filtreleri
     arama = request.GET.get('arama', '').strip()
@@ -271,44 +271,37 @@ def musteri_raporu(request):
 
 
 # Excel Export Views
+
+# Bu günden kısa dönemlerin dışa aktarımı istek içinde hazırlanır
+SENKRON_AKTARIM_GUN_SINIRI = 31
+# Bu kadar satırı geçen dışa aktarımlar iş kuyruğuna eklenir (gunicorn worker'ını bloklamasın)
+SENKRON_AKTARIM_SATIR_SINIRI = 500
+
+
+def _arka_plana_al(request, tip):
+    """Dışa aktarımı iş kuyruğuna ekle, durum adresini JSON olarak döndür"""
+    from downloads.models import ArkaPlanIsi
+
+    parametreler = request.GET.dict()
+    parametreler.pop('arka_plan', None)
+    isi = ArkaPlanIsi.kuyruga_ekle(tip, parametreler, request.user)
+    return JsonResponse({
+        'success': True,
+        'is_id': isi.pk,
+        'durum': isi.durum,
+        'durum_url': reverse('downloads:is_durumu', args=[isi.pk]),
+    }, status=202)
+
+
 @login_required
 def gunluk_satis_excel(request):
-    """Günlük satış Excel export"""
-    tarih = request.GET.get('tarih', date.today().strftime('%Y-%m-%d'))
-    secili_tarih = datetime.strptime(tarih, '%Y-%m-%d').date()
-
-    satislar = Satis.objects.filter(
-        satis_tarihi__date=secili_tarih,
-        durum='tamamlandi'
-    )
+    """Günlük satış Excel export (SENKRON_AKTARIM_SATIR_SINIRI'nı aşan günler arka planda)"""
+    from .disa_aktarim import gunluk_satis_excel_verisi, gunluk_satislar
+    from .excel import xlsx_yanit
 
-    # Excel dosyası oluştur
-    workbook = Workbook()
-    worksheet = workbook.active
-    worksheet.title = f"Günlük Satış - {secili_tarih}"
-
-    # Başlıklar
-    headers = ['Satış No', 'Müşteri', 'Toplam Tutar', 'Ödeme Tipi', 'Tarih']
-    for col, header in enumerate(headers, 1):
-        worksheet.cell(row=1, column=col, value=header)
-
-    # Veriler
-    for row, satis in enumerate(satislar, 2):
-        worksheet.cell(row=row, column=1, value=satis.satis_no)
-        worksheet.cell(
-            row=row, column=2, value=satis.musteri.tam_ad if satis.musteri else 'Bilinmeyen')
-        worksheet.cell(row=row, column=3, value=float(satis.toplam_tutar))
-        worksheet.cell(row=row, column=4, value=satis.get_odeme_tipi_display())
-        worksheet.cell(row=row, column=5,
-                       value=satis.satis_tarihi.strftime('%d.%m.%Y %H:%M'))
-
-    # Response
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = f'attachment; filename="gunluk_satis_{secili_tarih}.xlsx"'
-    workbook.save(response)
-    return response
+    if request.GET.get('arka_plan') or gunluk_satislar(request.GET)[1].count() > SENKRON_AKTARIM_SATIR_SINIRI:
+        return _arka_plana_al(request, 'gunluk_satis_excel')
+    return xlsx_yanit(**gunluk_satis_excel_verisi(request.GET))
 
 
 @login_required
@@ -320,111 +313,18 @@ def gunluk_satis_pdf(request):
 
 @login_required
 def stok_excel(request):
-    """Stok raporu Excel export"""
-    from urun.models import UrunVaryanti
+    """
+    Stok raporu Excel export.
 
-    varyantlar = UrunVaryanti.objects.filter(
-        aktif=True,
-        urun__aktif=True
-    ).select_related('urun', 'urun__kategori', 'urun__marka', 'renk', 'beden').order_by('urun__kategori__ad', 'urun__ad')
+    Filtrelenmiş varyant sayısı SENKRON_AKTARIM_SATIR_SINIRI'nı geçerse (ör. tüm
+    katalog) iş kuyruğuna eklenir; stok raporu sayfası hazır olunca indirir.
+    """
+    from .disa_aktarim import stok_excel_verisi, stok_varyantlari
+    from .excel import xlsx_yanit
 
-    # Filtreler - Güvenli şekilde
-    try:
-        arama = request.GET.get('arama', '').strip()
-        kategori_id = request.GET.get('kategori')
-        marka_id = request.GET.get('marka')
-        durum = request.GET.get('durum')
-        cinsiyet = request.GET.get('cinsiyet')
-        
-        # Arama filtresi
-        if arama:
-            from django.db.models import Q
-            varyantlar = varyantlar.filter(
-                Q(urun__ad__icontains=arama) |
-                Q(barkod__icontains=arama) |
-                Q(urun__urun_kodu__icontains=arama) |
-                Q(renk__ad__icontains=arama) |
-                Q(beden__ad__icontains=arama)
-            )
-        
-        # Kategori filtresi - Güvenli None kontrolü
-        if kategori_id and kategori_id != 'None' and kategori_id != '' and str(kategori_id).isdigit():
-            varyantlar = varyantlar.filter(urun__kategori_id=int(kategori_id))
-        
-        # Marka filtresi - Güvenli None kontrolü
-        if marka_id and marka_id != 'None' and marka_id != '' and str(marka_id).isdigit():
-            varyantlar = varyantlar.filter(urun__marka_id=int(marka_id))
-        
-        # Stok durumu filtresi - None kontrolü
-        if durum and durum != 'None' and durum != '':
-            if durum == 'tukendi':
-                varyantlar = varyantlar.filter(stok_miktari=0)
-            elif durum == 'kritik':
-                varyantlar = varyantlar.filter(
-                    stok_miktari__gt=0, stok_miktari__lte=5)
-            elif durum == 'normal':
-                varyantlar = varyantlar.filter(stok_miktari__gt=5)
-        
-        # Cinsiyet filtresi - None kontrolü
-        if cinsiyet and cinsiyet != 'None' and cinsiyet != '' and cinsiyet != 'hepsi':
-            varyantlar = varyantlar.filter(urun__cinsiyet=cinsiyet)
-            
-    except (ValueError, TypeError) as e:
-        # Hata durumunda filtreleri atla, tüm varyantları getir
-        pass
-
-    # Excel dosyası oluştur
-    workbook = Workbook()
-    worksheet = workbook.active
-    worksheet.title = "Stok Raporu"
-
-    # Başlıklar
-    headers = ['Ürün Adı', 'Varyant', 'Barkod', 'Kategori', 'Marka', 'Cinsiyet',
-               'Alış Fiyatı', 'Satış Fiyatı', 'Kar Oranı %', 'Stok Miktarı', 'Durum']
-    for col, header in enumerate(headers, 1):
-        worksheet.cell(row=1, column=col, value=header)
-
-    # Veriler
-    for row, varyant in enumerate(varyantlar, 2):
-        varyant_adi = ""
-        if varyant.renk:
-            varyant_adi += varyant.renk.ad
-        if varyant.renk and varyant.beden:
-            varyant_adi += " - "
-        if varyant.beden:
-            varyant_adi += varyant.beden.ad
-        if not varyant_adi:
-            varyant_adi = "Standart"
-
-        durum_text = "Normal"
-        if varyant.stok_miktari == 0:
-            durum_text = "Tükendi"
-        elif varyant.stok_miktari <= 5:
-            durum_text = "Kritik"
-
-        worksheet.cell(row=row, column=1, value=varyant.urun.ad)
-        worksheet.cell(row=row, column=2, value=varyant_adi)
-        worksheet.cell(row=row, column=3, value=varyant.barkod)
-        worksheet.cell(row=row, column=4, value=str(varyant.urun.kategori))
-        worksheet.cell(row=row, column=5, value=str(
-            varyant.urun.marka) if varyant.urun.marka else "-")
-        worksheet.cell(row=row, column=6,
-                       value=varyant.urun.get_cinsiyet_display())
-        worksheet.cell(row=row, column=7, value=float(
-            varyant.urun.alis_fiyati))
-        worksheet.cell(row=row, column=8, value=float(
-            varyant.urun.satis_fiyati))
-        worksheet.cell(row=row, column=9, value=float(varyant.urun.kar_orani))
-        worksheet.cell(row=row, column=10, value=varyant.stok_miktari)
-        worksheet.cell(row=row, column=11, value=durum_text)
-
-    # Response
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = 'attachment; filename="stok_raporu.xlsx"'
-    workbook.save(response)
-    return response
+    if request.GET.get('arka_plan') or stok_varyantlari(request.GET).count() > SENKRON_AKTARIM_SATIR_SINIRI:
+        return _arka_plana_al(request, 'stok_excel')
+    return xlsx_yanit(**stok_excel_verisi(request.GET))
 
 
 @login_required
@@ -481,51 +381,24 @@ def stok_hareketleri(request, varyant_id):
 def satici_raporu(request):
     """Satış elemanlarının performans raporu"""
     from django.contrib.auth import get_user_model
-    from django.db.models import Sum, Count, Avg
     from datetime import datetime, timedelta, date
     from decimal import Decimal
 
     User = get_user_model()
 
     # Tarih filtreleri
+    from .disa_aktarim import satici_raporu_donemi
+
     bugun = date.today()
-    filtre = request.GET.get('filtre', 'ay')  # gun, hafta, ay, ozel
-
-    if filtre == 'gun':
-        baslangic = bugun
-        bitis = bugun
-        baslik = f"Günlük Satış Raporu - {bugun.strftime('%d.%m.%Y')}"
-    elif filtre == 'hafta':
-        # Bu haftanın başından bugüne
-        haftanin_basi = bugun - timedelta(days=bugun.weekday())
-        baslangic = haftanin_basi
-        bitis = bugun
-        baslik = f"Haftalık Satış Raporu - {haftanin_basi.strftime('%d.%m')} / {bugun.strftime('%d.%m.%Y')}"
-    elif filtre == 'ay':
-        # Bu ayın başından bugüne
-        ayin_basi = bugun.replace(day=1)
-        baslangic = ayin_basi
-        bitis = bugun
-        baslik = f"Aylık Satış Raporu - {ayin_basi.strftime('%B %Y')}"
-    else:  # ozel
-        baslangic_str = request.GET.get(
-            'baslangic', bugun.strftime('%Y-%m-%d'))
-        bitis_str = request.GET.get('bitis', bugun.strftime('%Y-%m-%d'))
-
-        try:
-            baslangic = datetime.strptime(baslangic_str, '%Y-%m-%d').date()
-            bitis = datetime.strptime(bitis_str, '%Y-%m-%d').date()
-        except ValueError:
-            baslangic = bugun
-            bitis = bugun
-
-        baslik = f"Özel Dönem Satış Raporu - {baslangic.strftime('%d.%m.%Y')} / {bitis.strftime('%d.%m.%Y')}"
-
-    # Satış elemanlarını al (satış yapanları)
-    satici_listesi = User.objects.filter(
-        satis__satis_tarihi__date__range=[baslangic, bitis],
-        satis__durum='tamamlandi'
-    ).distinct()
+    filtre, baslangic, bitis, baslik = satici_raporu_donemi(request.GET, bugun)
+
+    # Satıcı, satıcı+ürün ve gün bazında gruplanmış sorgular (satis/raporlar.py)
+    from satis import raporlar
+
+    ozetler = raporlar.satici_ozetleri(baslangic, bitis)
+    urun_adetleri = raporlar.satici_urun_adetleri(baslangic, bitis)
+    en_cok_satanlar = raporlar.en_cok_satanlar(baslangic, bitis)
+    saticilar = User.objects.in_bulk([satici_id for satici_id in ozetler if satici_id is not None])
 
     # Her satış elemanı için istatistikler
     satici_stats = []
@@ -533,57 +406,25 @@ def satici_raporu(request):
     toplam_satis_adedi = 0
     toplam_urun_adedi = 0
 
-    for satici in satici_listesi:
-        # Bu satıcının dönemdeki satışları
-        satislar = Satis.objects.filter(
-            satici=satici,
-            satis_tarihi__date__range=[baslangic, bitis],
-            durum='tamamlandi'
-        )
-
-        # İstatistikler
-        stats = satislar.aggregate(
-            toplam_tutar=Sum('toplam_tutar'),
-            satis_sayisi=Count('id')
-        )
-
-        # Ortalama satış tutarını ayrı hesapla
-        ortalama_satis = satislar.aggregate(ortalama=Avg('toplam_tutar'))[
-            'ortalama'] or Decimal('0')
-
-        # Satılan ürün sayısı
-        urun_sayisi = SatisDetay.objects.filter(
-            satis__satici=satici,
-            satis__satis_tarihi__date__range=[baslangic, bitis],
-            satis__durum='tamamlandi'
-        ).aggregate(toplam_adet=Sum('miktar'))['toplam_adet'] or 0
-
-        # En çok sattığı ürün
-        en_cok_satan = SatisDetay.objects.filter(
-            satis__satici=satici,
-            satis__satis_tarihi__date__range=[baslangic, bitis],
-            satis__durum='tamamlandi'
-        ).values(
-            'urun__ad'
-        ).annotate(
-            toplam_adet=Sum('miktar'),
-            toplam_tutar=Sum('toplam_fiyat')
-        ).order_by('-toplam_adet').first()
-
-        if stats['toplam_tutar']:
-            satici_stats.append({
-                'satici': satici,
-                'toplam_tutar': stats['toplam_tutar'],
-                'satis_sayisi': stats['satis_sayisi'],
-                'urun_sayisi': urun_sayisi,
-                'ortalama_satis': ortalama_satis,
-                'en_cok_satan': en_cok_satan,
-                'yuzde_pay': Decimal('0')  # Sonra hesaplanacak
-            })
-
-            toplam_satis_tutari += stats['toplam_tutar']
-            toplam_satis_adedi += stats['satis_sayisi']
-            toplam_urun_adedi += urun_sayisi
+    for satici_id, stats in ozetler.items():
+        satici = saticilar.get(satici_id)
+        if satici is None or not stats['toplam_tutar']:
+            continue
+        urun_sayisi = urun_adetleri.get(satici_id, 0)
+
+        satici_stats.append({
+            'satici': satici,
+            'toplam_tutar': stats['toplam_tutar'],
+            'satis_sayisi': stats['satis_sayisi'],
+            'urun_sayisi': urun_sayisi,
+            'ortalama_satis': stats['ortalama_satis'] or Decimal('0'),
+            'en_cok_satan': en_cok_satanlar.get(satici_id),
+            'yuzde_pay': Decimal('0')  # Sonra hesaplanacak
+        })
+
+        toplam_satis_tutari += stats['toplam_tutar']
+        toplam_satis_adedi += stats['satis_sayisi']
+        toplam_urun_adedi += urun_sayisi
 
     # Yüzde paylarını hesapla
     for stat in satici_stats:
@@ -594,29 +435,20 @@ def satici_raporu(request):
     # Performansa göre sırala
     satici_stats.sort(key=lambda x: x['toplam_tutar'], reverse=True)
 
-    # Günlük detay için (sadece son 7 gün)
+    # Günlük detay için (sadece son 7 gün) - tek sorguda
     gunluk_detay = []
     if filtre in ['gun', 'hafta']:
-        son_7_gun = []
-        for i in range(7):
-            tarih = bugun - timedelta(days=i)
-            if tarih >= baslangic:
-                son_7_gun.append(tarih)
-
-        for tarih in reversed(son_7_gun):
-            gun_satislari = Satis.objects.filter(
-                satis_tarihi__date=tarih,
-                durum='tamamlandi'
-            ).aggregate(
-                toplam=Sum('toplam_tutar'),
-                adet=Count('id')
-            )
-
+        ilk_gun = max(baslangic, bugun - timedelta(days=6))
+        gunler = raporlar.gunluk_satislar(ilk_gun, bugun)
+        tarih = ilk_gun
+        while tarih <= bugun:
+            gun_satislari = gunler.get(tarih, {})
             gunluk_detay.append({
                 'tarih': tarih,
-                'toplam_tutar': gun_satislari['toplam'] or Decimal('0'),
-                'satis_adet': gun_satislari['adet'] or 0
+                'toplam_tutar': gun_satislari.get('tutar') or Decimal('0'),
+                'satis_adet': gun_satislari.get('adet') or 0
             })
+            tarih += timedelta(days=1)
 
     context = {
         'title': 'Satış Elemanı Raporu',
@@ -637,11 +469,20 @@ def satici_raporu(request):
 
 @login_required
 def satici_raporu_excel(request):
-    """Satıcı raporu Excel export"""
-    # Export mantığı için satici_raporu view'ini tekrar çağır
-    response = satici_raporu(request)
-    # Excel export implementasyonu burada olacak
-    return HttpResponse("Excel export yakında eklenecek")
+    """
+    Satıcı raporu Excel export.
+
+    SENKRON_AKTARIM_GUN_SINIRI günü geçmeyen dönemler doğrudan indirilir; daha
+    uzun dönemler (veya ?arka_plan=1) iş kuyruğuna eklenir ve sayfa işin
+    durumunu sorgulayıp hazır olunca indirir.
+    """
+    from .disa_aktarim import satici_raporu_donemi, satici_raporu_excel_verisi
+    from .excel import xlsx_yanit
+
+    _, baslangic, bitis, _ = satici_raporu_donemi(request.GET)
+    if request.GET.get('arka_plan') or (bitis - baslangic).days >= SENKRON_AKTARIM_GUN_SINIRI:
+        return _arka_plana_al(request, 'satici_raporu_excel')
+    return xlsx_yanit(**satici_raporu_excel_verisi(request.GET))
 
 
 @login_required
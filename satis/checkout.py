@@ -0,0 +1,337 @@
+"""
+Satış tamamlama servisi.
+
+Sepetin tamamı tek bir transaction içinde işlenir: sepetteki varyantlar tek
+sorguda okunur, stok bellekte kontrol edilir ve tek bir koşullu UPDATE ile
+düşülür, ardından satış detayı, stok hareketi, ödeme ve kasa hareketi
+kayıtları bulk_create ile yazılır.
+Herhangi bir adım hata verirse satışa ait hiçbir kayıt veritabanında kalmaz.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from kasa.models import Kasa, KasaHareket
+from musteri.models import Musteri
+from urun.models import Urun, UrunVaryanti, StokHareket, YetersizStok
+from .models import Satis, SatisDetay, Odeme
+
+
+class SatisHatasi(Exception):
+    """Satış tamamlanamadığında kullanıcıya gösterilecek hata"""
+
+
+# Ödeme tipi -> (kasa tipi, kasa hareketi açıklaması)
+ODEME_KASALARI = {
+    'nakit': ('nakit', 'Nakit Ödeme'),
+    'kart': ('pos', 'Kart Ödeme'),
+    'havale': ('banka', 'Havale Ödeme'),
+}
+
+
+def sepet_satirlari(sepet_data):
+    """JSON (liste) ve session (sözlük) sepet formatlarını ortak satır listesine çevir"""
+    satirlar = []
+    if isinstance(sepet_data, dict):
+        # Session format: {urun_id: {...}}
+        for urun_id, item in sepet_data.items():
+            satirlar.append({
+                'urun_id': int(urun_id),
+                'varyant_id': int(item['varyant_id']) if item.get('varyant_id') else None,
+                'miktar': int(item['miktar']),
+                'birim_fiyat': Decimal(str(item['fiyat'])),
+                'indirim_tutari': Decimal('0'),
+            })
+    else:
+        # JSON format: [{id, varyant_id, miktar, fiyat, urun_indirim}, ...]
+        for item in sepet_data:
+            satirlar.append({
+                'urun_id': int(item['id']),
+                'varyant_id': int(item['varyant_id']) if item.get('varyant_id') else None,
+                'miktar': int(item['miktar']),
+                'birim_fiyat': Decimal(str(item['fiyat'])),
+                'indirim_tutari': Decimal(str(item.get('urun_indirim', item.get('indirim', 0)))),
+            })
+    return satirlar
+
+
+def _stok_dusumlerini_hazirla(satirlar):
+    """
+    Sepet satırlarının düşüleceği varyantları tek sorguda oku ve stoğu
+    bellekte kontrol et.
+
+    Her satır için (urun, varyant) döndürür. Varyant seçilmemiş satırlarda
+    ürünün stoğu olan ilk aktif varyantı kullanılır. Buradaki kontrol yalnızca
+    anlaşılır hata mesajı içindir; asıl koruma UrunVaryanti.stok_guncelle'dir.
+    """
+    urun_ids = {s['urun_id'] for s in satirlar}
+    varyant_ids = {s['varyant_id'] for s in satirlar if s['varyant_id']}
+    varyantsiz_urun_ids = {s['urun_id'] for s in satirlar if not s['varyant_id']}
+
+    urunler = Urun.objects.in_bulk(urun_ids)
+
+    # Sepetteki varyantlar ve varyant seçilmemiş ürünlerin tüm varyantları
+    varyantlar = list(
+        UrunVaryanti.objects.select_related('urun', 'renk', 'beden')
+        .filter(Q(pk__in=varyant_ids) | Q(urun_id__in=varyantsiz_urun_ids))
+    )
+    varyant_map = {v.pk: v for v in varyantlar}
+    urun_varyantlari = {}
+    for varyant in varyantlar:
+        urun_varyantlari.setdefault(varyant.urun_id, []).append(varyant)
+
+    # Aynı varyant sepette birden fazla satırda olabilir; stok bellekte takip edilir
+    stok = {v.pk: v.stok_miktari for v in varyantlar}
+    sepette_dusulen = {}  # urun_id -> bu sepette o üründen düşülen miktar
+
+    dusumler = []
+    for satir in satirlar:
+        urun = urunler.get(satir['urun_id'])
+        if urun is None:
+            raise SatisHatasi('Sepetteki ürün bulunamadı!')
+        miktar = satir['miktar']
+
+        if satir['varyant_id']:
+            varyant = varyant_map.get(satir['varyant_id'])
+            if varyant is None or not varyant.aktif or varyant.urun_id != urun.pk:
+                raise SatisHatasi(f'{urun.ad} için geçerli varyant bulunamadı!')
+            if stok[varyant.pk] < miktar:
+                raise SatisHatasi(
+                    f'{urun.ad} ({varyant.varyasyon_adi}) için yeterli stok yok! Mevcut: {stok[varyant.pk]}'
+                )
+        else:
+            # Ürünün stok özetinden, bu sepette daha önce düşülenler hariç
+            tum_varyantlar = urun_varyantlari.get(urun.pk, [])
+            toplam_stok = urun.toplam_stok - sepette_dusulen.get(urun.pk, 0)
+            if toplam_stok < miktar:
+                raise SatisHatasi(f'{urun.ad} için yeterli stok yok! Mevcut: {toplam_stok}')
+
+            varyant = next((v for v in tum_varyantlar if v.aktif and stok[v.pk] > 0), None)
+            if varyant is None:
+                dusumler.append((urun, None))
+                continue
+            if stok[varyant.pk] < miktar:
+                raise SatisHatasi(
+                    f'{urun.ad} ({varyant.varyasyon_adi}) için yeterli stok yok! Mevcut: {stok[varyant.pk]}'
+                )
+
+        stok[varyant.pk] -= miktar
+        sepette_dusulen[urun.pk] = sepette_dusulen.get(urun.pk, 0) + miktar
+        dusumler.append((urun, varyant))
+
+    return dusumler
+
+
+def _odeme(satis, odeme_tipi, tutar, **kwargs):
+    """Odeme.save() içindeki hesaplamayı yaparak kaydedilmemiş Odeme nesnesi oluştur"""
+    odeme = Odeme(satis=satis, odeme_tipi=odeme_tipi, tutar=tutar, **kwargs)
+    if odeme.odeme_tipi == 'kart' and odeme.taksit_sayisi and odeme.taksit_sayisi > 1:
+        odeme.taksit_tutari = odeme.tutar / odeme.taksit_sayisi
+    return odeme
+
+
+def _odeme_tipi(odeme_yontemi):
+    """Satış ekranından gelen ödeme yöntemini Odeme.odeme_tipi değerine çevir"""
+    if odeme_yontemi in ['kart', 'kredi_karti']:
+        return 'kart'
+    if odeme_yontemi in ['havale', 'hediye_ceki']:
+        return odeme_yontemi
+    return 'nakit'
+
+
+def _odemeleri_olustur(satis, odeme_detaylari, genel_toplam, musteri, hediye_ceki_data, kullanici):
+    """Ödeme tipine göre Odeme ve KasaHareket kayıtlarını toplu olarak yaz"""
+    odemeler = []
+
+    if odeme_detaylari.get('tip') == 'karma':
+        karma_detay = odeme_detaylari.get('karma_detay', {})
+        nakit_tutar = Decimal(str(karma_detay.get('nakit', 0)))
+        kart_tutar = Decimal(str(karma_detay.get('kart', 0)))
+        havale_tutar = Decimal(str(karma_detay.get('havale', 0)))
+        hediye_ceki_tutar = Decimal(str(karma_detay.get('hediye_ceki', 0)))
+
+        if nakit_tutar > 0:
+            odemeler.append(_odeme(satis, 'nakit', nakit_tutar))
+        if kart_tutar > 0:
+            karma_kart_taksit = odeme_detaylari.get('karma_kart_taksit', 1)
+            odemeler.append(_odeme(
+                satis, 'kart', kart_tutar,
+                taksit_sayisi=karma_kart_taksit if karma_kart_taksit > 1 else None,
+                banka=odeme_detaylari.get('karma_kart_banka') or None,
+            ))
+        if havale_tutar > 0:
+            odemeler.append(_odeme(satis, 'havale', havale_tutar))
+
+        if hediye_ceki_tutar > 0 and hediye_ceki_data:
+            from hediye.models import HediyeCeki, HediyeCekiKullanim
+
+            try:
+                hediye_ceki = HediyeCeki.objects.select_for_update().get(
+                    kod=hediye_ceki_data['kod'],
+                    durum='aktif'
+                )
+            except HediyeCeki.DoesNotExist:
+                raise SatisHatasi(f'Hediye çeki bulunamadı: {hediye_ceki_data["kod"]}')
+
+            HediyeCekiKullanim.objects.create(
+                hediye_ceki=hediye_ceki,
+                kullanilan_tutar=hediye_ceki_tutar,
+                satis_id=satis.id,
+                kullanan=kullanici,
+                aciklama=f'Satış #{satis.satis_no} - Karma Ödeme'
+            )
+
+            hediye_ceki.kalan_tutar -= hediye_ceki_tutar
+            if hediye_ceki.kalan_tutar <= 0:
+                hediye_ceki.durum = 'kullanilmis'
+            hediye_ceki.save()
+
+            odemeler.append(_odeme(satis, 'hediye_ceki', hediye_ceki_tutar, hediye_ceki_kodu=hediye_ceki.kod))
+
+    elif odeme_detaylari.get('odeme_yontemi') == 'acik_hesap':
+        # Açık hesap bakiyesini güncelle (borç ekle)
+        Musteri.objects.filter(pk=musteri.pk).update(
+            acik_hesap_bakiye=F('acik_hesap_bakiye') + genel_toplam
+        )
+        odemeler.append(_odeme(
+            satis, 'acik_hesap', genel_toplam,
+            aciklama=f'Açık hesap borcu - {musteri.ad} {musteri.soyad}'
+        ))
+
+    else:
+        odeme_tipi = _odeme_tipi(odeme_detaylari.get('odeme_yontemi', 'nakit'))
+        kwargs = {}
+        if odeme_tipi == 'kart':
+            taksit_sayisi = odeme_detaylari.get('taksit_sayisi', 1)
+            kwargs['taksit_sayisi'] = taksit_sayisi if taksit_sayisi > 1 else None
+            if odeme_detaylari.get('banka'):
+                kwargs['banka'] = odeme_detaylari['banka']
+        odemeler.append(_odeme(satis, odeme_tipi, genel_toplam, **kwargs))
+
+    Odeme.objects.bulk_create(odemeler)
+
+    # Her kasa tipinin ilk aktif kasası (Kasa.Meta.ordering sırasıyla)
+    kasa_tipleri = {ODEME_KASALARI[o.odeme_tipi][0] for o in odemeler if o.odeme_tipi in ODEME_KASALARI}
+    kasalar = {}
+    if kasa_tipleri:
+        for kasa in Kasa.objects.filter(tip__in=kasa_tipleri, aktif=True):
+            kasalar.setdefault(kasa.tip, kasa)
+
+    kasa_hareketleri = []
+    for odeme in odemeler:
+        if odeme.odeme_tipi not in ODEME_KASALARI:
+            continue
+        kasa_tipi, etiket = ODEME_KASALARI[odeme.odeme_tipi]
+        kasa = kasalar.get(kasa_tipi)
+        if kasa:
+            kasa_hareketleri.append(KasaHareket(
+                kasa=kasa,
+                tip='giris',
+                kaynak='satis',
+                tutar=odeme.tutar,
+                aciklama=f'Satış #{satis.satis_no} - {etiket}',
+                satis_id=satis.id,
+                kullanici=kullanici
+            ))
+    KasaHareket.toplu_olustur(kasa_hareketleri)
+
+
+def satisi_tamamla(satirlar, *, kullanici, satici, musteri=None, genel_indirim=Decimal('0'),
+                   aciklama='', odeme_detaylari=None, hediye_ceki_data=None):
+    """
+    Sepet satırlarından tamamlanmış satış oluştur.
+
+    Stok, ödeme veya hediye çeki doğrulaması başarısız olursa SatisHatasi
+    fırlatılır ve transaction geri alınır.
+    """
+    odeme_detaylari = odeme_detaylari or {}
+
+    # Stok ayırmadan önce miktar kontrolü; sıfır/negatif miktar stoğu artırırdı
+    if any(satir['miktar'] <= 0 for satir in satirlar):
+        raise SatisHatasi('Ürün miktarı 0\'dan büyük olmalıdır!')
+
+    # Satış toplamını hesapla (fiyatlar KDV dahil)
+    toplam_urun_indirimi = sum((s['indirim_tutari'] for s in satirlar), Decimal('0'))
+    ara_toplam = sum((s['birim_fiyat'] * s['miktar'] for s in satirlar), Decimal('0')) - toplam_urun_indirimi
+    genel_toplam = ara_toplam - genel_indirim
+
+    # Kayıt yazmadan önce yapılabilen ödeme kontrolleri
+    if odeme_detaylari.get('tip') == 'karma':
+        karma_detay = odeme_detaylari.get('karma_detay', {})
+        toplam_odeme = sum(
+            (Decimal(str(karma_detay.get(k, 0))) for k in ('nakit', 'kart', 'havale', 'hediye_ceki')),
+            Decimal('0')
+        )
+        if abs(toplam_odeme - genel_toplam) > Decimal('0.01'):
+            raise SatisHatasi(f'Ödeme tutarları eşleşmiyor! Toplam: {genel_toplam}, Ödenen: {toplam_odeme}')
+    elif odeme_detaylari.get('odeme_yontemi') == 'acik_hesap' and not musteri:
+        raise SatisHatasi('Açık hesap satışı için müşteri seçmelisiniz!')
+
+    with transaction.atomic():
+        dusumler = _stok_dusumlerini_hazirla(satirlar)
+
+        # Stoğu tek koşullu UPDATE ile düş; okuma ile yazma arasında başka bir
+        # kasa aynı varyantı satmışsa burada yakalanır
+        degisimler = {}
+        for satir, (urun, varyant) in zip(satirlar, dusumler):
+            if varyant is not None:
+                degisimler[varyant.pk] = degisimler.get(varyant.pk, 0) - satir['miktar']
+        try:
+            stok_sonuclari = UrunVaryanti.stok_guncelle(degisimler)
+        except YetersizStok as e:
+            varyant = next(v for u, v in dusumler if v is not None and v.pk == e.varyant_idleri[0])
+            mevcut = UrunVaryanti.objects.values_list('stok_miktari', flat=True).get(pk=varyant.pk)
+            raise SatisHatasi(
+                f'{varyant.urun.ad} ({varyant.varyasyon_adi}) için yeterli stok yok! Mevcut: {mevcut}'
+            )
+
+        satis = Satis.objects.create(
+            musteri=musteri,
+            ara_toplam=ara_toplam,
+            indirim_tutari=toplam_urun_indirimi + genel_indirim,
+            kdv_orani=Decimal('0'),  # KDV ayrı hesaplanmıyor
+            kdv_tutari=Decimal('0'),
+            genel_toplam=genel_toplam,
+            toplam_tutar=genel_toplam,
+            durum='tamamlandi',
+            satici=satici,
+            satis_tarihi=timezone.now(),
+            notlar=aciklama,
+        )
+
+        # Aynı varyantın birden fazla satırı için önceki/yeni stok sırayla hesaplanır
+        kalan_stok = {varyant_id: onceki for varyant_id, (onceki, yeni) in stok_sonuclari.items()}
+        detaylar = []
+        hareketler = []
+        for satir, (urun, varyant) in zip(satirlar, dusumler):
+            detaylar.append(SatisDetay(
+                satis=satis,
+                urun=urun,
+                varyant=varyant if satir['varyant_id'] else None,
+                miktar=satir['miktar'],
+                birim_fiyat=satir['birim_fiyat'],
+                indirim_tutari=satir['indirim_tutari'],
+                toplam_fiyat=satir['birim_fiyat'] * satir['miktar'] - satir['indirim_tutari'],
+            ))
+            if varyant is not None:
+                onceki_stok = kalan_stok[varyant.pk]
+                kalan_stok[varyant.pk] = yeni_stok = onceki_stok - satir['miktar']
+                hareketler.append(StokHareket(
+                    varyant=varyant,
+                    hareket_tipi='cikis',
+                    miktar=satir['miktar'],
+                    onceki_stok=onceki_stok,
+                    yeni_stok=yeni_stok,
+                    aciklama=f'Satış: {satis.satis_no}',
+                    referans_id=str(satis.id),
+                    kullanici=kullanici
+                ))
+                varyant.stok_miktari = yeni_stok
+        SatisDetay.objects.bulk_create(detaylar)
+        StokHareket.toplu_olustur(hareketler)
+
+        _odemeleri_olustur(satis, odeme_detaylari, genel_toplam, musteri, hediye_ceki_data, kullanici)
+
+    return satis, genel_toplam
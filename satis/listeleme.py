@@ -0,0 +1,144 @@
+"""
+Satış listesi sorguları ve sayfalama.
+
+Liste sayfasının sorgu sayısı sayfadaki satış sayısından bağımsızdır:
+- Ürün adedi her satış için ilişkili alt sorguyla (urun_adedi) sayfa
+  sorgusunda hesaplanır; müşteri ve satıcı select_related, ödemeler
+  prefetch_related ile gelir.
+- İstatistikler tek aggregate sorgusudur. Satış detaylarına JOIN yapılmadığı
+  için satış sayısı ve ciro kalem sayısıyla çoğalmaz.
+
+Sayfalama: ilk NUMARALI_SAYFA_SINIRI sayfa numaralıdır (OFFSET küçük kalır).
+Daha derine keyset (seek) ile gidilir: sonraki/önceki sayfa, sayfanın son/ilk
+satışının (siparis_tarihi, id) değerinden sonrası olarak okunur; maliyet
+sayfa derinliğinden bağımsızdır ve (-siparis_tarihi, -id) indeksini kullanır.
+"""
+from datetime import datetime
+from urllib.parse import urlencode
+
+from django.core.paginator import Paginator
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+SIRALAMA = ('-siparis_tarihi', '-id')
+TERS_SIRALAMA = ('siparis_tarihi', 'id')
+NUMARALI_SAYFA_SINIRI = 10
+
+
+def urun_adedi_ekle(satislar):
+    """Her satışa kalem miktarları toplamını urun_adedi olarak ekle (JOIN yapmadan)"""
+    from .models import SatisDetay
+
+    adet = (
+        SatisDetay.objects.filter(satis=OuterRef('pk')).order_by()
+        .values('satis').annotate(toplam=Sum('miktar')).values('toplam')
+    )
+    return satislar.annotate(urun_adedi=Coalesce(Subquery(adet, output_field=IntegerField()), Value(0)))
+
+
+def istatistikler(satislar):
+    """Filtrelenmiş satışların sayısı, cirosu ve ürün adedi tek sorguda"""
+    sonuc = urun_adedi_ekle(satislar.order_by()).aggregate(
+        satis_sayisi=Count('id'),
+        toplam_tutar=Sum('genel_toplam'),
+        toplam_adet=Sum('urun_adedi'),
+    )
+    return {anahtar: deger or 0 for anahtar, deger in sonuc.items()}
+
+
+def sayfa_sorgusu(satislar, odemeler=False):
+    """Sayfada gösterilecek satışlar: sıralı, ilişkiler ve ürün adedi yüklenmiş"""
+    satislar = urun_adedi_ekle(satislar.select_related('musteri', 'satici'))
+    if odemeler:
+        satislar = satislar.prefetch_related('odeme_set')
+    return satislar.order_by(*SIRALAMA)
+
+
+def imlec(satis):
+    return f"{satis.siparis_tarihi.isoformat()}_{satis.pk}"
+
+
+def imleci_coz(deger):
+    """'tarih_id' -> (datetime, id); geçersizse None"""
+    try:
+        tarih, pk = (deger or '').rsplit('_', 1)
+        return datetime.fromisoformat(tarih), int(pk)
+    except ValueError:
+        return None
+
+
+def imlec_sayfasi(satislar, boyut, sonra=None, once=None, son=False):
+    """
+    Keyset sayfası: (satışlar, önceki_var, sonraki_var).
+
+    sonra: bu imleçten eski satışlar; once: bu imleçten yeni satışlar;
+    son: en eski satışlar (son sayfa). satislar sayfa_sorgusu ile sıralı olmalıdır.
+    """
+    if once:
+        tarih, pk = once
+        sorgu = satislar.filter(Q(siparis_tarihi__gt=tarih) | Q(siparis_tarihi=tarih, pk__gt=pk))
+        sorgu = sorgu.order_by(*TERS_SIRALAMA)
+    elif son:
+        sorgu = satislar.order_by(*TERS_SIRALAMA)
+    else:
+        tarih, pk = sonra
+        sorgu = satislar.filter(Q(siparis_tarihi__lt=tarih) | Q(siparis_tarihi=tarih, pk__lt=pk))
+
+    nesneler = list(sorgu[:boyut + 1])
+    fazla = len(nesneler) > boyut
+    nesneler = nesneler[:boyut]
+    if once or son:
+        nesneler.reverse()
+        return nesneler, fazla, not son
+    return nesneler, True, fazla
+
+
+def sayfala(satislar, parametreler, boyut, satis_sayisi):
+    """
+    İstek parametrelerine göre sayfayı seç.
+
+    (sayfadaki satışlar, bağlantılar) döndürür; bağlantılar
+    [{'etiket', 'sorgu', 'aktif'}, ...] biçimindedir ve sorgu filtre
+    parametrelerini (parametreler) korur.
+    """
+    filtreler = {anahtar: deger for anahtar, deger in parametreler.items()
+                 if deger and anahtar not in ('page', 'sonra_imlec', 'once_imlec', 'son')}
+
+    def sorgu(**sayfa):
+        return urlencode({**filtreler, **sayfa})
+
+    sonra = imleci_coz(parametreler.get('sonra_imlec'))
+    once = imleci_coz(parametreler.get('once_imlec'))
+    son = bool(parametreler.get('son'))
+
+    baglantilar = []
+    if sonra or once or son:
+        nesneler, onceki_var, sonraki_var = imlec_sayfasi(satislar, boyut, sonra=sonra, once=once, son=son)
+        if nesneler and onceki_var:
+            baglantilar.append({'etiket': 'İlk', 'sorgu': sorgu(page=1)})
+            baglantilar.append({'etiket': 'Önceki', 'sorgu': sorgu(once_imlec=imlec(nesneler[0]))})
+        if nesneler and sonraki_var:
+            baglantilar.append({'etiket': 'Sonraki', 'sorgu': sorgu(sonra_imlec=imlec(nesneler[-1]))})
+            baglantilar.append({'etiket': 'Son', 'sorgu': sorgu(son=1)})
+        return nesneler, baglantilar
+
+    paginator = Paginator(satislar, boyut)
+    paginator.count = satis_sayisi  # İstatistik sorgusunda sayıldı, COUNT tekrarlanmaz
+    sayfa = paginator.get_page(parametreler.get('page'))
+    nesneler = list(sayfa)
+    if not sayfa.has_other_pages():
+        return nesneler, baglantilar
+
+    if sayfa.has_previous():
+        baglantilar.append({'etiket': 'İlk', 'sorgu': sorgu(page=1)})
+        baglantilar.append({'etiket': 'Önceki', 'sorgu': sorgu(page=sayfa.previous_page_number())})
+    son_numara = min(paginator.num_pages, max(NUMARALI_SAYFA_SINIRI, sayfa.number))
+    for numara in range(max(1, sayfa.number - 2), min(son_numara, sayfa.number + 2) + 1):
+        baglantilar.append({'etiket': numara, 'sorgu': sorgu(page=numara), 'aktif': numara == sayfa.number})
+    if sayfa.has_next():
+        if sayfa.number < NUMARALI_SAYFA_SINIRI:
+            baglantilar.append({'etiket': 'Sonraki', 'sorgu': sorgu(page=sayfa.next_page_number())})
+        else:
+            baglantilar.append({'etiket': 'Sonraki', 'sorgu': sorgu(sonra_imlec=imlec(nesneler[-1]))})
+        baglantilar.append({'etiket': 'Son', 'sorgu': sorgu(son=1)})
+    return nesneler, baglantilar
@@ -10,8 +10,8 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         self.stdout.write('Sipariş numaraları düzeltiliyor...')
         
-        # Önce tüm sipariş numarası sayaçlarını sıfırla
-        SiparisNumarasi.objects.all().delete()
+        # Önce sayaçları kayıtlı numaralarla eşitle, yeni numaralar çakışmasın
+        SiparisNumarasi.sayaclari_yeniden_hesapla()
         
         # Yinelenen sipariş numaralarını bul
         from django.db.models import Count
@@ -34,24 +34,7 @@ class Command(BaseCommand):
                     # Tarihe göre yeni sipariş numarası oluştur
                     tarih = satis.siparis_tarihi.date()
                     
-                    # O günün sayacını al veya oluştur
-                    obj, created = SiparisNumarasi.objects.get_or_create(
-                        yil=tarih.year,
-                        ay=tarih.month,
-                        gun=tarih.day,
-                        defaults={'sayac': 0}
-                    )
-                    
-                    obj.sayac += 1
-                    obj.save()
-                    
-                    yeni_no = f"SP{tarih.strftime('%Y%m%d')}{obj.sayac:04d}"
-                    
-                    # Yeni numaranın unique olduğundan emin ol
-                    while Satis.objects.filter(siparis_no=yeni_no).exists():
-                        obj.sayac += 1
-                        obj.save()
-                        yeni_no = f"SP{tarih.strftime('%Y%m%d')}{obj.sayac:04d}"
+                    yeni_no = SiparisNumarasi.sonraki_numara('SP', tarih=tarih)
                     
                     # Raw SQL ile güncelle (save() metodunu bypass et)
                     from django.db import connection
@@ -0,0 +1,211 @@
+"""
+Sabit veri üzerinde view performans ölçümü.
+
+Kasa ve rapor akışındaki view'lar Django test istemcisiyle çağrılır; her
+senaryonun sorgu sayısı SORGU_TAVANLARI ile karşılaştırılır, süreler JSON
+olarak yazılabilir ve önceki bir ölçümle (--karsilastir) kıyaslanabilir.
+Tavanlar veri boyutundan bağımsızdır: bir view'da N+1 sorgu oluşursa
+sentetik mağaza verisinde (sentetik_magaza_olustur) hemen tavanı aşar.
+
+Ölçüm tek transaction içinde yapılır ve sonunda geri alınır; satış
+tamamlama senaryosu veritabanında kayıt bırakmaz. Aynı senaryolar ve
+tavanlar satis/tests/test_performans.py ile test paketinde de çalışır.
+"""
+import json
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from musteri.models import Musteri
+from satis.models import Satis
+from urun.models import Urun, UrunVaryanti
+
+# Senaryo -> izin verilen en fazla sorgu (oturum ve kimlik doğrulama sorguları dahil).
+# Yorumdaki değer SQLite'ta ölçülen sayıdır; tavanlar veritabanları arasındaki
+# küçük farklar (kilit, savepoint) için pay bırakır. Bir tavan ölçülenin
+# altına inerse veya bir view'a bilerek sorgu eklenirse birlikte güncellenir.
+SORGU_TAVANLARI = {
+    'satis_tamamla': 36,  # 29 (3 kalemlik sepet)
+    'barkod_sorgula': 6,  # 2
+    'urun_ara': 8,  # 3
+    'satis_listesi': 8,  # 5
+    'borc_alacak_listesi': 8,  # 4
+    'urun_listesi': 10,  # 5
+    'dashboard': 8,  # 2
+    'gunluk_satis': 15,  # 10
+    'stok_excel': 6,  # 3
+    'satici_raporu': 10,  # 6
+}
+
+
+class SorguSayaci:
+    def __init__(self):
+        self.sorgu = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.sorgu += 1
+        return execute(sql, params, many, context)
+
+
+def senaryolar():
+    """Senaryo adı -> (metot, url, veri, içerik tipi)"""
+    varyantlar = list(
+        UrunVaryanti.objects.filter(aktif=True, stok_miktari__gt=0)
+        .select_related('urun').order_by('-stok_miktari', 'pk')[:3]
+    )
+    if not varyantlar:
+        raise CommandError('Stoklu varyant yok; önce sentetik_magaza_olustur çalıştırın.')
+    son_satis = Satis.objects.filter(satis_tarihi__isnull=False).order_by('-satis_tarihi').first()
+    gun = timezone.localdate(son_satis.satis_tarihi) if son_satis else timezone.localdate()
+    sepet = {
+        'sepet': [
+            {'id': varyant.urun_id, 'varyant_id': varyant.pk, 'miktar': 1, 'fiyat': str(varyant.urun.satis_fiyati)}
+            for varyant in varyantlar
+        ],
+        'odeme_detaylari': {'tip': 'tek', 'odeme_yontemi': 'nakit'},
+    }
+    return {
+        'satis_tamamla': ('post', reverse('satis:satis_tamamla'), json.dumps(sepet), 'application/json'),
+        'barkod_sorgula': ('get', reverse('satis:barkod_sorgula'), {'barkod': varyantlar[0].barkod}, None),
+        'urun_ara': ('get', reverse('satis:urun_ara'), {'q': varyantlar[0].urun.ad[:6]}, None),
+        'satis_listesi': ('get', reverse('satis:liste'), {'view': 'table'}, None),
+        'borc_alacak_listesi': ('get', reverse('musteri:borc_alacak_listesi'), {}, None),
+        'urun_listesi': ('get', reverse('urun:liste'), {}, None),
+        'dashboard': ('get', reverse('dashboard'), {}, None),
+        'gunluk_satis': ('get', reverse('rapor:gunluk_satis'), {'tarih': gun.strftime('%Y-%m-%d')}, None),
+        'stok_excel': ('get', reverse('rapor:stok_excel'), {}, None),
+        'satici_raporu': ('get', reverse('rapor:satici_raporu'), {}, None),
+    }
+
+
+def yanit_basarili(response):
+    """HTTP durumu 400'ün altında ve JSON yanıtsa 'success' alanı yanlış değil mi?"""
+    if response.status_code >= 400:
+        return False
+    if response.get('Content-Type', '').startswith('application/json'):
+        veri = json.loads(response.content)
+        if isinstance(veri, dict) and 'success' in veri:
+            return bool(veri['success'])
+    return True
+
+
+def olc(istemci, istek, tekrar):
+    """İlk (ısınma) çağrıdan sonra tekrar kez ölç"""
+    metot, url, veri, icerik_tipi = istek
+    kwargs = {'content_type': icerik_tipi} if icerik_tipi else {}
+
+    def cagir():
+        response = getattr(istemci, metot)(url, veri, **kwargs)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    cagir()
+    sureler, sorgular, durum, basarili = [], [], None, True
+    for _ in range(max(1, tekrar)):
+        sayac = SorguSayaci()
+        with connection.execute_wrapper(sayac):
+            baslangic = time.perf_counter()
+            response = cagir()
+            sureler.append((time.perf_counter() - baslangic) * 1000)
+        sorgular.append(sayac.sorgu)
+        durum = response.status_code
+        basarili = basarili and yanit_basarili(response)
+    return {
+        'durum': durum,
+        'basarili': basarili,
+        'sorgu': max(sorgular),
+        'ms_medyan': round(statistics.median(sureler), 2),
+        'ms_min': round(min(sureler), 2),
+        'ms_max': round(max(sureler), 2),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Kasa ve rapor view\'larını ölç, sorgu tavanlarını kontrol et ve süreleri JSON olarak kaydet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tekrar', type=int, default=5, help='Senaryo başına ölçüm sayısı (varsayılan: 5)')
+        parser.add_argument('--kullanici', help='İstekleri yapan kullanıcı (varsayılan: ilk aktif süper kullanıcı)')
+        parser.add_argument('--json', dest='json_dosyasi', help='Sonuçların yazılacağı JSON dosyası')
+        parser.add_argument('--karsilastir', help='Önceki ölçümün JSON dosyası; süre ve sorgu farkları raporlanır')
+        parser.add_argument('--tolerans', type=float, default=0.25,
+                            help='Karşılaştırmada gerileme sayılan süre artışı oranı (varsayılan: 0.25)')
+
+    def handle(self, *args, **options):
+        kullanici = self._kullanici(options['kullanici'])
+        istemci = Client(SERVER_NAME='localhost', secure=True)
+        istemci.force_login(kullanici)
+
+        sonuclar = {}
+        with transaction.atomic():
+            for ad, istek in senaryolar().items():
+                sonuclar[ad] = olc(istemci, istek, options['tekrar'])
+            transaction.set_rollback(True)
+
+        sonuc = {
+            'zaman': timezone.now().isoformat(),
+            'veritabani': connection.vendor,
+            'veri': {
+                'urun': Urun.objects.count(),
+                'varyant': UrunVaryanti.objects.count(),
+                'musteri': Musteri.objects.count(),
+                'satis': Satis.objects.count(),
+            },
+            'senaryolar': sonuclar,
+        }
+        onceki = None
+        if options['karsilastir']:
+            with open(options['karsilastir'], encoding='utf-8') as dosya:
+                onceki = json.load(dosya).get('senaryolar', {})
+
+        self.stdout.write(', '.join(f'{sayi} {ad}' for ad, sayi in sonuc['veri'].items()))
+        asimlar = self._raporla(sonuclar, onceki, options['tolerans'])
+
+        if options['json_dosyasi']:
+            with open(options['json_dosyasi'], 'w', encoding='utf-8') as dosya:
+                json.dump(sonuc, dosya, ensure_ascii=False, indent=2)
+            self.stdout.write(f'Sonuçlar yazıldı: {options["json_dosyasi"]}')
+
+        if asimlar:
+            raise CommandError(f'Sorgu tavanı aşıldı veya istek başarısız: {", ".join(asimlar)}')
+        self.stdout.write(self.style.SUCCESS('Performans ölçümü tamamlandı'))
+
+    def _kullanici(self, kullanici_adi):
+        User = get_user_model()
+        if kullanici_adi:
+            try:
+                return User.objects.get(username=kullanici_adi)
+            except User.DoesNotExist:
+                raise CommandError(f'Kullanıcı bulunamadı: {kullanici_adi}')
+        kullanici = User.objects.filter(is_superuser=True, is_active=True).order_by('pk').first()
+        if kullanici is None:
+            raise CommandError('Aktif süper kullanıcı yok; --kullanici verin.')
+        return kullanici
+
+    def _raporla(self, sonuclar, onceki, tolerans):
+        """Tabloyu yaz, tavanı aşan veya başarısız (HTTP hatası, success=false) senaryoların listesini döndür"""
+        asimlar = []
+        self.stdout.write(f'{"senaryo":<20} {"durum":>5} {"sorgu":>6} {"tavan":>6} {"medyan ms":>10} {"min ms":>9}  fark')
+        for ad, olcum in sonuclar.items():
+            tavan = SORGU_TAVANLARI[ad]
+            fark = ''
+            if onceki and ad in onceki:
+                eski = onceki[ad]
+                oran = olcum['ms_medyan'] / eski['ms_medyan'] - 1 if eski['ms_medyan'] else 0
+                fark = f'{oran:+.0%} süre, {olcum["sorgu"] - eski["sorgu"]:+d} sorgu'
+                if oran > tolerans or olcum['sorgu'] > eski['sorgu']:
+                    fark = self.style.WARNING(f'{fark} (gerileme)')
+            satir = (f'{ad:<20} {olcum["durum"]:>5} {olcum["sorgu"]:>6} {tavan:>6} '
+                     f'{olcum["ms_medyan"]:>10.1f} {olcum["ms_min"]:>9.1f}  {fark}')
+            if olcum['sorgu'] > tavan or not olcum['basarili']:
+                asimlar.append(ad)
+                satir = self.style.ERROR(satir)
+            self.stdout.write(satir)
+        return asimlar
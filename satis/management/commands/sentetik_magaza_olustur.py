@@ -0,0 +1,275 @@
+"""
+Performans ölçümü için tekrarlanabilir sentetik mağaza verisi.
+
+Aynı --seed ve boyut parametreleriyle her çalıştırma aynı ürünleri,
+varyantları, müşterileri ve satış geçmişini üretir. Ürünler "Sentetik "
+önekiyle, müşteriler 0000 ile başlayan telefon numaralarıyla oluşturulur;
+veri zaten varsa komut çalışmaz.
+
+Satış geçmişi checkout.py'deki kayıtların aynısını üretir (Satis, SatisDetay,
+Odeme, KasaHareket, açık hesap bakiyesi, müşteri günlük özeti) ancak stok
+düşülmez ve stok hareketi yazılmaz; varyant stokları üretildikleri gibi kalır.
+"""
+import datetime
+import random
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+
+from kasa.models import Kasa, KasaHareket
+from musteri.models import Musteri, MusteriGunlukOzet, MusteriIstatistik
+from satis.checkout import ODEME_KASALARI
+from satis.models import Odeme, Satis, SatisDetay, SiparisNumarasi
+from urun.models import Beden, Marka, Renk, Urun, UrunKategoriUst, UrunVaryanti
+
+URUN_ONEKI = 'Sentetik'
+TELEFON_ONEKI = '0000'
+KATEGORILER = ('Elbise', 'Bluz', 'Pantolon', 'Etek', 'Ceket', 'Gömlek')
+VARSAYILAN_RENKLER = (('Siyah', 'S'), ('Beyaz', 'B'), ('Kırmızı', 'K'), ('Mavi', 'M'), ('Yeşil', 'Y'))
+VARSAYILAN_BEDENLER = (('XS', '1'), ('S', '2'), ('M', '3'), ('L', '4'), ('XL', '5'), ('XXL', '6'))
+ADLAR = ('Ayşe', 'Fatma', 'Zeynep', 'Elif', 'Merve', 'Selin', 'Deniz', 'Ece', 'Derya', 'Gizem')
+SOYADLAR = ('Yılmaz', 'Kaya', 'Demir', 'Şahin', 'Çelik', 'Yıldız', 'Aydın', 'Öztürk', 'Arslan', 'Doğan')
+
+# (ödeme yöntemi, olasılık); acik_hesap yalnızca müşterili satışlarda seçilir
+ODEME_DAGILIMI = (('nakit', 0.45), ('kart', 0.38), ('havale', 0.05), ('karma', 0.06), ('acik_hesap', 0.06))
+
+
+class Command(BaseCommand):
+    help = 'Performans ölçümü için tekrarlanabilir sentetik mağaza verisi (ürün, varyant, müşteri, satış geçmişi) oluştur'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--urun', type=int, default=200, help='Ürün sayısı (varsayılan: 200)')
+        parser.add_argument('--musteri', type=int, default=500, help='Müşteri sayısı (varsayılan: 500)')
+        parser.add_argument('--gun', type=int, default=365, help='Satış geçmişi gün sayısı (varsayılan: 365)')
+        parser.add_argument('--gunluk-satis', type=int, default=20, help='Ortalama günlük satış (varsayılan: 20)')
+        parser.add_argument('--seed', type=int, default=42, help='Rastgele sayı tohumu (varsayılan: 42)')
+        parser.add_argument('--kullanici', help='Kayıtların kullanıcısı (varsayılan: ilk aktif süper kullanıcı)')
+
+    def handle(self, *args, **options):
+        rastgele = random.Random(options['seed'])
+        kullanici = self._kullanici(options['kullanici'])
+
+        if Urun.objects.filter(ad__startswith=f'{URUN_ONEKI} ').exists():
+            raise CommandError('Sentetik ürünler zaten var; komut boş veya sentetik verisi olmayan veritabanında çalışır.')
+        if Musteri.objects.filter(telefon__startswith=TELEFON_ONEKI).exists():
+            raise CommandError('Sentetik müşteriler zaten var.')
+
+        with transaction.atomic():
+            varyantlar = self._urunler(rastgele, options['urun'])
+            musteriler = self._musteriler(rastgele, options['musteri'], kullanici)
+            satis_sayisi = self._satislar(rastgele, varyantlar, musteriler, kullanici,
+                                          options['gun'], options['gunluk_satis'])
+            SiparisNumarasi.sayaclari_yeniden_hesapla()
+            # Satışlar bulk_create ile yazıldı, müşteri özetleri ve istatistikleri kayıtlardan hesaplanır
+            MusteriGunlukOzet.yeniden_olustur(musteriler)
+            MusteriIstatistik.yeniden_olustur(musteriler)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{options["urun"]} ürün, {len(varyantlar)} varyant, {len(musteriler)} müşteri, '
+            f'{satis_sayisi} satış oluşturuldu'
+        ))
+
+    def _kullanici(self, kullanici_adi):
+        User = get_user_model()
+        if kullanici_adi:
+            try:
+                return User.objects.get(username=kullanici_adi)
+            except User.DoesNotExist:
+                raise CommandError(f'Kullanıcı bulunamadı: {kullanici_adi}')
+        kullanici = User.objects.filter(is_superuser=True, is_active=True).order_by('pk').first()
+        if kullanici is None:
+            raise CommandError('Aktif süper kullanıcı yok; --kullanici verin.')
+        return kullanici
+
+    def _ozellikler(self, model, varsayilanlar):
+        kayitlar = list(model.objects.filter(aktif=True).order_by('pk'))
+        if not kayitlar:
+            kayitlar = [model.objects.create(ad=ad, kod=kod) for ad, kod in varsayilanlar]
+        return kayitlar
+
+    def _urunler(self, rastgele, urun_sayisi):
+        """Ürünleri ve renk x beden varyantlarını oluştur, [(varyant_id, urun_id, fiyat), ...] döndür"""
+        kategoriler = [UrunKategoriUst.objects.get_or_create(ad=ad)[0] for ad in KATEGORILER]
+        marka, _ = Marka.objects.get_or_create(ad=URUN_ONEKI)
+        renk_idleri = [renk.pk for renk in self._ozellikler(Renk, VARSAYILAN_RENKLER)]
+        beden_idleri = [beden.pk for beden in self._ozellikler(Beden, VARSAYILAN_BEDENLER)]
+
+        for sira in range(1, urun_sayisi + 1):
+            kategori = rastgele.choice(kategoriler)
+            alis_fiyati = Decimal(rastgele.randrange(100, 1500, 10))
+            urun = Urun.objects.create(
+                ad=f'{URUN_ONEKI} {kategori.ad} {sira:04d}',
+                kategori=kategori,
+                marka=marka,
+                varyasyonlu=True,
+                alis_fiyati=alis_fiyati,
+                kar_orani=Decimal('50'),
+                satis_fiyati=alis_fiyati * Decimal('1.5'),
+            )
+            UrunVaryanti.toplu_olustur(
+                urun,
+                rastgele.sample(renk_idleri, rastgele.randint(1, min(4, len(renk_idleri)))),
+                rastgele.sample(beden_idleri, rastgele.randint(1, len(beden_idleri))),
+                baslangic_stok=rastgele.randint(0, 30),
+            )
+            if sira % 50 == 0:
+                self.stdout.write(f'{sira}/{urun_sayisi} ürün')
+
+        return list(
+            UrunVaryanti.objects.filter(urun__ad__startswith=f'{URUN_ONEKI} ')
+            .order_by('pk').values_list('id', 'urun_id', 'urun__satis_fiyati')
+        )
+
+    def _musteriler(self, rastgele, musteri_sayisi, kullanici):
+        musteriler = [
+            Musteri(
+                ad=rastgele.choice(ADLAR),
+                soyad=rastgele.choice(SOYADLAR),
+                telefon=f'{TELEFON_ONEKI}{sira:07d}',
+                acik_hesap_limit=Decimal(rastgele.choice((0, 0, 1000, 5000))),
+                kaydeden=kullanici,
+            )
+            for sira in range(1, musteri_sayisi + 1)
+        ]
+        Musteri.objects.bulk_create(musteriler, batch_size=1000)
+        return list(Musteri.objects.filter(telefon__startswith=TELEFON_ONEKI).order_by('pk').values_list('id', flat=True))
+
+    def _satislar(self, rastgele, varyantlar, musteriler, kullanici, gun_sayisi, gunluk_satis):
+        """Satış geçmişini ay ay toplu yaz, satış sayısını döndür"""
+        if not varyantlar:
+            return 0
+
+        # Az sayıda ürün çok, geri kalanı seyrek satılır
+        populer = varyantlar[:max(1, len(varyantlar) // 10)]
+        saticilar = list(get_user_model().objects.filter(is_active=True).order_by('pk'))
+        kasalar = {}
+        for kasa in Kasa.objects.filter(tip__in={tip for tip, _ in ODEME_KASALARI.values()}, aktif=True):
+            kasalar.setdefault(kasa.tip, kasa)
+        if not kasalar:
+            self.stdout.write(self.style.WARNING('Aktif kasa yok; kasa hareketi yazılmayacak'))
+
+        bugun = timezone.localdate()
+        gunler = [bugun - datetime.timedelta(days=fark) for fark in range(gun_sayisi, 0, -1)]
+        toplam = 0
+        for baslangic in range(0, len(gunler), 31):
+            satirlar = []
+            for gun in gunler[baslangic:baslangic + 31]:
+                adet = max(0, round(rastgele.gauss(gunluk_satis * (1.4 if gun.weekday() >= 5 else 1), gunluk_satis / 4)))
+                sayac = SiparisNumarasi.objects.filter(
+                    tip='S', yil=gun.year, ay=gun.month, gun=gun.day
+                ).values_list('sayac', flat=True).first() or 0
+                saatler = sorted(rastgele.randint(10 * 3600, 21 * 3600) for _ in range(adet))
+                for numara, saniye in enumerate(saatler, start=sayac + 1):
+                    zaman = timezone.make_aware(datetime.datetime.combine(gun, datetime.time()) + datetime.timedelta(seconds=saniye))
+                    satirlar.append(self._satis_satiri(rastgele, gun, numara, zaman, varyantlar, populer, musteriler, saticilar))
+            toplam += self._satislari_yaz(satirlar, kasalar, kullanici)
+            self.stdout.write(f'{toplam} satış')
+        return toplam
+
+    def _satis_satiri(self, rastgele, gun, numara, zaman, varyantlar, populer, musteriler, saticilar):
+        kalemler = []
+        for _ in range(rastgele.choice((1, 1, 1, 2, 2, 3, 4))):
+            varyant_id, urun_id, fiyat = rastgele.choice(populer) if rastgele.random() < 0.6 else rastgele.choice(varyantlar)
+            miktar = rastgele.choice((1, 1, 1, 2))
+            indirim = (fiyat * miktar * Decimal('0.10')).quantize(Decimal('0.01')) if rastgele.random() < 0.1 else Decimal('0')
+            kalemler.append((varyant_id, urun_id, miktar, fiyat, indirim))
+
+        ara_toplam = sum((fiyat * miktar - indirim for _, _, miktar, fiyat, indirim in kalemler), Decimal('0'))
+        genel_indirim = Decimal(rastgele.choice((0, 0, 0, 0, 50, 100))) if ara_toplam > 500 else Decimal('0')
+        musteri_id = rastgele.choice(musteriler) if musteriler and rastgele.random() < 0.4 else None
+
+        secim, esik = rastgele.random(), 0
+        odeme_yontemi = 'nakit'
+        for yontem, olasilik in ODEME_DAGILIMI:
+            esik += olasilik
+            if secim < esik:
+                odeme_yontemi = yontem
+                break
+        if odeme_yontemi == 'acik_hesap' and musteri_id is None:
+            odeme_yontemi = 'nakit'
+
+        return {
+            'gun': gun,
+            'numara': numara,
+            'zaman': zaman,
+            'kalemler': kalemler,
+            'ara_toplam': ara_toplam,
+            'urun_indirimi': sum((kalem[4] for kalem in kalemler), Decimal('0')),
+            'genel_indirim': genel_indirim,
+            'musteri_id': musteri_id,
+            'satici': rastgele.choice(saticilar),
+            'odeme_yontemi': odeme_yontemi,
+            'taksit': rastgele.choice((1, 1, 1, 3, 6)),
+        }
+
+    def _odemeler(self, satis, satir, genel_toplam):
+        yontem = satir['odeme_yontemi']
+        if yontem == 'karma':
+            nakit = (genel_toplam / 2).quantize(Decimal('0.01'))
+            return [Odeme(satis=satis, odeme_tipi='nakit', tutar=nakit),
+                    Odeme(satis=satis, odeme_tipi='kart', tutar=genel_toplam - nakit)]
+        if yontem == 'acik_hesap':
+            return [Odeme(satis=satis, odeme_tipi='acik_hesap', tutar=genel_toplam, aciklama='Açık hesap borcu')]
+        odeme = Odeme(satis=satis, odeme_tipi=yontem, tutar=genel_toplam)
+        if yontem == 'kart' and satir['taksit'] > 1:
+            odeme.taksit_sayisi = satir['taksit']
+            odeme.taksit_tutari = (genel_toplam / satir['taksit']).quantize(Decimal('0.01'))
+        return [odeme]
+
+    def _satislari_yaz(self, satirlar, kasalar, kullanici):
+        satislar = []
+        for satir in satirlar:
+            genel_toplam = satir['ara_toplam'] - satir['genel_indirim']
+            ek = f"{satir['gun']:%Y%m%d}{satir['numara']:04d}"
+            satislar.append(Satis(
+                siparis_no=f'SP{ek}',
+                satis_no=f'S{ek}',
+                musteri_id=satir['musteri_id'],
+                ara_toplam=satir['ara_toplam'],
+                indirim_tutari=satir['urun_indirimi'] + satir['genel_indirim'],
+                kdv_orani=Decimal('0'),
+                kdv_tutari=Decimal('0'),
+                genel_toplam=genel_toplam,
+                toplam_tutar=genel_toplam,
+                durum='tamamlandi',
+                siparis_tarihi=satir['zaman'],
+                satis_tarihi=satir['zaman'],
+                satici=satir['satici'],
+            ))
+        if not satislar:
+            return 0
+        Satis.objects.bulk_create(satislar, batch_size=1000)
+
+        detaylar, odemeler, kasa_hareketleri, borclar = [], [], [], {}
+        for satis, satir in zip(satislar, satirlar):
+            for varyant_id, urun_id, miktar, fiyat, indirim in satir['kalemler']:
+                detaylar.append(SatisDetay(
+                    satis=satis, urun_id=urun_id, varyant_id=varyant_id, miktar=miktar,
+                    birim_fiyat=fiyat, indirim_tutari=indirim, toplam_fiyat=fiyat * miktar - indirim,
+                ))
+            for odeme in self._odemeler(satis, satir, satis.genel_toplam):
+                odemeler.append(odeme)
+                if odeme.odeme_tipi == 'acik_hesap':
+                    borclar[satis.musteri_id] = borclar.get(satis.musteri_id, Decimal('0')) + odeme.tutar
+                kasa_tipi, etiket = ODEME_KASALARI.get(odeme.odeme_tipi, (None, None))
+                if kasa_tipi in kasalar:
+                    kasa_hareketleri.append(KasaHareket(
+                        kasa=kasalar[kasa_tipi], tip='giris', kaynak='satis', tutar=odeme.tutar,
+                        aciklama=f'Satış #{satis.satis_no} - {etiket}', satis_id=satis.pk,
+                        kullanici=kullanici, tarih=satis.satis_tarihi,
+                    ))
+
+        SatisDetay.objects.bulk_create(detaylar, batch_size=1000)
+        Odeme.objects.bulk_create(odemeler, batch_size=1000)
+        # odeme_tarihi auto_now_add olduğu için satış zamanı sonradan yazılır
+        Odeme.objects.filter(satis__pk__gte=satislar[0].pk, satis__pk__lte=satislar[-1].pk).update(odeme_tarihi=Subquery(
+            Satis.objects.filter(pk=OuterRef('satis_id')).values('satis_tarihi')[:1]
+        ))
+        KasaHareket.toplu_olustur(kasa_hareketleri)
+        for musteri_id, borc in borclar.items():
+            Musteri.objects.filter(pk=musteri_id).update(acik_hesap_bakiye=F('acik_hesap_bakiye') + borc)
+        return len(satislar)
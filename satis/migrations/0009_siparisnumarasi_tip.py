@@ -0,0 +1,51 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:08
+
+from django.db import migrations, models
+
+
+def satis_sayaclarini_olustur(apps, schema_editor):
+    """Bugüne kadar verilen S/SP numaralarından günlük sayaçları oluştur"""
+    Satis = apps.get_model('satis', 'Satis')
+    SiparisNumarasi = apps.get_model('satis', 'SiparisNumarasi')
+
+    sayaclar = {}
+    for alan, tip in (('siparis_no', 'SP'), ('satis_no', 'S')):
+        for numara in Satis.objects.filter(**{f'{alan}__startswith': tip}).values_list(alan, flat=True):
+            govde = numara[len(tip):]
+            if len(govde) != 12 or not govde.isdigit():
+                continue
+            anahtar = (tip, govde[:8])
+            sayaclar[anahtar] = max(sayaclar.get(anahtar, 0), int(govde[8:]))
+
+    for (tip, gun), sayac in sayaclar.items():
+        obj, created = SiparisNumarasi.objects.get_or_create(
+            tip=tip, yil=int(gun[:4]), ay=int(gun[4:6]), gun=int(gun[6:]),
+            defaults={'sayac': sayac}
+        )
+        if obj.sayac < sayac:
+            obj.sayac = sayac
+            obj.save(update_fields=['sayac'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('satis', '0008_alter_satissiparisidetay_siparis'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='siparisnumarasi',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='siparisnumarasi',
+            name='tip',
+            field=models.CharField(choices=[('SP', 'Sipariş No'), ('S', 'Satış No')], default='SP', max_length=2, verbose_name='Numara Tipi'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='siparisnumarasi',
+            unique_together={('tip', 'yil', 'ay', 'gun')},
+        ),
+        migrations.RunPython(satis_sayaclarini_olustur, migrations.RunPython.noop),
+    ]
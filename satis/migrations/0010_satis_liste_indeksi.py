@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('musteri', '0002_tahsilat_taksit_sayisi'),
+        ('satis', '0009_siparisnumarasi_tip'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='satis',
+            index=models.Index(fields=['-siparis_tarihi', '-id'], name='satis_satis_siparis_419b8f_idx'),
+        ),
+    ]
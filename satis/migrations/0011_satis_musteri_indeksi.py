@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('musteri', '0003_musteri_gunluk_ozet'),
+        ('satis', '0010_satis_liste_indeksi'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='satis',
+            index=models.Index(fields=['musteri', 'satis_tarihi'], name='satis_satis_musteri_e83c1b_idx'),
+        ),
+    ]
@@ -6,56 +6,98 @@ from musteri.models import Musteri
 
 
 class SiparisNumarasi(models.Model):
-    """Sipariş numarası sayacı için model"""
+    """Sipariş (SP) ve satış (S) numarası için günlük sayaç modeli"""
+    NUMARA_TIPLERI = [
+        ('SP', 'Sipariş No'),
+        ('S', 'Satış No'),
+    ]
+    
+    tip = models.CharField(max_length=2, choices=NUMARA_TIPLERI, default='SP', verbose_name="Numara Tipi")
     yil = models.PositiveIntegerField(verbose_name="Yıl")
     ay = models.PositiveIntegerField(verbose_name="Ay")
     gun = models.PositiveIntegerField(verbose_name="Gün")
     sayac = models.PositiveIntegerField(default=0, verbose_name="Günlük Sayaç")
     
     class Meta:
-        unique_together = ('yil', 'ay', 'gun')
+        unique_together = ('tip', 'yil', 'ay', 'gun')
         verbose_name = "Sipariş Numarası"
         verbose_name_plural = "Sipariş Numaraları"
     
     @classmethod
-    def sonraki_numara_preview(cls):
-        """Sonraki sipariş numarasını preview olarak göster (sayacı artırmaz)"""
-        import datetime
-        bugun = datetime.date.today()
+    def sonraki_numara_preview(cls, tip='SP'):
+        """Sonraki numarayı preview olarak göster (sayacı artırmaz)"""
+        bugun = timezone.localdate()
         
-        try:
-            obj = cls.objects.get(
-                yil=bugun.year,
-                ay=bugun.month, 
-                gun=bugun.day
-            )
-            sonraki_numara = obj.sayac + 1
-        except cls.DoesNotExist:
-            sonraki_numara = 1
+        sayac = cls.objects.filter(
+            tip=tip,
+            yil=bugun.year,
+            ay=bugun.month,
+            gun=bugun.day
+        ).values_list('sayac', flat=True).first() or 0
         
-        return f"SP{bugun.strftime('%Y%m%d')}{sonraki_numara:04d}"
+        return f"{tip}{bugun.strftime('%Y%m%d')}{sayac + 1:04d}"
     
     @classmethod
-    def sonraki_numara(cls):
-        """Sonraki sipariş numarasını oluştur ve sayacı artır"""
-        from django.db import transaction
-        import datetime
+    def sonraki_numara(cls, tip='SP', tarih=None):
+        """
+        Sonraki numarayı oluştur ve sayacı artır.
+
+        Günün sayaç satırı tek bir INSERT ... ON CONFLICT DO UPDATE ... RETURNING
+        sorgusuyla oluşturulur veya artırılır; tekrar deneme ya da ek kontrol
+        sorgusu gerekmez. Satır kilidi yalnızca çağıran transaction bitene kadar
+        tutulur, satış geri alınırsa numara da geri alınır.
+        """
+        from django.db import connection, transaction
+        from django.db.models import F
         
-        bugun = datetime.date.today()
+        tarih = tarih or timezone.localdate()
         
-        with transaction.atomic():
-            # SELECT FOR UPDATE kullanarak race condition'ı önle
-            obj, created = cls.objects.select_for_update().get_or_create(
-                yil=bugun.year,
-                ay=bugun.month, 
-                gun=bugun.day,
-                defaults={'sayac': 0}
+        if connection.vendor in ('postgresql', 'sqlite'):
+            tablo = connection.ops.quote_name(cls._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {tablo} (tip, yil, ay, gun, sayac) VALUES (%s, %s, %s, %s, 1) "
+                    f"ON CONFLICT (tip, yil, ay, gun) DO UPDATE SET sayac = {tablo}.sayac + 1 "
+                    f"RETURNING sayac",
+                    [tip, tarih.year, tarih.month, tarih.day]
+                )
+                sayac = cursor.fetchone()[0]
+        else:
+            with transaction.atomic():
+                obj, created = cls.objects.select_for_update().get_or_create(
+                    tip=tip,
+                    yil=tarih.year,
+                    ay=tarih.month,
+                    gun=tarih.day
+                )
+                cls.objects.filter(pk=obj.pk).update(sayac=F('sayac') + 1)
+                sayac = obj.sayac + 1
+        
+        return f"{tip}{tarih.strftime('%Y%m%d')}{sayac:04d}"
+    
+    @classmethod
+    def sayaclari_yeniden_hesapla(cls):
+        """Sayaçları kayıtlı satışlardaki en büyük sıra numarasına eşitle"""
+        sayaclar = {}
+        for alan, tip in (('siparis_no', 'SP'), ('satis_no', 'S')):
+            numaralar = Satis.objects.filter(**{f'{alan}__startswith': tip}).values_list(alan, flat=True)
+            for numara in numaralar:
+                govde = numara[len(tip):]
+                # Zaman damgalı eski numaralar (S20250101HHMMSS gibi) atlanır
+                if len(govde) != 12 or not govde.isdigit():
+                    continue
+                anahtar = (tip, govde[:8])
+                sayaclar[anahtar] = max(sayaclar.get(anahtar, 0), int(govde[8:]))
+        
+        for (tip, gun), sayac in sayaclar.items():
+            cls.objects.update_or_create(
+                tip=tip,
+                yil=int(gun[:4]),
+                ay=int(gun[4:6]),
+                gun=int(gun[6:]),
+                defaults={'sayac': sayac}
             )
-            
-            obj.sayac += 1
-            obj.save()
-            
-            return f"SP{bugun.strftime('%Y%m%d')}{obj.sayac:04d}"
+        return len(sayaclar)
 
 
 class Satis(models.Model):
@@ -93,6 +135,11 @@ class Satis(models.Model):
         verbose_name = "Satış"
         verbose_name_plural = "Satışlar"
         ordering = ['-siparis_tarihi']
+        indexes = [
+            # Satış listesi sıralaması ve keyset sayfalama (satis/listeleme.py)
+            models.Index(fields=['-siparis_tarihi', '-id']),
+            models.Index(fields=['musteri', 'satis_tarihi']),
+        ]
 
     def __str__(self):
         return f"Sipariş {self.siparis_no} - {self.toplam_tutar} TL"
@@ -100,65 +147,11 @@ class Satis(models.Model):
     def save(self, *args, **kwargs):
         # Sipariş numarası otomatik oluştur
         if not self.siparis_no:
-            from django.db import transaction, IntegrityError
-            max_retries = 10
-            for attempt in range(max_retries):
-                try:
-                    with transaction.atomic():
-                        # Sipariş numarasını al
-                        temp_siparis_no = SiparisNumarasi.sonraki_numara()
-                        
-                        # Aynı numaraya sahip başka satış var mı kontrol et
-                        if not Satis.objects.filter(siparis_no=temp_siparis_no).exists():
-                            self.siparis_no = temp_siparis_no
-                            break
-                        else:
-                            # Eğer numara kullanılmışsa bir sonrakini dene
-                            continue
-                            
-                except IntegrityError as e:
-                    if attempt == max_retries - 1:  # Son deneme
-                        # Fallback: timestamp ekleyerek unique yap
-                        import time
-                        self.siparis_no = f"SP{int(time.time())}"
-                        break
-                    continue
-                except Exception as e:
-                    if attempt == max_retries - 1:  # Son deneme
-                        raise e
-                    continue
+            self.siparis_no = SiparisNumarasi.sonraki_numara('SP')
         
         # Satış numarası (ödeme tamamlandığında oluşturulur)
         if not self.satis_no and self.durum == 'tamamlandi':
-            import datetime
-            today = datetime.date.today()
-            
-            # Race condition'ı önlemek için retry mekanizması
-            max_attempts = 10
-            for attempt in range(max_attempts):
-                # Bugün tamamlanan satışları say
-                existing_count = Satis.objects.filter(
-                    satis_tarihi__date=today, 
-                    durum='tamamlandi',
-                    satis_no__isnull=False
-                ).count()
-                
-                # Yeni satis_no oluştur
-                new_satis_no = f"S{today.strftime('%Y%m%d')}{(existing_count + 1):04d}"
-                
-                # Bu satis_no daha önce kullanılmış mı kontrol et
-                if not Satis.objects.filter(satis_no=new_satis_no).exists():
-                    self.satis_no = new_satis_no
-                    break
-                else:
-                    # Eğer varsa bir sonrakini dene
-                    continue
-            
-            # Eğer hiçbir attempt başarılı olamazsa timestamp ekle
-            if not self.satis_no:
-                from django.utils import timezone
-                timestamp = timezone.now().strftime('%H%M%S')
-                self.satis_no = f"S{today.strftime('%Y%m%d')}{timestamp}"
+            self.satis_no = SiparisNumarasi.sonraki_numara('S')
             
             if not self.satis_tarihi:
                 self.satis_tarihi = timezone.now()
@@ -167,7 +160,27 @@ class Satis(models.Model):
         self.kdv_tutari = self.ara_toplam * (self.kdv_orani / 100)
         self.toplam_tutar = self.ara_toplam + self.kdv_tutari
         
-        super().save(*args, **kwargs)
+        from django.db import transaction
+        from musteri.models import MusteriGunlukOzet, MusteriIstatistik
+
+        with transaction.atomic():
+            eski = None
+            if self.pk:
+                eski = Satis.objects.filter(pk=self.pk).values(
+                    'musteri_id', 'durum', 'toplam_tutar', 'satis_tarihi').first()
+            super().save(*args, **kwargs)
+            MusteriGunlukOzet.satis_degisti(eski, self)
+            MusteriIstatistik.satis_degisti(eski, self)
+
+    def delete(self, *args, **kwargs):
+        from django.db import transaction
+        from musteri.models import MusteriGunlukOzet, MusteriIstatistik
+
+        with transaction.atomic():
+            MusteriGunlukOzet.satis_degisti(self, None)
+            sonuc = super().delete(*args, **kwargs)
+            MusteriIstatistik.satis_degisti(self, None)
+            return sonuc
 
     @property
     def toplam_urun_adedi(self):
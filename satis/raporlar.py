@@ -0,0 +1,159 @@
+"""
+Satış elemanı raporları için gruplanmış sorgular.
+
+Her fonksiyon satıcı veya gün başına döngü kurmadan tek bir GROUP BY sorgusu
+çalıştırır; rapor süresi satıcı sayısından bağımsızdır. rapor.views.satici_raporu
+ve satis.views.satici_rapor / satici_gunluk / satici_aylik bu modülü kullanır.
+
+Tarih aralıkları gün olarak verilir (bitis=None ise üst sınır yok) ve yerel
+saat dilimindeki güne göre filtrelenir.
+"""
+from decimal import Decimal
+
+from django.db.models import Avg, Count, F, Sum, Window
+from django.db.models.functions import RowNumber, TruncDate
+
+TAMAMLANDI = 'tamamlandi'
+
+
+def _tarih_filtresi(alan, baslangic, bitis):
+    if bitis is None:
+        return {f'{alan}__date__gte': baslangic}
+    return {f'{alan}__date__range': [baslangic, bitis]}
+
+
+def donem_satislari(baslangic, bitis, tarih_alani='satis_tarihi', satici_idleri=None):
+    """Dönemdeki tamamlanmış satışlar"""
+    from .models import Satis
+
+    queryset = Satis.objects.filter(durum=TAMAMLANDI, **_tarih_filtresi(tarih_alani, baslangic, bitis))
+    if satici_idleri is not None:
+        queryset = queryset.filter(satici_id__in=satici_idleri)
+    return queryset
+
+
+def donem_satis_detaylari(baslangic, bitis, tarih_alani='satis_tarihi', satici_idleri=None):
+    """Dönemdeki tamamlanmış satışların kalemleri"""
+    from .models import SatisDetay
+
+    queryset = SatisDetay.objects.filter(
+        satis__durum=TAMAMLANDI, **_tarih_filtresi(f'satis__{tarih_alani}', baslangic, bitis)
+    )
+    if satici_idleri is not None:
+        queryset = queryset.filter(satis__satici_id__in=satici_idleri)
+    return queryset
+
+
+def donem_iadeleri(baslangic, bitis, satici_idleri=None):
+    """Dönemde iade karşılığı oluşturulan hediye çekleri"""
+    from hediye.models import HediyeCeki
+
+    # İadeler hediye çeki olarak verilir
+    queryset = HediyeCeki.objects.filter(
+        aciklama__icontains='İade', **_tarih_filtresi('olusturma_tarihi', baslangic, bitis)
+    )
+    if satici_idleri is not None:
+        queryset = queryset.filter(olusturan_id__in=satici_idleri)
+    return queryset
+
+
+def satici_ozetleri(baslangic, bitis=None, tarih_alani='satis_tarihi', satici_idleri=None):
+    """{satici_id: {'toplam_tutar', 'satis_sayisi', 'ortalama_satis'}} - tek GROUP BY"""
+    satirlar = (
+        donem_satislari(baslangic, bitis, tarih_alani, satici_idleri)
+        .values('satici_id')
+        # Avg, alanla aynı adı taşıyan Sum annotation'ından önce çözülmeli
+        .annotate(ortalama_satis=Avg('toplam_tutar'), satis_sayisi=Count('id'), toplam_tutar=Sum('toplam_tutar'))
+        .order_by()
+    )
+    return {satir.pop('satici_id'): satir for satir in satirlar}
+
+
+def satici_urun_adetleri(baslangic, bitis=None, tarih_alani='satis_tarihi', satici_idleri=None):
+    """{satici_id: satılan ürün adedi} - tek GROUP BY"""
+    satirlar = (
+        donem_satis_detaylari(baslangic, bitis, tarih_alani, satici_idleri)
+        .values('satis__satici_id')
+        .annotate(toplam_adet=Sum('miktar'))
+        .order_by()
+    )
+    return {satir['satis__satici_id']: satir['toplam_adet'] or 0 for satir in satirlar}
+
+
+def en_cok_satanlar(baslangic, bitis=None, tarih_alani='satis_tarihi', satici_idleri=None):
+    """
+    {satici_id: {'urun__ad', 'toplam_adet', 'toplam_tutar'}} - her satıcının en çok sattığı ürün.
+
+    Satıcı + ürün bazında gruplanan satırlar satıcı içinde adede göre
+    ROW_NUMBER ile sıralanır, yalnızca birinciler döner.
+    """
+    satirlar = (
+        donem_satis_detaylari(baslangic, bitis, tarih_alani, satici_idleri)
+        .values('satis__satici_id', 'urun_id', 'urun__ad')
+        .annotate(toplam_adet=Sum('miktar'), toplam_tutar=Sum('toplam_fiyat'))
+        .annotate(sira=Window(
+            RowNumber(),
+            partition_by=[F('satis__satici_id')],
+            order_by=[F('toplam_adet').desc(), F('urun__ad').asc()],
+        ))
+        .filter(sira=1)
+        .order_by()
+    )
+    return {
+        satir['satis__satici_id']: {
+            'urun__ad': satir['urun__ad'],
+            'toplam_adet': satir['toplam_adet'],
+            'toplam_tutar': satir['toplam_tutar'],
+        }
+        for satir in satirlar
+    }
+
+
+def iade_ozetleri(baslangic, bitis=None, satici_idleri=None):
+    """{satici_id: {'tutar', 'adet'}} - iadeleri oluşturan kullanıcıya göre tek GROUP BY"""
+    satirlar = (
+        donem_iadeleri(baslangic, bitis, satici_idleri)
+        .values('olusturan_id')
+        .annotate(tutar=Sum('tutar'), adet=Count('id'))
+        .order_by()
+    )
+    return {satir.pop('olusturan_id'): satir for satir in satirlar}
+
+
+def gunluk_satislar(baslangic, bitis, tarih_alani='satis_tarihi', satici_idleri=None):
+    """{tarih: {'tutar', 'adet'}} - gün bazında tek GROUP BY"""
+    satirlar = (
+        donem_satislari(baslangic, bitis, tarih_alani, satici_idleri)
+        .annotate(gun=TruncDate(tarih_alani))
+        .values('gun')
+        .annotate(tutar=Sum('toplam_tutar'), adet=Count('id'))
+        .order_by()
+    )
+    return {satir.pop('gun'): satir for satir in satirlar}
+
+
+def gunluk_iadeler(baslangic, bitis, satici_idleri=None):
+    """{tarih: {'tutar', 'adet'}} - gün bazında tek GROUP BY"""
+    satirlar = (
+        donem_iadeleri(baslangic, bitis, satici_idleri)
+        .annotate(gun=TruncDate('olusturma_tarihi'))
+        .values('gun')
+        .annotate(tutar=Sum('tutar'), adet=Count('id'))
+        .order_by()
+    )
+    return {satir.pop('gun'): satir for satir in satirlar}
+
+
+def satis_iade_ozeti(satis, iade):
+    """Satış ve iade toplamlarından raporların kullandığı özet sözlüğü"""
+    satis = satis or {}
+    iade = iade or {}
+    satis_tutari = satis.get('toplam_tutar', satis.get('tutar')) or Decimal('0')
+    iade_tutari = iade.get('tutar') or Decimal('0')
+    return {
+        'satis_tutari': satis_tutari,
+        'satis_adedi': satis.get('satis_sayisi', satis.get('adet')) or 0,
+        'iade_tutari': iade_tutari,
+        'iade_adedi': iade.get('adet') or 0,
+        'net_satis': satis_tutari - iade_tutari,
+    }
@@ -0,0 +1,88 @@
+import re
+import threading
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from satis.models import Satis, SiparisNumarasi
+
+# Sayaçtan üretilen numara: tip + YYYYMMDD + 4 haneli sıra (zaman damgalı eski biçim değil)
+NUMARA = re.compile(r'^(SP|S)(\d{8})(\d{4})$')
+
+
+def satis_olustur():
+    return Satis.objects.create(
+        ara_toplam=Decimal('100'),
+        kdv_orani=Decimal('0'),
+        kdv_tutari=Decimal('0'),
+        genel_toplam=Decimal('100'),
+        toplam_tutar=Decimal('100'),
+        durum='tamamlandi',
+    )
+
+
+def siralar(numaralar, tip):
+    """Numaraların sayaç sırası; hepsi bugünün sayaç biçiminde olmalıdır"""
+    gun = timezone.localdate().strftime('%Y%m%d')
+    sonuc = []
+    for numara in numaralar:
+        eslesme = NUMARA.match(numara or '')
+        assert eslesme and eslesme.group(1) == tip and eslesme.group(2) == gun, numara
+        sonuc.append(int(eslesme.group(3)))
+    return sorted(sonuc)
+
+
+class SiparisNumarasiTest(TestCase):
+    def test_numaralar_gun_sayacindan_sirayla_verilir(self):
+        satislar = [satis_olustur() for _ in range(3)]
+
+        self.assertEqual(siralar([s.siparis_no for s in satislar], 'SP'), [1, 2, 3])
+        self.assertEqual(siralar([s.satis_no for s in satislar], 'S'), [1, 2, 3])
+
+    def test_onizleme_sayaci_artirmaz(self):
+        onizleme = SiparisNumarasi.sonraki_numara_preview('SP')
+
+        self.assertEqual(onizleme, SiparisNumarasi.sonraki_numara_preview('SP'))
+        self.assertEqual(satis_olustur().siparis_no, onizleme)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Eşzamanlı numara testi PostgreSQL gerektirir')
+class SiparisNumarasiEszamanlilikTest(TransactionTestCase):
+    """Aynı gün paralel satış oluşturan işlemler benzersiz ve ardışık numara almalıdır"""
+    IS_PARCACIGI = 16
+    PARCACIK_BASINA_SATIS = 5
+
+    def test_paralel_satislar_benzersiz_ve_ardisik_numara_alir(self):
+        baslat = threading.Barrier(self.IS_PARCACIGI)
+        satislar, hatalar = [], []
+        kilit = threading.Lock()
+
+        def calis():
+            try:
+                baslat.wait()
+                for _ in range(self.PARCACIK_BASINA_SATIS):
+                    with transaction.atomic():
+                        satis = satis_olustur()
+                    with kilit:
+                        satislar.append((satis.siparis_no, satis.satis_no))
+            except Exception as hata:  # Ana iş parçacığında raporlanır
+                with kilit:
+                    hatalar.append(hata)
+            finally:
+                connection.close()
+
+        parcaciklar = [threading.Thread(target=calis) for _ in range(self.IS_PARCACIGI)]
+        for parcacik in parcaciklar:
+            parcacik.start()
+        for parcacik in parcaciklar:
+            parcacik.join()
+
+        self.assertEqual(hatalar, [])
+        adet = self.IS_PARCACIGI * self.PARCACIK_BASINA_SATIS
+        beklenen = list(range(1, adet + 1))
+        self.assertEqual(siralar([siparis_no for siparis_no, _ in satislar], 'SP'), beklenen)
+        self.assertEqual(siralar([satis_no for _, satis_no in satislar], 'S'), beklenen)
+        self.assertEqual(Satis.objects.count(), adet)
@@ -0,0 +1,31 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+
+from satis.management.commands.performans_olcumu import SORGU_TAVANLARI, olc, senaryolar
+
+
+class PerformansOlcumuTest(TestCase):
+    """performans_olcumu senaryoları küçük sentetik mağazada: yanıt başarılı, sorgu sayısı tavanın altında"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.kullanici = get_user_model().objects.create_superuser('olcum', 'olcum@example.com', 'olcum')
+        call_command(
+            'sentetik_magaza_olustur', urun=12, musteri=20, gun=10, gunluk_satis=6,
+            kullanici='olcum', stdout=StringIO(),
+        )
+
+    def setUp(self):
+        self.istemci = Client(SERVER_NAME='localhost', secure=True)
+        self.istemci.force_login(self.kullanici)
+
+    def test_senaryolar_tavanlarin_altinda(self):
+        for ad, istek in senaryolar().items():
+            with self.subTest(senaryo=ad):
+                olcum = olc(self.istemci, istek, tekrar=1)
+                self.assertEqual(olcum['durum'], 200)
+                self.assertTrue(olcum['basarili'])
+                self.assertLessEqual(olcum['sorgu'], SORGU_TAVANLARI[ad])
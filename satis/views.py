@@ -5,10 +5,9 @@ from django.http import JsonResponse
 from django.core.paginator import Paginator
 from django.db.models import Q
 from django.views.decorators.csrf import csrf_exempt
-from .models import Satis, SatisDetay, Odeme, SiparisNumarasi
+from .models import Satis, Odeme, SiparisNumarasi
 from urun.models import Urun, UrunVaryanti
 from musteri.models import Musteri
-from kasa.models import Kasa, KasaHareket
 
 
 # @login_required  # TEST İÇİN GEÇİCİ OLARAK KALDIRILDI
@@ -91,10 +90,10 @@ def satis_ekrani(request):
 @login_required
 def satis_listesi(request):
     """Satış listesi view'ı"""
-    from django.db.models import Sum, Count, Avg
     from datetime import datetime
+    from . import listeleme
     
-    satislar = Satis.objects.all().order_by('-siparis_tarihi')
+    satislar = Satis.objects.all()
     
     # Arama
     query = request.GET.get('q')
@@ -129,37 +128,38 @@ def satis_listesi(request):
     if durum:
         satislar = satislar.filter(durum=durum)
     
-    # İstatistikler hesaplama
-    istatistikler = satislar.aggregate(
-        toplam_tutar=Sum('genel_toplam'),  # genel_toplam alanını kullan
-        toplam_adet=Sum('satisdetay__miktar'),
-        satış_sayısı=Count('id')
-    )
+    # İstatistikler tek sorguda (satış detaylarına JOIN yapılmaz, sayılar çoğalmaz)
+    istatistikler = listeleme.istatistikler(satislar)
     
     # Ortalama satışı manuel hesapla
     ortalama_satis = 0
-    if istatistikler['satış_sayısı'] and istatistikler['satış_sayısı'] > 0:
-        ortalama_satis = istatistikler['toplam_tutar'] / istatistikler['satış_sayısı']
+    if istatistikler['satis_sayisi'] > 0:
+        ortalama_satis = istatistikler['toplam_tutar'] / istatistikler['satis_sayisi']
     
     # Görünüm modu (card/table)
     view_mode = request.GET.get('view', 'card')  # varsayılan card görünümü
     
-    # Sayfalama (görünüm moduna göre sayfa başına öğe sayısı)
+    # Sayfalama (görünüm moduna göre sayfa başına öğe sayısı); derin sayfalar keyset ile
     items_per_page = 12 if view_mode == 'card' else 20
-    paginator = Paginator(satislar, items_per_page)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj, sayfa_baglantilari = listeleme.sayfala(
+        listeleme.sayfa_sorgusu(satislar, odemeler=view_mode == 'table'),
+        request.GET.dict(),
+        items_per_page,
+        istatistikler['satis_sayisi'],
+    )
     
     # Sayfa toplamını hesapla
     sayfa_toplam_tutar = sum([satis.toplam_tutar for satis in page_obj])
-    sayfa_toplam_adet = sum([satis.toplam_urun_adedi for satis in page_obj])
+    sayfa_toplam_adet = sum([satis.urun_adedi for satis in page_obj])
     
     context = {
         'page_obj': page_obj,
+        'sayfa_baglantilari': sayfa_baglantilari,
+        'satis_sayisi': istatistikler['satis_sayisi'],
         'query': query,
         'view_mode': view_mode,
-        'toplam_tutar': istatistikler['toplam_tutar'] or 0,
-        'toplam_adet': istatistikler['toplam_adet'] or 0,
+        'toplam_tutar': istatistikler['toplam_tutar'],
+        'toplam_adet': istatistikler['toplam_adet'],
         'sayfa_toplam_tutar': sayfa_toplam_tutar,
         'sayfa_toplam_adet': sayfa_toplam_adet,
         'ortalama_satis': ortalama_satis,
@@ -198,7 +198,7 @@ def satis_tamamla(request):
     if request.method == 'POST':
         import json
         from decimal import Decimal
-        from datetime import datetime
+        from .checkout import sepet_satirlari, satisi_tamamla, SatisHatasi
         
         try:
             # JSON verisini parse et
@@ -209,6 +209,7 @@ def satis_tamamla(request):
                 odeme_detaylari = data.get('odeme_detaylari', {})
             else:
                 # Form verisini al
+                data = {}
                 sepet_data = request.session.get('sepet', {})
                 musteri_id = request.POST.get('musteri_id')
                 odeme_detaylari = {
@@ -227,35 +228,6 @@ def satis_tamamla(request):
                 except Musteri.DoesNotExist:
                     pass
             
-            # Satış toplamını hesapla
-            ara_toplam = Decimal('0')
-            toplam_urun_indirimi = Decimal('0')
-            
-            for item in sepet_data:
-                if isinstance(item, dict):  # JSON format
-                    fiyat = Decimal(str(item['fiyat']))
-                    miktar = int(item['miktar'])
-                    urun_indirimi = Decimal(str(item.get('urun_indirim', item.get('indirim', 0))))
-                    toplam_urun_indirimi += urun_indirimi
-                    ara_toplam += (fiyat * miktar) - urun_indirimi
-                else:  # Session format
-                    fiyat = Decimal(str(sepet_data[item]['fiyat']))
-                    miktar = int(sepet_data[item]['miktar'])
-                    ara_toplam += fiyat * miktar
-            
-            # Genel indirim
-            genel_indirim = Decimal(str(data.get('genel_indirim', 0)))
-            toplam_indirim = toplam_urun_indirimi + genel_indirim
-            
-            # Genel indirim sonrası ara toplam (KDV hesaplaması kaldırıldı)
-            indirim_sonrasi_toplam = ara_toplam - genel_indirim
-            
-            # Fiyatlar zaten KDV dahil olduğu için ayrıca KDV hesaplaması yapılmıyor
-            genel_toplam = indirim_sonrasi_toplam
-            
-            # Açıklama bilgisini al
-            aciklama = data.get('aciklama', '').strip() if data else ''
-            
             # Satış elemanı bilgisini al
             satici_id = data.get('satici_id')
             if satici_id:
@@ -267,328 +239,20 @@ def satis_tamamla(request):
             else:
                 satici = request.user
             
-            # Satış oluştur
-            satis = Satis.objects.create(
-                musteri=musteri,
-                ara_toplam=ara_toplam,  # İndirim öncesi ara toplam
-                indirim_tutari=toplam_indirim,  # Toplam indirim
-                kdv_orani=Decimal('0'),  # KDV ayrı hesaplanmıyor
-                kdv_tutari=Decimal('0'),  # KDV ayrı hesaplanmıyor
-                genel_toplam=genel_toplam,
-                toplam_tutar=genel_toplam,
-                durum='tamamlandi',
-                satici=satici,  # Seçilen satış elemanı
-                satis_tarihi=datetime.now(),
-                notlar=aciklama,  # Açıklama/not bilgisini kaydet
-            )
-            
-            # Satış detaylarını oluştur ve stokları güncelle
-            for item in sepet_data:
-                if isinstance(item, dict):  # JSON format
-                    urun = Urun.objects.get(pk=item['id'])
-                    varyant_id = item.get('varyant_id')
-                    miktar = int(item['miktar'])
-                    birim_fiyat = Decimal(str(item['fiyat']))
-                    indirim_tutari = Decimal(str(item.get('urun_indirim', item.get('indirim', 0))))
-                else:  # Session format
-                    urun = Urun.objects.get(pk=item)
-                    varyant_id = sepet_data[item].get('varyant_id')
-                    miktar = int(sepet_data[item]['miktar'])
-                    birim_fiyat = Decimal(str(sepet_data[item]['fiyat']))
-                    indirim_tutari = Decimal('0')
-                
-                indirimsiz_toplam = birim_fiyat * miktar
-                toplam_fiyat = indirimsiz_toplam - indirim_tutari
-                
-                # Varyant bazlı stok kontrolü
-                if varyant_id:
-                    try:
-                        varyant = UrunVaryanti.objects.get(pk=varyant_id, aktif=True)
-                        if varyant.stok_miktari < miktar:
-                            satis.delete()  # Satışı iptal et
-                            return JsonResponse({
-                                'success': False, 
-                                'message': f'{urun.ad} ({varyant.varyasyon_adi}) için yeterli stok yok! Mevcut: {varyant.stok_miktari}'
-                            })
-                    except UrunVaryanti.DoesNotExist:
-                        satis.delete()  # Satışı iptal et
-                        return JsonResponse({
-                            'success': False, 
-                            'message': f'{urun.ad} için geçerli varyant bulunamadı!'
-                        })
-                else:
-                    # Toplam stok kontrolü
-                    if urun.toplam_stok < miktar:
-                        satis.delete()  # Satışı iptal et
-                        return JsonResponse({
-                            'success': False, 
-                            'message': f'{urun.ad} için yeterli stok yok! Mevcut: {urun.toplam_stok}'
-                        })
-                
-                # Satış detayı oluştur
-                SatisDetay.objects.create(
-                    satis=satis,
-                    urun=urun,
-                    varyant=varyant if varyant_id else None,  # Varyant bilgisini kaydet
-                    miktar=miktar,
-                    birim_fiyat=birim_fiyat,
-                    indirim_tutari=indirim_tutari,
-                    toplam_fiyat=toplam_fiyat
-                )
-                
-                # Varyant stoktan düş
-                if varyant_id:
-                    onceki_stok = varyant.stok_miktari
-                    varyant.stok_miktari -= miktar
-                    varyant.save(stok_hareket_guncelleme=True)  # Satış işlemi - kilitli olsa da güncellenebilir
-                    
-                    # Stok hareket kaydı oluştur
-                    from urun.models import StokHareket
-                    StokHareket.objects.create(
-                        varyant=varyant,
-                        hareket_tipi='cikis',
-                        miktar=miktar,
-                        onceki_stok=onceki_stok,
-                        yeni_stok=varyant.stok_miktari,
-                        aciklama=f'Satış: {satis.satis_no}',
-                        referans_id=str(satis.id),
-                        kullanici=request.user
-                    )
-                else:
-                    # İlk varyantın stokunu düş
-                    first_variant = urun.varyantlar.filter(aktif=True, stok_miktari__gt=0).first()
-                    if first_variant:
-                        onceki_stok = first_variant.stok_miktari
-                        first_variant.stok_miktari -= miktar
-                        first_variant.save(stok_hareket_guncelleme=True)  # Satış işlemi - kilitli olsa da güncellenebilir
-                        
-                        # Stok hareket kaydı oluştur
-                        from urun.models import StokHareket
-                        StokHareket.objects.create(
-                            varyant=first_variant,
-                            hareket_tipi='cikis',
-                            miktar=miktar,
-                            onceki_stok=onceki_stok,
-                            yeni_stok=first_variant.stok_miktari,
-                            aciklama=f'Satış: {satis.satis_no}',
-                            referans_id=str(satis.id),
-                            kullanici=request.user
-                        )
-            
-            # Ödeme kayıtlarını oluştur
-            if odeme_detaylari.get('tip') == 'karma':
-                # Karma ödeme detaylarını al
-                karma_detay = odeme_detaylari.get('karma_detay', {})
-                nakit_tutar = Decimal(str(karma_detay.get('nakit', 0)))
-                kart_tutar = Decimal(str(karma_detay.get('kart', 0)))
-                havale_tutar = Decimal(str(karma_detay.get('havale', 0)))
-                hediye_ceki_tutar = Decimal(str(karma_detay.get('hediye_ceki', 0)))
-                
-                # Karma ödeme kart detaylarını al
-                karma_kart_taksit = odeme_detaylari.get('karma_kart_taksit', 1)
-                karma_kart_banka = odeme_detaylari.get('karma_kart_banka', None)
-                
-                # Karma ödeme validasyonu
-                toplam_odeme = nakit_tutar + kart_tutar + havale_tutar + hediye_ceki_tutar
-                if abs(toplam_odeme - genel_toplam) > Decimal('0.01'):
-                    satis.delete()
-                    return JsonResponse({
-                        'success': False, 
-                        'message': f'Ödeme tutarları eşleşmiyor! Toplam: {genel_toplam}, Ödenen: {toplam_odeme}'
-                    })
-                
-                # Nakit ödeme kaydı
-                if nakit_tutar > 0:
-                    Odeme.objects.create(
-                        satis=satis,
-                        odeme_tipi='nakit',
-                        tutar=nakit_tutar,
-                    )
-                    # Kasa hareketi - nakit kasasına giriş
-                    nakit_kasa = Kasa.objects.filter(tip='nakit', aktif=True).first()
-                    if nakit_kasa:
-                        KasaHareket.objects.create(
-                            kasa=nakit_kasa,
-                            tip='giris',
-                            kaynak='satis',
-                            tutar=nakit_tutar,
-                            aciklama=f'Satış #{satis.satis_no} - Nakit Ödeme',
-                            satis_id=satis.id,
-                            kullanici=request.user
-                        )
-                
-                # Kart ödeme kaydı
-                if kart_tutar > 0:
-                    odeme_data = {
-                        'satis': satis,
-                        'odeme_tipi': 'kart',
-                        'tutar': kart_tutar,
-                    }
-                    
-                    # Karma ödemede kart için taksit ve banka bilgisi
-                    if karma_kart_taksit > 1:
-                        odeme_data['taksit_sayisi'] = karma_kart_taksit
-                    if karma_kart_banka:
-                        odeme_data['banka'] = karma_kart_banka
-                    
-                    Odeme.objects.create(**odeme_data)
-                    # Kasa hareketi - POS kasasına giriş
-                    pos_kasa = Kasa.objects.filter(tip='pos', aktif=True).first()
-                    if pos_kasa:
-                        KasaHareket.objects.create(
-                            kasa=pos_kasa,
-                            tip='giris',
-                            kaynak='satis',
-                            tutar=kart_tutar,
-                            aciklama=f'Satış #{satis.satis_no} - Kart Ödeme',
-                            satis_id=satis.id,
-                            kullanici=request.user
-                        )
-                
-                # Havale ödeme kaydı
-                if havale_tutar > 0:
-                    Odeme.objects.create(
-                        satis=satis,
-                        odeme_tipi='havale',
-                        tutar=havale_tutar,
-                    )
-                    # Kasa hareketi - banka kasasına giriş
-                    banka_kasa = Kasa.objects.filter(tip='banka', aktif=True).first()
-                    if banka_kasa:
-                        KasaHareket.objects.create(
-                            kasa=banka_kasa,
-                            tip='giris',
-                            kaynak='satis',
-                            tutar=havale_tutar,
-                            aciklama=f'Satış #{satis.satis_no} - Havale Ödeme',
-                            satis_id=satis.id,
-                            kullanici=request.user
-                        )
-                
-                # Hediye çeki ödemesi
-                if hediye_ceki_tutar > 0 and data.get('hediye_ceki'):
-                    from hediye.models import HediyeCeki, HediyeCekiKullanim
-                    
-                    hediye_ceki_data = data.get('hediye_ceki')
-                    try:
-                        hediye_ceki = HediyeCeki.objects.get(
-                            kod=hediye_ceki_data['kod'],
-                            durum='aktif'
-                        )
-                        
-                        # Hediye çeki kullanım kaydı oluştur
-                        HediyeCekiKullanim.objects.create(
-                            hediye_ceki=hediye_ceki,
-                            kullanilan_tutar=hediye_ceki_tutar,
-                            satis_id=satis.id,
-                            kullanan=request.user,
-                            aciklama=f'Satış #{satis.satis_no} - Karma Ödeme'
-                        )
-                        
-                        # Hediye çeki bakiyesini güncelle
-                        hediye_ceki.kalan_tutar -= hediye_ceki_tutar
-                        if hediye_ceki.kalan_tutar <= 0:
-                            hediye_ceki.durum = 'kullanilmis'
-                        hediye_ceki.save()
-                        
-                        # Ödeme kaydı oluştur
-                        Odeme.objects.create(
-                            satis=satis,
-                            odeme_tipi='hediye_ceki',
-                            tutar=hediye_ceki_tutar,
-                            hediye_ceki_kodu=hediye_ceki.kod
-                        )
-                        
-                    except HediyeCeki.DoesNotExist:
-                        satis.delete()
-                        return JsonResponse({
-                            'success': False, 
-                            'message': f'Hediye çeki bulunamadı: {hediye_ceki_data["kod"]}'
-                        })
-                        
-            elif odeme_detaylari.get('odeme_yontemi') == 'acik_hesap':
-                # Açık hesap - müşteri gerekli
-                if not musteri:
-                    return JsonResponse({'success': False, 'message': 'Açık hesap satışı için müşteri seçmelisiniz!'})
-                
-                # Açık hesap bakiyesini güncelle (borç ekle)
-                musteri.acik_hesap_bakiye = (musteri.acik_hesap_bakiye or Decimal('0')) + genel_toplam
-                musteri.save()
-                
-                # Ödeme kaydı oluştur
-                Odeme.objects.create(
-                    satis=satis,
-                    odeme_tipi='acik_hesap',
-                    tutar=genel_toplam,
-                    aciklama=f'Açık hesap borcu - {musteri.ad} {musteri.soyad}'
+            # Sepetin tamamı tek transaction içinde işlenir
+            try:
+                satis, genel_toplam = satisi_tamamla(
+                    sepet_satirlari(sepet_data),
+                    kullanici=request.user,
+                    satici=satici,
+                    musteri=musteri,
+                    genel_indirim=Decimal(str(data.get('genel_indirim', 0))),
+                    aciklama=data.get('aciklama', '').strip(),
+                    odeme_detaylari=odeme_detaylari,
+                    hediye_ceki_data=data.get('hediye_ceki'),
                 )
-                    
-            else:
-                # Tek ödeme
-                odeme_yontemi = odeme_detaylari.get('odeme_yontemi', 'nakit')
-                taksit_sayisi = odeme_detaylari.get('taksit_sayisi', 1)
-                banka = odeme_detaylari.get('banka', None)
-                
-                # Ödeme tipi dönüşümü
-                if odeme_yontemi in ['kart', 'kredi_karti']:
-                    odeme_tipi = 'kart'
-                elif odeme_yontemi == 'havale':
-                    odeme_tipi = 'havale'
-                elif odeme_yontemi == 'hediye_ceki':
-                    odeme_tipi = 'hediye_ceki'
-                elif odeme_yontemi == 'acik_hesap':
-                    odeme_tipi = 'acik_hesap'
-                    # Veresiye satış - müşteri borcunu artır
-                    if satis.musteri:
-                        satis.musteri.borc_hareket_ekle(
-                            tutar=genel_toplam,
-                            aciklama=f'Veresiye Satış - {satis.satis_no}',
-                            satis_id=satis.id,
-                            user=request.user
-                        )
-                        # Açık hesap satışları veresiye olarak işaretlenir
-                        # Ödeme durumu Odeme modeli üzerinden takip edilir
-                else:
-                    odeme_tipi = 'nakit'
-                
-                # Veresiye satış değilse ödeme kaydı oluştur
-                if odeme_tipi != 'acik_hesap':
-                    odeme_data = {
-                        'satis': satis,
-                        'odeme_tipi': odeme_tipi,
-                        'tutar': genel_toplam,
-                    }
-                    
-                    # Kart ödemesi için ek bilgiler
-                    if odeme_tipi == 'kart':
-                        odeme_data['taksit_sayisi'] = taksit_sayisi if taksit_sayisi > 1 else None
-                        if banka:
-                            odeme_data['banka'] = banka
-                    
-                    Odeme.objects.create(**odeme_data)
-                    
-                    # Kasa hareketi oluştur
-                    kasa = None
-                    if odeme_tipi == 'nakit':
-                        kasa = Kasa.objects.filter(tip='nakit', aktif=True).first()
-                        aciklama = f'Satış #{satis.satis_no} - Nakit Ödeme'
-                    elif odeme_tipi == 'kart':
-                        kasa = Kasa.objects.filter(tip='pos', aktif=True).first()
-                        aciklama = f'Satış #{satis.satis_no} - Kart Ödeme'
-                    elif odeme_tipi == 'havale':
-                        kasa = Kasa.objects.filter(tip='banka', aktif=True).first()
-                        aciklama = f'Satış #{satis.satis_no} - Havale Ödeme'
-                    
-                    if kasa:
-                        KasaHareket.objects.create(
-                            kasa=kasa,
-                            tip='giris',
-                            kaynak='satis',
-                            tutar=genel_toplam,
-                            aciklama=aciklama,
-                            satis_id=satis.id,
-                            kullanici=request.user
-                        )
+            except SatisHatasi as e:
+                return JsonResponse({'success': False, 'message': str(e)})
             
             # Session'ı temizle
             if 'sepet' in request.session:
@@ -612,8 +276,7 @@ def satis_tamamla(request):
 @login_required
 def satici_rapor(request):
     """Satış elemanı ana rapor sayfası"""
-    from django.db.models import Sum, Count
-    from datetime import datetime, timedelta
+    from datetime import datetime
     from kullanici.models import CustomUser
     
     # Bugünkü tarih
@@ -625,47 +288,17 @@ def satici_rapor(request):
         role__in=['admin', 'manager', 'cashier', 'satici']
     ).order_by('first_name', 'last_name', 'username')
     
-    # Her satış elemanı için özet bilgiler
+    # Bu ayki satış ve iadeler, satıcı bazında tek sorguda (satis/raporlar.py)
+    from . import raporlar
+    ay_baslangic = bugun.replace(day=1)
+    satislar = raporlar.satici_ozetleri(ay_baslangic, tarih_alani='siparis_tarihi')
+    iadeler = raporlar.iade_ozetleri(ay_baslangic)
+    
     satici_ozet = []
     for elemanl in satis_elemanlari:
-        # Bu ayki satışlar
-        bugun_baslangic = datetime.combine(bugun, datetime.min.time())
-        ay_baslangic = bugun_baslangic.replace(day=1)
-        
-        satislar = Satis.objects.filter(
-            satici=elemanl,
-            siparis_tarihi__gte=ay_baslangic,
-            durum='tamamlandi'
-        )
-        
-        # İadeler (hediye çeki oluşturan işlemler)
-        from hediye.models import HediyeCeki
-        iadeler = HediyeCeki.objects.filter(
-            olusturan=elemanl,
-            olusturma_tarihi__gte=ay_baslangic,
-            aciklama__icontains='İade'
-        )
-        
-        toplam_satis = satislar.aggregate(
-            tutar=Sum('toplam_tutar'),
-            adet=Count('id')
-        )
-        
-        toplam_iade = iadeler.aggregate(
-            tutar=Sum('tutar'),
-            adet=Count('id')
-        )
-        
-        net_satis = (toplam_satis['tutar'] or 0) - (toplam_iade['tutar'] or 0)
-        
-        satici_ozet.append({
-            'elemanl': elemanl,
-            'satis_tutari': toplam_satis['tutar'] or 0,
-            'satis_adedi': toplam_satis['adet'] or 0,
-            'iade_tutari': toplam_iade['tutar'] or 0,
-            'iade_adedi': toplam_iade['adet'] or 0,
-            'net_satis': net_satis,
-        })
+        ozet = raporlar.satis_iade_ozeti(satislar.get(elemanl.pk), iadeler.get(elemanl.pk))
+        ozet['elemanl'] = elemanl
+        satici_ozet.append(ozet)
     
     context = {
         'title': 'Satış Elemanı Raporları',
@@ -679,8 +312,8 @@ def satici_rapor(request):
 @login_required  
 def satici_gunluk(request):
     """Satış elemanı günlük detay raporu"""
-    from django.db.models import Sum, Count
-    from datetime import datetime, timedelta
+    from django.db.models import Count
+    from datetime import datetime
     from kullanici.models import CustomUser
     
     # Tarih parametreleri
@@ -709,46 +342,22 @@ def satici_gunluk(request):
         role__in=['admin', 'manager', 'cashier', 'satici']
     ).order_by('first_name', 'last_name', 'username')
     
-    # Günlük veriler
-    gun_baslangic = datetime.combine(secili_tarih, datetime.min.time())
-    gun_bitis = datetime.combine(secili_tarih, datetime.max.time())
-    
     if secili_satici:
         # Belirli satış elemanının günlük detayları
-        satislar = Satis.objects.filter(
-            satici=secili_satici,
-            siparis_tarihi__range=[gun_baslangic, gun_bitis],
-            durum='tamamlandi'
-        ).order_by('-siparis_tarihi')
+        from . import raporlar
+        satici_idleri = [secili_satici.pk]
+        satislar = raporlar.donem_satislari(
+            secili_tarih, secili_tarih, 'siparis_tarihi', satici_idleri
+        ).select_related('musteri').annotate(kalem_sayisi=Count('satisdetay')).order_by('-siparis_tarihi')
         
         # İadeler
-        from hediye.models import HediyeCeki
-        iadeler = HediyeCeki.objects.filter(
-            olusturan=secili_satici,
-            olusturma_tarihi__range=[gun_baslangic, gun_bitis],
-            aciklama__icontains='İade'
-        ).order_by('-olusturma_tarihi')
+        iadeler = raporlar.donem_iadeleri(secili_tarih, secili_tarih, satici_idleri).order_by('-olusturma_tarihi')
         
         # Toplamlar
-        toplam_satis = satislar.aggregate(
-            tutar=Sum('toplam_tutar'),
-            adet=Count('id')
-        )
-        
-        toplam_iade = iadeler.aggregate(
-            tutar=Sum('tutar'),
-            adet=Count('id')
+        gunluk_ozet = raporlar.satis_iade_ozeti(
+            raporlar.satici_ozetleri(secili_tarih, secili_tarih, 'siparis_tarihi', satici_idleri).get(secili_satici.pk),
+            raporlar.iade_ozetleri(secili_tarih, secili_tarih, satici_idleri).get(secili_satici.pk),
         )
-        
-        net_satis = (toplam_satis['tutar'] or 0) - (toplam_iade['tutar'] or 0)
-        
-        gunluk_ozet = {
-            'satis_tutari': toplam_satis['tutar'] or 0,
-            'satis_adedi': toplam_satis['adet'] or 0,
-            'iade_tutari': toplam_iade['tutar'] or 0,
-            'iade_adedi': toplam_iade['adet'] or 0,
-            'net_satis': net_satis,
-        }
     else:
         satislar = []
         iadeler = []
@@ -770,8 +379,7 @@ def satici_gunluk(request):
 @login_required
 def satici_aylik(request):
     """Satış elemanı aylık analiz raporu"""
-    from django.db.models import Sum, Count
-    from datetime import datetime, timedelta
+    from datetime import date, datetime
     from kullanici.models import CustomUser
     import calendar
     
@@ -795,77 +403,34 @@ def satici_aylik(request):
     ).order_by('first_name', 'last_name', 'username')
     
     # Ay aralığı
-    ay_baslangic = datetime(yil, ay, 1)
-    if ay == 12:
-        ay_bitis = datetime(yil + 1, 1, 1) - timedelta(days=1)
-    else:
-        ay_bitis = datetime(yil, ay + 1, 1) - timedelta(days=1)
-    
-    ay_bitis = datetime.combine(ay_bitis.date(), datetime.max.time())
+    gun_sayisi = calendar.monthrange(yil, ay)[1]
+    ay_baslangic = date(yil, ay, 1)
+    ay_bitis = date(yil, ay, gun_sayisi)
     
     if secili_satici:
-        # Aylık satışlar
-        satislar = Satis.objects.filter(
-            satici=secili_satici,
-            siparis_tarihi__range=[ay_baslangic, ay_bitis],
-            durum='tamamlandi'
-        )
-        
-        # Aylık iadeler
-        from hediye.models import HediyeCeki
-        iadeler = HediyeCeki.objects.filter(
-            olusturan=secili_satici,
-            olusturma_tarihi__range=[ay_baslangic, ay_bitis],
-            aciklama__icontains='İade'
-        )
+        # Günlük dağılım - satış ve iadeler gün bazında tek sorguda
+        from . import raporlar
+        satici_idleri = [secili_satici.pk]
+        gunluk = raporlar.gunluk_satislar(ay_baslangic, ay_bitis, 'siparis_tarihi', satici_idleri)
+        gunluk_iade = raporlar.gunluk_iadeler(ay_baslangic, ay_bitis, satici_idleri)
         
-        # Günlük dağılım
         gunluk_satislar = {}
-        for gun in range(1, calendar.monthrange(yil, ay)[1] + 1):
-            gun_baslangic = datetime(yil, ay, gun)
-            gun_bitis = datetime.combine(gun_baslangic.date(), datetime.max.time())
-            
-            gun_satislar = satislar.filter(
-                siparis_tarihi__range=[gun_baslangic, gun_bitis]
-            ).aggregate(
-                tutar=Sum('toplam_tutar'),
-                adet=Count('id')
-            )
-            
-            gun_iadeler = iadeler.filter(
-                olusturma_tarihi__range=[gun_baslangic, gun_bitis]
-            ).aggregate(
-                tutar=Sum('tutar'),
-                adet=Count('id')
-            )
-            
-            gunluk_satislar[gun] = {
-                'satis_tutari': gun_satislar['tutar'] or 0,
-                'satis_adedi': gun_satislar['adet'] or 0,
-                'iade_tutari': gun_iadeler['tutar'] or 0,
-                'iade_adedi': gun_iadeler['adet'] or 0,
-                'net_satis': (gun_satislar['tutar'] or 0) - (gun_iadeler['tutar'] or 0),
-            }
+        for gun in range(1, gun_sayisi + 1):
+            tarih = date(yil, ay, gun)
+            gunluk_satislar[gun] = raporlar.satis_iade_ozeti(gunluk.get(tarih), gunluk_iade.get(tarih))
         
         # Toplam özet
-        toplam_satis = satislar.aggregate(
-            tutar=Sum('toplam_tutar'),
-            adet=Count('id')
+        aylik_ozet = raporlar.satis_iade_ozeti(
+            {
+                'tutar': sum(g['tutar'] or 0 for g in gunluk.values()),
+                'adet': sum(g['adet'] for g in gunluk.values()),
+            },
+            {
+                'tutar': sum(g['tutar'] or 0 for g in gunluk_iade.values()),
+                'adet': sum(g['adet'] for g in gunluk_iade.values()),
+            },
         )
-        
-        toplam_iade = iadeler.aggregate(
-            tutar=Sum('tutar'),
-            adet=Count('id')
-        )
-        
-        aylik_ozet = {
-            'satis_tutari': toplam_satis['tutar'] or 0,
-            'satis_adedi': toplam_satis['adet'] or 0,
-            'iade_tutari': toplam_iade['tutar'] or 0,
-            'iade_adedi': toplam_iade['adet'] or 0,
-            'net_satis': (toplam_satis['tutar'] or 0) - (toplam_iade['tutar'] or 0),
-            'ortalama_gunluk': ((toplam_satis['tutar'] or 0) - (toplam_iade['tutar'] or 0)) / calendar.monthrange(yil, ay)[1],
-        }
+        aylik_ozet['ortalama_gunluk'] = aylik_ozet['net_satis'] / gun_sayisi
     else:
         gunluk_satislar = {}
         aylik_ozet = {}
@@ -1276,37 +841,23 @@ def satis_yazdir(request, pk):
 # @login_required  # TEST İÇİN GEÇİCİ OLARAK KALDIRILDI
 def barkod_sorgula(request):
     """Barkod sorgulama AJAX view'ı"""
-    from urun.models import UrunVaryanti
+    from urun import barkod_index
     
     barkod = request.GET.get('barkod')
     
     if barkod:
-        try:
-            # Barkod UrunVaryanti modelinde bulunuyor
-            varyant = UrunVaryanti.objects.get(barkod=barkod, aktif=True)
-            urun = varyant.urun
-            
-            if varyant.stok_miktari > 0 and urun.aktif:
-                data = {
-                    'success': True,
-                    'urun': {
-                        'id': urun.id,
-                        'varyant_id': varyant.id,
-                        'ad': urun.ad,
-                        'varyasyon': varyant.varyasyon_adi,
-                        'beden': varyant.beden.ad if varyant.beden else 'Tek Beden',
-                        'renk': varyant.renk.ad if varyant.renk else 'Standart',
-                        'barkod': varyant.barkod,
-                        'fiyat': float(urun.satis_fiyati),  # JavaScript'te 'fiyat' olarak kullanılıyor
-                        'satis_fiyati': float(urun.satis_fiyati),  # Geriye dönük uyumluluk için
-                        'stok_miktari': varyant.stok_miktari,
-                        'kategori': str(urun.kategori)
-                    }
-                }
-            else:
-                data = {'success': False, 'message': 'Ürün stokta yok!'}
-        except UrunVaryanti.DoesNotExist:
+        # Barkod önce çözümlenir, varyant indeksten bulunur (sık okutulanlarda sorgu yok)
+        kayit, etiket_fiyati = barkod_index.coz(barkod)
+        
+        if kayit is None:
             data = {'success': False, 'message': 'Barkod bulunamadı!'}
+        elif kayit['stok_miktari'] > 0 and kayit['urun_aktif']:
+            data = {'success': True, 'urun': barkod_index.yanit(kayit)}
+            if etiket_fiyati is not None:
+                data['etiket_fiyati'] = etiket_fiyati
+                data['uyari'] = f"Etiket fiyatı güncel değil! (Etiket: {etiket_fiyati} ₺, Güncel: {kayit['satis_fiyati']:.2f} ₺)"
+        else:
+            data = {'success': False, 'message': 'Ürün stokta yok!'}
     else:
         data = {'success': False, 'message': 'Barkod girilmedi!'}
     
@@ -1317,18 +868,13 @@ def barkod_sorgula(request):
 # @login_required  # TEST İÇİN GEÇİCİ OLARAK KALDIRILDI
 def urun_ara(request):
     """Ürün arama AJAX view'ı"""
-    from urun.models import UrunVaryanti
+    from urun import arama
     
     query = request.GET.get('q', '')
     
     if len(query) >= 2:
-        # Hem ürün adı hem de barkod ile arama yap
-        varyantlar = UrunVaryanti.objects.filter(
-            Q(urun__ad__icontains=query) | Q(barkod__icontains=query) | Q(urun__urun_kodu__icontains=query),
-            aktif=True,
-            urun__aktif=True,
-            stok_miktari__gt=0
-        )[:10]
+        # Ürün adı, kodu, barkod, renk, beden, kategori ve markada ara (arama indeksi)
+        varyantlar = arama.ara(query, limit=10)
         
         data = []
         for varyant in varyantlar:
@@ -8,6 +8,8 @@ class StoktakipConfig(AppConfig):
     
     def ready(self):
         """Uygulama hazır olduğunda çalışır"""
+        from . import signals  # noqa: F401  Dashboard cache geçersiz kılma
+
         # Development ortamında auto-reload optimizasyonları
         if os.environ.get('RUN_MAIN') != 'true':  # Sadece bir kez çalışsın
             return
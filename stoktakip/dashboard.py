@@ -0,0 +1,92 @@
+"""
+Ana sayfa (dashboard) metrikleri.
+
+Tüm sayılar birkaç gruplanmış sorguyla hesaplanır ve kısa süreli cache'te
+tutulur. Satış, gider, müşteri ve stok değişikliklerinde cache commit
+sonrası silinir (stoktakip/signals.py); CACHE_SURE yalnızca sinyal dışı
+değişiklikler (toplu güncellemeler, gün dönümü) için üst sınırdır.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+CACHE_ANAHTARI = 'dashboard_metrikleri'
+CACHE_SURE = 60  # saniye
+TREND_GUN = 7
+
+
+def _hesapla(bugun):
+    from gider.models import Gider
+    from musteri.models import Musteri
+    from satis.models import Satis, SatisDetay
+    from urun.models import UrunVaryanti
+
+    tamamlanan = Satis.objects.filter(durum='tamamlandi')
+
+    # Son 7 günün satışları tek GROUP BY ile; bugünün toplamı da buradan gelir
+    baslangic = bugun - timedelta(days=TREND_GUN - 1)
+    gunler = {
+        satir['gun']: satir
+        for satir in tamamlanan.filter(satis_tarihi__date__gte=baslangic, satis_tarihi__date__lte=bugun)
+        .annotate(gun=TruncDate('satis_tarihi'))
+        .values('gun')
+        .annotate(toplam=Sum('toplam_tutar'), adet=Count('id'))
+        .order_by()
+    }
+    haftalik_satis = []
+    for i in range(TREND_GUN):
+        tarih = baslangic + timedelta(days=i)
+        haftalik_satis.append({'tarih': tarih, 'tutar': (gunler.get(tarih) or {}).get('toplam') or 0})
+    bugunki = gunler.get(bugun) or {}
+
+    # Aktif varyant sayısı ve kritik stok tek sorguda
+    varyant_stats = UrunVaryanti.objects.filter(aktif=True, urun__aktif=True).aggregate(
+        toplam=Count('id'),
+        kritik=Count('id', filter=Q(stok_miktari__lte=F('urun__kritik_stok_seviyesi'))),
+    )
+
+    bugunki_satis = bugunki.get('toplam') or 0
+    gunluk_gider = Gider.objects.filter(tarih=bugun).aggregate(toplam=Sum('tutar'))['toplam'] or 0
+
+    return {
+        'bugun': bugun,
+        'toplam_urun': varyant_stats['toplam'],
+        'toplam_musteri': Musteri.objects.filter(aktif=True).count(),
+        'bugunki_satis': bugunki_satis,
+        'satis_sayisi': bugunki.get('adet') or 0,
+        'bugunki_gider_toplam': gunluk_gider,
+        'net_kar': bugunki_satis - gunluk_gider,
+        'kritik_stoklar': varyant_stats['kritik'],
+        'cok_satan_urunler': list(
+            SatisDetay.objects.filter(satis__satis_tarihi__date=bugun, satis__durum='tamamlandi')
+            .values('urun__ad')
+            .annotate(toplam_miktar=Sum('miktar'), toplam_ciro=Sum('toplam_fiyat'))
+            .order_by('-toplam_miktar')[:5]
+        ),
+        # Model nesneleri değil düz sözlükler cache'lenir; deploy/model değişikliklerinden etkilenmez
+        'son_satislar': list(
+            tamamlanan.filter(satis_tarihi__date=bugun)
+            .order_by('-satis_tarihi')
+            .values('id', 'satis_no', 'satis_tarihi', 'toplam_tutar', 'musteri__ad', 'musteri__soyad', 'satici__username')[:5]
+        ),
+        'haftalik_satis': haftalik_satis,
+    }
+
+
+def metrikler():
+    """Dashboard metriklerini cache'ten döndür, yoksa hesaplayıp cache'le"""
+    bugun = timezone.localdate()
+    veri = cache.get(CACHE_ANAHTARI)
+    if veri is None or veri['bugun'] != bugun:
+        veri = _hesapla(bugun)
+        cache.set(CACHE_ANAHTARI, veri, CACHE_SURE)
+    return veri
+
+
+def gecersiz_kil():
+    """Metrik cache'ini transaction commit edildikten sonra sil"""
+    transaction.on_commit(lambda: cache.delete(CACHE_ANAHTARI))
@@ -73,11 +73,12 @@ INSTALLED_APPS = [
     'log',
     'gider',  # Giderler modülü
     'kasa',   # Kasa yönetimi modülü
-    # 'downloads' app kaldırıldı - Local Print Agent kullanılıyor
+    'downloads',  # Arka plan işleri (rapor dışa aktarımları) ve indirmeler
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'log.middleware.PerformansMiddleware',  # Sorgu sayısı / süre ölçümü ve bütçeler (log/performans.py)
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Static files serving for production
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -85,7 +86,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',  # Messages middleware önce olmalı
     # 'kullanici.middleware.admin_access.AdminAccessMiddleware',  # GEÇİCİ KAPALI  # Admin panel erişim kontrolü
-    # 'kullanici.middleware.user_session.UserSessionMiddleware',  # GEÇİCİ KAPALI  # Oturum kontrolü
+    'kullanici.middleware.user_session.UserSessionMiddleware',  # Oturum kontrolü (cache'li)
     # 'kullanici.middleware.permission_check.PermissionCheckMiddleware',  # GEÇİCİ KAPALI  # Yetki kontrolü
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -184,6 +185,28 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+BARKOD_GORSEL_LIMIT = int(os.environ.get('BARKOD_GORSEL_LIMIT', 20000))  # Disk önbelleğindeki en fazla barkod görseli
+
+# Arka plan işlerinin sonuç dosyaları (raporlar): MEDIA_ROOT dışında tutulur, nginx sunmaz;
+# yalnızca downloads.views.is_indir (sahip/yetkili kontrolü) ile indirilir
+ARKA_PLAN_DOSYA_ROOT = os.environ.get('ARKA_PLAN_DOSYA_ROOT', str(BASE_DIR / 'private' / 'arka_plan_isleri'))
+ARKA_PLAN_DOSYA_SURE_GUN = int(os.environ.get('ARKA_PLAN_DOSYA_SURE_GUN', 7))  # Biten işler ve dosyaları bu kadar gün tutulur
+
+# İstek ölçümü (log/performans.py) - view adı -> bütçe; '*' bütçesi tanımlanmamış view'lar için
+PERFORMANS_OLCUMU = os.environ.get('PERFORMANS_OLCUMU', 'True').lower() == 'true'
+PERFORMANS_KAYIT_LIMITI = 500  # Worker başına tutulacak son istek sayısı
+# Server-Timing başlığı personel dışındaki kullanıcılara da gönderilsin mi (sorgu sayısı/DB süresi içerir)
+PERFORMANS_SERVER_TIMING = os.environ.get('PERFORMANS_SERVER_TIMING', 'False').lower() == 'true'
+PERFORMANS_BUTCELERI = {
+    '*': {'sorgu': 50, 'sure_ms': 1000},
+    'satis:liste': {'sorgu': 15, 'sure_ms': 500},
+    'urun:liste': {'sorgu': 15, 'sure_ms': 500},
+    'musteri:borc_alacak_listesi': {'sorgu': 15, 'sure_ms': 500},
+    'satis:barkod_sorgula': {'sorgu': 5, 'sure_ms': 100},
+}
+
+# Borç-alacak listesindeki son 30 gün tutarları MusteriGunlukOzet'ten okunsun mu (False: satış/tahsilat kayıtlarından)
+MUSTERI_GUNLUK_OZET = os.environ.get('MUSTERI_GUNLUK_OZET', 'False').lower() == 'true'
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -201,7 +224,7 @@ AUTH_USER_MODEL = 'kullanici.CustomUser'
 # Session settings
 SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 SESSION_COOKIE_AGE = 86400  # 24 hours
-SESSION_SAVE_EVERY_REQUEST = True
+SESSION_SAVE_EVERY_REQUEST = False  # Oturum yalnızca değişince yazılır; kayan süre kullanici/oturum.yenile ile
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
 
 # Development optimizations for auto-reload
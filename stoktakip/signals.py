@@ -0,0 +1,29 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from gider.models import Gider
+from musteri.models import Musteri
+from satis.models import Satis
+from urun.models import UrunVaryanti
+from urun.signals import stok_degisti
+
+from . import dashboard
+
+
+@receiver(post_save, sender=Satis)
+@receiver(post_delete, sender=Satis)
+@receiver(post_save, sender=Gider)
+@receiver(post_delete, sender=Gider)
+@receiver(post_save, sender=Musteri)
+@receiver(post_delete, sender=Musteri)
+@receiver(post_save, sender=UrunVaryanti)
+@receiver(post_delete, sender=UrunVaryanti)
+def dashboard_metriklerini_gecersiz_kil(sender, **kwargs):
+    """Satış, gider, müşteri veya varyant değişince dashboard metriklerini yenile"""
+    dashboard.gecersiz_kil()
+
+
+@receiver(stok_degisti)
+def stok_degisince_dashboard_gecersiz_kil(sender, **kwargs):
+    """Satış/stok hareketiyle stok değişince kritik stok sayısı yenilensin"""
+    dashboard.gecersiz_kil()
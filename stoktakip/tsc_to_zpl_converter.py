@@ -1,47 +1,34 @@
 """
 TSC Design - Etiket tasarımı
 """
-from django.http import HttpResponse, JsonResponse
+import json
+
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
-from urun.models import Urun, UrunVaryanti
+from urun import etiket
+from urun.models import Urun
 
 def generate_label(data=None):
-    """Print agent ile uyumlu ZPL generator"""
+    """Print agent ile uyumlu ZPL generator (tek etiket, kurulum bloğu dahil)"""
     
     # Print agent formatında veriler
-    brand = data.get('brand', 'NUVIA') if data else 'NUVIA'
-    product_code = data.get('product_code', '00001') if data else '00001'
-    product_name = data.get('product_name', 'PREMIUM WEAR') if data else 'PREMIUM WEAR'
-    size = data.get('size', 'XXL') if data else 'XXL'
-    price = data.get('price', '1200') if data else '1200'
-    color = data.get('color', 'Kırmızı') if data else 'Kırmızı'
-    barcode = data.get('barcode', '123456789012') if data else '123456789012'
-    
-    # Fiyat formatını düzenle (TL kısmını kaldır)
-    price_clean = str(price).replace(" TL", "").replace("TL", "").strip()
-    
-    return f"""CT~~CD,~CC^~CT~
-^XA~TA000~JSN^LT0^MNW^MTT^PON^PMN^LH0,0^JMA^PR2,2~SD4^JUS^LRN^CI0^XZ
-^XA
-^MMT
-^PW432
-^LL0320
-^LS0
-^FT128,75^A0N,66,64^FH\^FDNUVIA^FS
-^FT16,100^A0N,28,28^FH\^FDPREMIUM WEAR MAN & WOMAN^FS
-^FT204,255^A0N,25,24^FH\^FDBeden:^FS
-^FT281,255^A0N,25,24^FH\^FD{size}^FS
-^FT204,286^A0N,25,24^FH\^FDFiyat:^FS
-^FT275,288^A0N,25,24^FH\^FD{price_clean}^FS
-^FT360,289^A0N,25,24^FH\^FDTL^FS
-^FT204,154^A0N,25,24^FH\^FD{product_code}^FS
-^FT204,189^A0N,25,24^FH\^FD{brand}^FS
-^FT204,224^A0N,25,24^FH\^FDRenk:^FS
-^FT272,224^A0N,25,24^FH\^FD{color}^FS
-^FT24,296^BQN,2,8
-^FH\^FDLA,{barcode}^FS
-^PQ1,0,1,Y^XZ"""
+    data = data or {}
+    veri = {
+        'brand': data.get('brand', 'NUVIA'),
+        'product_code': data.get('product_code', '00001'),
+        'price': data.get('price', '1200'),
+        'size': data.get('size', 'XXL'),
+        'color': data.get('color', 'Kırmızı'),
+        'barcode': data.get('barcode', '123456789012'),
+    }
+    return ''.join(etiket.zpl_akisi([(veri, 1)])).rstrip('\n')
+
+
+def _zpl_yaniti(etiketler):
+    """Etiketleri ZPL olarak parça parça gönder (kurulum bloğu bir kez)"""
+    return StreamingHttpResponse(etiket.zpl_akisi(etiketler), content_type='text/plain')
+
 
 @csrf_exempt
 def tsc_design_as_zpl(request):
@@ -83,90 +70,76 @@ def tsc_design_dynamic_zpl(request):
 def urun_etiket_zpl(request, urun_id):
     """Ürün için tüm varyantların etiketlerini ZPL döndür"""
     try:
-        urun = get_object_or_404(Urun, id=urun_id)
-        
-        all_zpl_content = []
-        
+        urun = get_object_or_404(Urun.objects.select_related('marka'), id=urun_id)
+        adet = max(1, int(request.GET.get('adet', 1)))
+
+        etiketler = []
         # Varyasyonlu ürün kontrolü
         if urun.varyasyonlu:
             varyantlar = urun.varyantlar.filter(aktif=True)
-            
+
             # Aktif varyant yoksa, tüm varyantlara bak
             if not varyantlar.exists():
                 varyantlar = urun.varyantlar.all()
-            
-            # Hiç varyant yoksa varyasyonsuz olarak işle
-            if not varyantlar.exists():
-                print(f"Warning: Product {urun_id} is marked as variant but has no variants, treating as non-variant")
-                # Varyasyonsuz ürün olarak işle
-                data = {
-                    'brand': urun.marka.ad if urun.marka else 'NUVIA',
-                    'product_code': urun.urun_kodu or '00001',
-                    'product_name': urun.ad,
-                    'price': str(urun.satis_fiyati),
-                    'size': 'Genel',
-                    'color': 'Kırmızı',
-                    'barcode': urun.barkod if hasattr(urun, 'barkod') else str(urun.id).zfill(12),
-                    'variant_name': ''
-                }
-                zpl_content = generate_label(data)
-                all_zpl_content.append(zpl_content)
-            else:
-                # Tüm varyantlar için etiket oluştur
-                for varyant in varyantlar:
-                    data = {
-                        'brand': urun.marka.ad if urun.marka else 'NUVIA',
-                        'product_code': urun.urun_kodu or '00001',
-                        'product_name': urun.ad,
-                        'price': str(urun.satis_fiyati),
-                        'size': varyant.beden.ad if varyant.beden else 'Genel',
-                        'color': varyant.renk.ad if varyant.renk else 'Kırmızı',
-                        'barcode': varyant.barkod or f"{urun.id}{varyant.id}".zfill(12),
-                        'variant_name': f"{varyant.beden.ad if varyant.beden else ''} {varyant.renk.ad if varyant.renk else ''}".strip()
-                    }
-                    zpl_content = generate_label(data)
-                    all_zpl_content.append(zpl_content)
-        else:
-            # Varyasyonsuz ürün
-            data = {
-                'brand': urun.marka.ad if urun.marka else 'NUVIA',
-                'product_code': urun.urun_kodu or '00001',
-                'product_name': urun.ad,
-                'price': str(urun.satis_fiyati),
-                'size': 'Genel',
-                'color': 'Kırmızı',
-                'barcode': urun.barkod if hasattr(urun, 'barkod') else str(urun.id).zfill(12),
-                'variant_name': ''
-            }
-            zpl_content = generate_label(data)
-            all_zpl_content.append(zpl_content)
-        
-        # Tüm ZPL kodlarını birleştir
-        combined_zpl = '\n'.join(all_zpl_content)
-        return HttpResponse(combined_zpl, content_type='text/plain')
-        
+
+            etiketler = etiket.varyant_etiketleri(
+                (varyant_id, adet) for varyant_id in varyantlar.order_by('id').values_list('id', flat=True)
+            )
+
+        # Varyasyonsuz ürün veya varyantı olmayan varyasyonlu ürün
+        if not etiketler:
+            etiketler = [(etiket.urun_etiket_verisi(urun), adet)]
+
+        return _zpl_yaniti(etiketler)
+
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
 @csrf_exempt
 def varyant_etiket_zpl(request, varyant_id):
-    """Ürün varyantı için etiket ZPL döndür"""
+    """Ürün varyantı için etiket ZPL döndür (?adet=n kopya ^PQ ile)"""
     try:
-        varyant = get_object_or_404(UrunVaryanti, id=varyant_id)
-        
-        data = {
-            'brand': varyant.urun.marka.ad if varyant.urun.marka else 'NUVIA',  # Marka bilgisi
-            'product_code': varyant.urun.urun_kodu or '00001',  # Ürün kodu
-            'product_name': varyant.urun.ad,  # Ürün adı
-            'price': str(varyant.urun.satis_fiyati),
-            'size': varyant.beden.ad if varyant.beden else 'Genel',
-            'color': varyant.renk.ad if varyant.renk else 'Kırmızı',
-            'barcode': varyant.barkod or f"{varyant.urun.id}{varyant.id}".zfill(12),
-            'variant_name': f"{varyant.beden.ad if varyant.beden else ''} {varyant.renk.ad if varyant.renk else ''}".strip()
-        }
-        
-        zpl_content = generate_label(data)
-        return HttpResponse(zpl_content, content_type='text/plain')
-        
+        adet = max(1, int(request.GET.get('adet', 1)))
+        etiketler = etiket.varyant_etiketleri([(varyant_id, adet)])
+        if not etiketler:
+            raise Http404
+        return _zpl_yaniti(etiketler)
+
+    except Http404:
+        raise
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
+
+@csrf_exempt
+def toplu_etiket(request):
+    """
+    Birden fazla ürünün etiketlerini tek istekte, akış olarak döndür.
+
+    GET:  ?varyant=<id>:<adet>&varyant=<id>:<adet>...&format=zpl|prn
+    POST: {"etiketler": [{"varyant_id": 1, "adet": 3}, ...], "format": "zpl"}
+    """
+    try:
+        if request.method == 'POST':
+            veri = json.loads(request.body or '{}')
+            istekler = [(satir['varyant_id'], satir.get('adet', 1)) for satir in veri.get('etiketler', [])]
+            bicim = veri.get('format', 'zpl')
+        else:
+            istekler = []
+            for deger in request.GET.getlist('varyant'):
+                varyant_id, _, adet = deger.partition(':')
+                istekler.append((varyant_id, adet or 1))
+            bicim = request.GET.get('format', 'zpl')
+
+        akis = etiket.AKISLAR.get(bicim)
+        if akis is None:
+            return JsonResponse({'error': f'Geçersiz format: {bicim}'}, status=400)
+        etiketler = etiket.varyant_etiketleri(istekler)
+        if not etiketler:
+            return JsonResponse({'error': 'Etiket bulunamadı'}, status=404)
+
+        response = StreamingHttpResponse(akis(etiketler), content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="toplu_etiket.{bicim}"'
+        return response
+
+    except (KeyError, TypeError, ValueError) as e:
+        return JsonResponse({'error': f'Geçersiz istek: {e}'}, status=400)
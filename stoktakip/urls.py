@@ -60,7 +60,7 @@ urlpatterns = [
     path('log/', include('log.urls', namespace='log')),
     path('gider/', include('gider.urls', namespace='gider')),  # Giderler modülü
     path('kasa/', include('kasa.urls', namespace='kasa')),     # Kasa yönetimi modülü
-    # Downloads modülü kaldırıldı - Local Print Agent kullanılıyor
+    path('downloads/', include('downloads.urls', namespace='downloads')),  # Arka plan işleri ve indirmeler
     
     # Custom Label API (TSC Design as ZPL)
     path('api/tsc-as-zpl/', tsc_to_zpl_converter.tsc_design_as_zpl, name='custom_label'),
@@ -69,6 +69,7 @@ urlpatterns = [
     # Ürün Etiket API'leri
     path('api/urun-etiket/<int:urun_id>/', tsc_to_zpl_converter.urun_etiket_zpl, name='urun_etiket'),
     path('api/varyant-etiket/<int:varyant_id>/', tsc_to_zpl_converter.varyant_etiket_zpl, name='varyant_etiket'),
+    path('api/toplu-etiket/', tsc_to_zpl_converter.toplu_etiket, name='toplu_etiket'),
 ]
 
 # Media files için
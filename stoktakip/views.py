@@ -1,99 +1,17 @@
 ﻿from django.shortcuts import render
 from django.http import HttpResponse
-from django.db.models import Sum, Count, Q, F
+from django.db.models import Sum, Count, Q
 from datetime import date, datetime
 from satis.models import Satis, SatisDetay, Odeme
-from urun.models import UrunVaryanti
-from musteri.models import Musteri
 from gider.models import Gider
-from kasa.models import Kasa, KasaHareket
+from kasa.models import Kasa, KasaGunlukOzet
 
 def dashboard_view(request):
-    bugun = date.today()
+    # Metrikler gruplanmış sorgularla hesaplanır ve kısa süreli cache'ten gelir
+    from .dashboard import metrikler
     
-    # Günlük satışlar
-    gunluk_satislar = Satis.objects.filter(
-        satis_tarihi__date=bugun,
-        durum='tamamlandi'
-    )
-    
-    # Satış istatistikleri
-    satis_stats = gunluk_satislar.aggregate(
-        toplam_tutar=Sum('toplam_tutar'),
-        satis_adedi=Count('id')
-    )
-    
-    bugunki_satis = satis_stats['toplam_tutar'] or 0
-    satis_sayisi = satis_stats['satis_adedi'] or 0
-    
-    # Ürün ve müşteri sayıları
-    toplam_urun = UrunVaryanti.objects.filter(aktif=True, urun__aktif=True).count()
-    toplam_musteri = Musteri.objects.filter(aktif=True).count()
-    
-    # Günlük gider
-    gunluk_gider = Gider.objects.filter(tarih=bugun).aggregate(
-        toplam=Sum('tutar')
-    )['toplam'] or 0
-    
-    # Stok uyarıları (kritik stok seviyesinin altında)
-    kritik_stoklar = UrunVaryanti.objects.filter(
-        aktif=True,
-        urun__aktif=True,
-        stok_miktari__lte=F('urun__kritik_stok_seviyesi')
-    ).select_related('urun', 'renk', 'beden').count()
-    
-    # En çok satan ürünler (bugün)
-    cok_satan_urunler = SatisDetay.objects.filter(
-        satis__satis_tarihi__date=bugun,
-        satis__durum='tamamlandi'
-    ).values(
-        'urun__ad'
-    ).annotate(
-        toplam_miktar=Sum('miktar'),
-        toplam_ciro=Sum('toplam_fiyat')
-    ).order_by('-toplam_miktar')[:5]
-    
-    # Son satışlar
-    son_satislar = Satis.objects.filter(
-        satis_tarihi__date=bugun,
-        durum='tamamlandi'
-    ).select_related('musteri', 'satici').order_by('-satis_tarihi')[:5]
-    
-    # Net kar hesaplama
-    net_kar = bugunki_satis - gunluk_gider
-    
-    # Aylık satış trendi (son 7 gün)
-    from datetime import timedelta
-    haftalik_satis = []
-    for i in range(7):
-        tarih = bugun - timedelta(days=i)
-        gunluk_tutar = Satis.objects.filter(
-            satis_tarihi__date=tarih,
-            durum='tamamlandi'
-        ).aggregate(toplam=Sum('toplam_tutar'))['toplam'] or 0
-        
-        haftalik_satis.append({
-            'tarih': tarih,
-            'tutar': gunluk_tutar
-        })
-    
-    haftalik_satis.reverse()  # Tarih sırasına göre
-    
-    context = {
-        'bugun': bugun,
-        'toplam_urun': toplam_urun,
-        'toplam_musteri': toplam_musteri,
-        'bugunki_satis': bugunki_satis,
-        'satis_sayisi': satis_sayisi,
-        'bugunki_gider_toplam': gunluk_gider,
-        'net_kar': net_kar,
-        'kritik_stoklar': kritik_stoklar,
-        'cok_satan_urunler': cok_satan_urunler,
-        'son_satislar': son_satislar,
-        'haftalik_satis': haftalik_satis,
-    }
-    
-    return render(request, 'dashboard.html', context)
+    return render(request, 'dashboard.html', metrikler())
+
 
 def gunluk_rapor_view(request):
     # Tarih parametresi
@@ -181,20 +99,11 @@ def gunluk_rapor_view(request):
     kasalar = Kasa.objects.filter(aktif=True)
     kasa_durumu = []
     
+    # Günlük kasa hareketleri - günlük özetten tek sorguda
+    gunluk_toplamlar = KasaGunlukOzet.gun_toplamlari(secili_tarih, kasalar)
+    
     for kasa in kasalar:
-        # Günlük kasa hareketleri
-        gunluk_hareketler = KasaHareket.objects.filter(
-            kasa=kasa,
-            tarih__date=secili_tarih
-        )
-        
-        gunluk_giris = gunluk_hareketler.filter(
-            tip='giris'
-        ).aggregate(toplam=Sum('tutar'))['toplam'] or 0
-        
-        gunluk_cikis = gunluk_hareketler.filter(
-            tip='cikis'
-        ).aggregate(toplam=Sum('tutar'))['toplam'] or 0
+        gunluk_giris, gunluk_cikis = gunluk_toplamlar.get(kasa.pk, (0, 0))
         
         gunluk_net = gunluk_giris - gunluk_cikis
         
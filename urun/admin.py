@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import UrunKategoriUst, Renk, Beden, Marka, Urun, UrunVaryanti, StokHareket, StokDegisiklikLog
+from .models import (
+    UrunKategoriUst, Renk, Beden, Marka, Urun, UrunVaryanti, StokHareket, StokDegisiklikLog,
+    StokHareketGunlukOzet, StokHareketArsiv,
+)
 
 
 @admin.register(UrunKategoriUst)
@@ -214,6 +217,32 @@ class StokHareketAdmin(admin.ModelAdmin):
         return False  # Stok hareketleri sadece sistem tarafından oluşturulmalı
 
 
+@admin.register(StokHareketGunlukOzet)
+class StokHareketGunlukOzetAdmin(admin.ModelAdmin):
+    list_display = ['varyant', 'tarih', 'hareket_tipi', 'hareket_sayisi', 'toplam_miktar']
+    list_filter = ['hareket_tipi', 'tarih']
+    search_fields = ['varyant__urun__ad', 'varyant__barkod']
+    raw_id_fields = ['varyant']
+    date_hierarchy = 'tarih'
+
+    def has_add_permission(self, request):
+        return False  # Özetler stok hareketlerinden türetilir
+
+
+@admin.register(StokHareketArsiv)
+class StokHareketArsivAdmin(admin.ModelAdmin):
+    list_display = ['varyant', 'hareket_tipi', 'miktar', 'onceki_stok', 'yeni_stok', 'kullanici', 'olusturma_tarihi']
+    list_filter = ['hareket_tipi', 'olusturma_tarihi']
+    search_fields = ['varyant__urun__ad', 'varyant__barkod', 'aciklama']
+    raw_id_fields = ['varyant', 'kullanici']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False  # Arşiv değiştirilemez
+
+
 @admin.register(StokDegisiklikLog)
 class StokDegisiklikLogAdmin(admin.ModelAdmin):
     list_display = ['varyant', 'islem_tipi', 'eski_miktar', 'yeni_miktar', 'miktar_degisimi_display', 'kullanici', 'olusturma_tarihi']
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class UrunConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'urun'
+
+    def ready(self):
+        from . import signals  # noqa: F401 - sinyalleri kaydet
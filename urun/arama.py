@@ -0,0 +1,113 @@
+"""
+Ürün arama indeksi.
+
+Her varyant için ürün adı, ürün kodu, barkod, renk, beden, kategori ve marka
+tek bir normalize edilmiş metinde (UrunVaryanti.arama_metni) tutulur. Arama
+bu alanda kelime kelime "içerir" filtresi ile yapılır:
+
+- PostgreSQL: alan üzerinde pg_trgm GIN indeksi vardır (migration 0013),
+  LIKE '%...%' sorguları indeksten karşılanır ve sonuçlar trigram
+  benzerliğine göre sıralanır.
+- SQLite (yerel geliştirme): aynı sorgu indekssiz çalışır.
+
+Metin varyant kaydedilirken oluşturulur; ürün, renk, beden, kategori veya
+marka değiştiğinde ilgili varyantlar sinyallerle toplu güncellenir.
+"""
+from django.db import connection
+from django.db.models import Case, IntegerField, Value, When
+
+# Türkçe karakterler ASCII karşılıklarına indirgenir ("gomlek" -> "Gömlek" bulur)
+_KATLAMA = str.maketrans({
+    'İ': 'i', 'I': 'i', 'ı': 'i',
+    'Ç': 'c', 'ç': 'c', 'Ğ': 'g', 'ğ': 'g', 'Ö': 'o', 'ö': 'o',
+    'Ş': 's', 'ş': 's', 'Ü': 'u', 'ü': 'u',
+})
+
+SONUC_LIMITI = 10
+PARTI = 1000
+
+
+def normalize(metin):
+    """Arama için metni küçük harfe ve ASCII'ye indir"""
+    return ' '.join((metin or '').translate(_KATLAMA).lower().split())
+
+
+def belge_olustur(varyant):
+    """Varyantın arama metnini oluştur (ilişkiler select_related ile gelmiş olmalı)"""
+    urun = varyant.urun
+    parcalar = [
+        urun.ad,
+        urun.urun_kodu,
+        varyant.barkod,
+        varyant.renk.ad if varyant.renk_id else None,
+        varyant.beden.ad if varyant.beden_id else None,
+        urun.kategori.ad if urun.kategori_id else None,
+        urun.marka.ad if urun.marka_id else None,
+    ]
+    return normalize(' '.join(p for p in parcalar if p))
+
+
+def belgeleri_guncelle(queryset=None, parti=PARTI):
+    """Verilen varyantların (varsayılan: tümü) arama metnini yeniden oluştur, değişen sayısını döndür"""
+    from .models import UrunVaryanti
+
+    if queryset is None:
+        queryset = UrunVaryanti.objects.all()
+    queryset = queryset.select_related('urun__kategori', 'urun__marka', 'renk', 'beden').order_by()
+
+    degisen = []
+    toplam = 0
+    for varyant in queryset.iterator(chunk_size=parti):
+        belge = belge_olustur(varyant)
+        if belge != varyant.arama_metni:
+            varyant.arama_metni = belge
+            degisen.append(varyant)
+        if len(degisen) >= parti:
+            UrunVaryanti.objects.bulk_update(degisen, ['arama_metni'])
+            toplam += len(degisen)
+            degisen = []
+    if degisen:
+        UrunVaryanti.objects.bulk_update(degisen, ['arama_metni'])
+        toplam += len(degisen)
+    return toplam
+
+
+def ara(sorgu, limit=SONUC_LIMITI, queryset=None):
+    """
+    Satışa uygun varyantlarda arama yap, sıralı ve ilişkileri yüklenmiş liste döndür.
+
+    Sıralama: tam barkod eşleşmesi, tam ürün kodu eşleşmesi, ürün adı ile
+    başlayanlar, diğerleri; PostgreSQL'de aynı grupta trigram benzerliği.
+    """
+    from .models import UrunVaryanti
+
+    kelimeler = normalize(sorgu).split()
+    if not kelimeler:
+        return []
+
+    if queryset is None:
+        queryset = UrunVaryanti.objects.filter(aktif=True, urun__aktif=True, stok_miktari__gt=0)
+    for kelime in kelimeler:
+        queryset = queryset.filter(arama_metni__contains=kelime)
+
+    ham = sorgu.strip()
+    queryset = queryset.annotate(
+        arama_sirasi=Case(
+            When(barkod=ham, then=Value(0)),
+            When(urun__urun_kodu=ham, then=Value(1)),
+            When(arama_metni__startswith=' '.join(kelimeler), then=Value(2)),
+            default=Value(3),
+            output_field=IntegerField(),
+        )
+    )
+    siralama = ['arama_sirasi']
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        queryset = queryset.annotate(benzerlik=TrigramSimilarity('arama_metni', ' '.join(kelimeler)))
+        siralama.append('-benzerlik')
+    siralama += ['urun__ad', 'id']
+
+    return list(
+        queryset.select_related('urun__kategori', 'urun__marka', 'renk', 'beden').order_by(*siralama)[:limit]
+    )
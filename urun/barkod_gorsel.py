@@ -0,0 +1,150 @@
+"""
+Barkod görseli önbelleği.
+
+Code128 PNG'leri python-barcode + PIL ile bir kez çizilir ve MEDIA_ROOT
+altında, barkod metni ve çizim seçeneklerinin özetinden türetilen adla
+saklanır (barkodlar/ab/abcdef....png). Aynı içerik hep aynı dosya adına
+düştüğünden dosyalar değişmez; view uzun süreli Cache-Control ile sunar.
+
+Dosya sayısı BARKOD_GORSEL_LIMIT'i aşarsa en uzun süredir kullanılmayanlar
+(değişiklik zamanına göre, okundukça güncellenir) silinir.
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+
+from django.conf import settings
+
+KLASOR = 'barkodlar'
+VARSAYILAN_SECENEKLER = {
+    'module_width': 0.2,
+    'module_height': 15.0,
+    'quiet_zone': 6.5,
+    'font_size': 10,
+    'text_distance': 5.0,
+    'background': 'white',
+    'foreground': 'black',
+}
+DOKUNMA_ARALIGI = 3600  # saniye; okunan dosyanın zamanı en fazla saatte bir güncellenir
+BUDAMA_ARALIGI = 200  # bu kadar yeni dosyada bir sınır kontrol edilir
+
+_yeni_dosya_sayisi = 0
+
+
+def _limit():
+    return getattr(settings, 'BARKOD_GORSEL_LIMIT', 20000)
+
+
+def klasor():
+    return os.path.join(settings.MEDIA_ROOT, KLASOR)
+
+
+def anahtar(barkod, secenekler=None):
+    """Barkod ve çizim seçeneklerinin içerik özeti"""
+    secenekler = {**VARSAYILAN_SECENEKLER, **(secenekler or {})}
+    ham = json.dumps([barkod, secenekler], sort_keys=True)
+    return hashlib.sha256(ham.encode('utf-8')).hexdigest()[:32]
+
+
+def dosya_yolu(barkod, secenekler=None):
+    ozet = anahtar(barkod, secenekler)
+    return os.path.join(klasor(), ozet[:2], f'{ozet}.png')
+
+
+def ciz(barkod, secenekler=None):
+    """Barkodu önbelleğe bakmadan PNG byte'ları olarak çiz"""
+    from barcode import Code128
+    from barcode.writer import ImageWriter
+
+    buffer = io.BytesIO()
+    Code128(barkod, writer=ImageWriter()).write(buffer, options={**VARSAYILAN_SECENEKLER, **(secenekler or {})})
+    return buffer.getvalue()
+
+
+def _dokun(yol):
+    try:
+        if time.time() - os.path.getmtime(yol) > DOKUNMA_ARALIGI:
+            os.utime(yol)
+    except OSError:
+        pass
+
+
+def _yaz(yol, veri):
+    """Dosyayı geçici adla yazıp yerine taşı; yarım dosya okunmaz"""
+    os.makedirs(os.path.dirname(yol), exist_ok=True)
+    fd, gecici = tempfile.mkstemp(dir=os.path.dirname(yol), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as dosya:
+            dosya.write(veri)
+        os.replace(gecici, yol)
+    except BaseException:
+        try:
+            os.remove(gecici)
+        except OSError:
+            pass
+        raise
+
+
+def getir(barkod, secenekler=None):
+    """
+    Barkod görselinin dosya yolunu döndür; önbellekte yoksa çizip kaydet.
+
+    Hata durumunda (geçersiz barkod vb.) None döner.
+    """
+    global _yeni_dosya_sayisi
+
+    if not barkod:
+        return None
+    yol = dosya_yolu(barkod, secenekler)
+    if os.path.exists(yol):
+        _dokun(yol)
+        return yol
+
+    try:
+        _yaz(yol, ciz(barkod, secenekler))
+    except Exception:
+        return None
+
+    _yeni_dosya_sayisi += 1
+    if _yeni_dosya_sayisi >= BUDAMA_ARALIGI:
+        _yeni_dosya_sayisi = 0
+        buda()
+    return yol
+
+
+def png(barkod, secenekler=None):
+    """Barkod görselinin PNG byte'ları (önbellekten)"""
+    yol = getir(barkod, secenekler)
+    if yol is None:
+        return None
+    with open(yol, 'rb') as dosya:
+        return dosya.read()
+
+
+def buda(limit=None):
+    """Önbellekte en fazla `limit` dosya bırak, en eski kullanılanları sil; silinen sayısını döndür"""
+    limit = _limit() if limit is None else limit
+    dosyalar = []
+    for kok, _, adlar in os.walk(klasor()):
+        for ad in adlar:
+            if ad.endswith('.png'):
+                yol = os.path.join(kok, ad)
+                try:
+                    dosyalar.append((os.path.getmtime(yol), yol))
+                except OSError:
+                    continue
+    if len(dosyalar) <= limit:
+        return 0
+
+    dosyalar.sort()
+    silinen = 0
+    for _, yol in dosyalar[:len(dosyalar) - limit]:
+        try:
+            os.remove(yol)
+            silinen += 1
+        except OSError:
+            pass
+    return silinen
@@ -0,0 +1,278 @@
+"""
+Barkod arama indeksi.
+
+Kasadaki barkod okutmaları için barkod -> varyant kaydı eşlemesi. Kayıtlar
+satış ekranının ihtiyaç duyduğu alanlarla önceden hazırlanmış küçük
+sözlüklerdir; önce işlem içi (process) bellekte, sonra Django cache'inde
+aranır, ikisinde de yoksa tek bir JOIN'li sorgu ile oluşturulur.
+
+coz() NUV formatındaki barkodu önce UrunVaryanti.barkod_cozumle ile çözer ve
+varyantı fiyattan bağımsız kimliği (ürün kodu + renk kodu + beden kodu) ile
+bulur. Böylece fiyat güncellemesinden sonra etiketteki barkod ile kayıttaki
+barkod farklı olsa bile okutma çalışır; etiketteki fiyat eskiyse bildirilir.
+
+Geçersiz kılma:
+- UrunVaryanti / Urun kaydedildiğinde veya silindiğinde (sinyaller)
+- Stok UrunVaryanti.stok_guncelle / stok_ayarla ile değiştiğinde
+- Renk, Beden veya kategori değiştiğinde indeks sürümü artırılır
+
+Diğer worker'ların işlem içi kopyaları en geç YEREL_SURE saniye içinde
+cache'teki güncel kayda döner. Stok burada yalnızca bilgi amaçlıdır; satışta
+asıl kontrolü UrunVaryanti.stok_guncelle yapar.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+CACHE_ONEK = 'barkod_index'
+CACHE_SURE = 3600  # Paylaşılan cache'te kayıt süresi (saniye)
+BULUNAMADI_SURE = 60  # Bulunamayan barkodlar için negatif cache süresi
+YEREL_SURE = 5  # İşlem içi kopyanın geçerlilik süresi (saniye)
+YEREL_LIMIT = 20000  # İşlem içi kopyada tutulacak en fazla kayıt
+
+# Bulunamayan barkodlar cache'te bu değerle tutulur (None "cache'te yok" demek)
+BULUNAMADI = 0
+
+KAYIT_ALANLARI = (
+    'id', 'urun_id', 'barkod', 'stok_miktari',
+    'urun__ad', 'urun__aktif', 'urun__satis_fiyati', 'urun__kategori__ad', 'urun__urun_kodu',
+    'renk__ad', 'beden__ad', 'renk__kod', 'beden__kod',
+)
+
+# Kayıtta bulunan ama istemciye gönderilmeyen alanlar
+IC_ALANLAR = ('urun_aktif', 'kimlik')
+
+_yerel = {}  # barkod -> (son_gecerlilik, kayit)
+_yerel_surum = [0.0, None]  # [son_gecerlilik, surum]
+_kod_tablolari = {}  # surum -> {'renk': {kod: id}, 'beden': {kod: id}}
+
+
+def _kimlik(urun_kodu, renk_kod, beden_kod):
+    """Varyantın fiyattan bağımsız barkod kimliği"""
+    if not urun_kodu:
+        return None
+    return f"{urun_kodu}{renk_kod or '0'}{beden_kod or '0'}"
+
+
+def _kayit_olustur(satir):
+    """values() satırından satış ekranı için hazır varyant kaydı oluştur"""
+    parcalar = [ad for ad in (satir['renk__ad'], satir['beden__ad']) if ad]
+    fiyat = float(satir['urun__satis_fiyati'])
+    return {
+        'id': satir['urun_id'],
+        'varyant_id': satir['id'],
+        'ad': satir['urun__ad'],
+        'varyasyon': " - ".join(parcalar) if parcalar else "Standart",
+        'beden': satir['beden__ad'] or 'Tek Beden',
+        'renk': satir['renk__ad'] or 'Standart',
+        'barkod': satir['barkod'],
+        'fiyat': fiyat,
+        'satis_fiyati': fiyat,
+        'stok_miktari': satir['stok_miktari'],
+        'kategori': satir['urun__kategori__ad'],
+        'urun_aktif': satir['urun__aktif'],
+        'kimlik': _kimlik(satir['urun__urun_kodu'], satir['renk__kod'], satir['beden__kod']),
+    }
+
+
+def _surum():
+    """İndeks sürümü; işlem içinde YEREL_SURE boyunca tekrar okunmaz"""
+    simdi = time.monotonic()
+    if _yerel_surum[0] > simdi and _yerel_surum[1] is not None:
+        return _yerel_surum[1]
+    surum = cache.get(f'{CACHE_ONEK}:surum')
+    if surum is None:
+        surum = 1
+        cache.add(f'{CACHE_ONEK}:surum', surum, None)
+    _yerel_surum[:] = [simdi + YEREL_SURE, surum]
+    return surum
+
+
+def _anahtar(barkod, surum):
+    return f'{CACHE_ONEK}:{surum}:{barkod}'
+
+
+def _kimlik_anahtar(kimlik, surum):
+    return f'{CACHE_ONEK}:{surum}:k:{kimlik}'
+
+
+def _cache_kayitlari(kayit, surum):
+    """Bir kaydın barkod ve kimlik anahtarlarıyla cache'e yazılacak sözlüğü"""
+    kayitlar = {_anahtar(kayit['barkod'], surum): kayit}
+    if kayit['kimlik']:
+        kayitlar[_kimlik_anahtar(kayit['kimlik'], surum)] = kayit
+    return kayitlar
+
+
+def _yerel_kaydet(barkod, kayit):
+    if len(_yerel) >= YEREL_LIMIT:
+        _yerel.clear()
+    _yerel[barkod] = (time.monotonic() + YEREL_SURE, kayit)
+
+
+def bul(barkod):
+    """
+    Barkoda ait aktif varyant kaydını döndür, yoksa None.
+
+    Sık okutulan barkodlar için veritabanına hiç gidilmez.
+    """
+    if not barkod:
+        return None
+
+    yerel = _yerel.get(barkod)
+    if yerel and yerel[0] > time.monotonic():
+        return yerel[1] or None
+
+    anahtar = _anahtar(barkod, _surum())
+    kayit = cache.get(anahtar)
+    if kayit is None:
+        from .models import UrunVaryanti
+
+        satir = UrunVaryanti.objects.filter(barkod=barkod, aktif=True).values(*KAYIT_ALANLARI).first()
+        if satir:
+            kayit = _kayit_olustur(satir)
+            cache.set_many(_cache_kayitlari(kayit, _surum()), CACHE_SURE)
+        else:
+            kayit = BULUNAMADI
+            cache.set(anahtar, kayit, BULUNAMADI_SURE)
+
+    _yerel_kaydet(barkod, kayit)
+    return kayit or None
+
+
+def isit(queryset=None, parti=2000):
+    """Aktif varyantların tamamını (veya verilen queryset'i) indekse yükle, kayıt sayısını döndür"""
+    from .models import UrunVaryanti
+
+    if queryset is None:
+        queryset = UrunVaryanti.objects.filter(aktif=True)
+    surum = _surum()
+    toplam = 0
+    kayitlar = {}
+    for satir in queryset.values(*KAYIT_ALANLARI).iterator(chunk_size=parti):
+        if not satir['barkod']:
+            continue
+        kayitlar.update(_cache_kayitlari(_kayit_olustur(satir), surum))
+        toplam += 1
+        if len(kayitlar) >= parti:
+            cache.set_many(kayitlar, CACHE_SURE)
+            kayitlar = {}
+    if kayitlar:
+        cache.set_many(kayitlar, CACHE_SURE)
+    return toplam
+
+
+def _kodlar(surum):
+    """Renk ve beden kodu -> id sözlükleri (indeks sürümü değişince yeniden yüklenir)"""
+    tablolar = _kod_tablolari.get(surum)
+    if tablolar is None:
+        tablolar = cache.get(f'{CACHE_ONEK}:{surum}:kodlar')
+        if tablolar is None:
+            from .models import Renk, Beden
+            tablolar = {
+                'renk': dict(Renk.objects.values_list('kod', 'id')),
+                'beden': dict(Beden.objects.values_list('kod', 'id')),
+            }
+            cache.set(f'{CACHE_ONEK}:{surum}:kodlar', tablolar, CACHE_SURE)
+        _kod_tablolari.clear()
+        _kod_tablolari[surum] = tablolar
+    return tablolar
+
+
+def _kimlik_ile_bul(sonuc):
+    """Çözümlenmiş NUV barkodundaki ürün/renk/beden kodlarıyla aktif varyant kaydını bul"""
+    kimlik = _kimlik(sonuc['urun_numarasi'], sonuc['renk_kodu'], sonuc['beden_kodu'])
+
+    yerel = _yerel.get(kimlik)
+    if yerel and yerel[0] > time.monotonic():
+        return yerel[1] or None
+
+    surum = _surum()
+    kayit = cache.get(_kimlik_anahtar(kimlik, surum))
+    if kayit is None:
+        kodlar = _kodlar(surum)
+        filtre = {'urun__urun_kodu': sonuc['urun_numarasi'], 'aktif': True}
+        for alan in ('renk', 'beden'):
+            kod = sonuc[f'{alan}_kodu']
+            if kod is None:
+                filtre[f'{alan}__isnull'] = True
+            elif kod in kodlar[alan]:
+                filtre[f'{alan}_id'] = kodlar[alan][kod]
+            else:
+                return None
+
+        from .models import UrunVaryanti
+
+        satir = UrunVaryanti.objects.filter(**filtre).values(*KAYIT_ALANLARI).first()
+        if not satir:
+            return None
+        kayit = _kayit_olustur(satir)
+        cache.set_many(_cache_kayitlari(kayit, surum), CACHE_SURE)
+
+    _yerel_kaydet(kimlik, kayit)
+    return kayit
+
+
+def coz(barkod):
+    """
+    Barkodu önce çözerek varyant kaydını bul.
+
+    (kayit, etiket_fiyati) döndürür. etiket_fiyati yalnızca barkoddaki fiyat
+    ürünün güncel satış fiyatından farklıysa doludur (eski etiket). Eski
+    formattaki veya çözülemeyen barkodlar için doğrudan barkod araması yapılır.
+    """
+    from .models import UrunVaryanti
+
+    sonuc = UrunVaryanti.barkod_cozumle(barkod) if barkod else None
+    if not sonuc or sonuc['format'] != 'code128' or not sonuc['fiyat_kodu'].isdigit():
+        return bul(barkod), None
+
+    kayit = _kimlik_ile_bul(sonuc)
+    if kayit is None:
+        return bul(barkod), None
+
+    etiket_fiyati = int(sonuc['fiyat_kodu'])
+    if etiket_fiyati != int(kayit['satis_fiyati']):
+        return kayit, etiket_fiyati
+    return kayit, None
+
+
+def yanit(kayit):
+    """Kaydın istemciye gönderilecek kopyası"""
+    return {alan: deger for alan, deger in kayit.items() if alan not in IC_ALANLAR}
+
+
+def _sil(barkodlar):
+    from .models import UrunVaryanti
+
+    surum = _surum()
+    anahtarlar = []
+    for barkod in barkodlar:
+        anahtarlar.append(_anahtar(barkod, surum))
+        _yerel.pop(barkod, None)
+        sonuc = UrunVaryanti.barkod_cozumle(barkod)
+        if sonuc and sonuc['format'] == 'code128':
+            kimlik = _kimlik(sonuc['urun_numarasi'], sonuc['renk_kodu'], sonuc['beden_kodu'])
+            anahtarlar.append(_kimlik_anahtar(kimlik, surum))
+            _yerel.pop(kimlik, None)
+    cache.delete_many(anahtarlar)
+
+
+def gecersiz_kil(barkodlar):
+    """Verilen barkodların kayıtlarını transaction commit edildikten sonra sil"""
+    barkodlar = [b for b in barkodlar if b]
+    if barkodlar:
+        transaction.on_commit(lambda: _sil(barkodlar))
+
+
+def tumunu_gecersiz_kil():
+    """İndeks sürümünü artırarak tüm kayıtları geçersiz kıl (renk/beden/kategori değişiklikleri)"""
+    def _artir():
+        try:
+            cache.incr(f'{CACHE_ONEK}:surum')
+        except ValueError:
+            cache.set(f'{CACHE_ONEK}:surum', 2, None)
+        _yerel_surum[:] = [0.0, None]
+        _yerel.clear()
+    transaction.on_commit(_artir)
@@ -0,0 +1,162 @@
+"""
+Toplu etiket üretimi (ZPL ve PRN/TSPL).
+
+Şablonlar modül yüklenirken bir kez hazırlanır:
+
+- Yazıcı kurulum bloğu (ZPL) / SIZE-GAP-DIRECTION başlığı (PRN) iş başına
+  bir kez gönderilir.
+- Etiket başına yalnızca değişken alanlar (ürün adı, barkod, fiyat...)
+  küçük bir format şablonuna yerleştirilir; büyük BITMAP verisi her etikette
+  yeniden formatlanmaz, hazır metin olarak eklenir (TSPL'de CLS tampon
+  belleği temizlediğinden bitmap'ler her farklı etiket için gönderilmelidir).
+- Aynı etiketin kopyaları şablonu tekrarlamak yerine ZPL'de ^PQ, PRN'de
+  PRINT 1,n ile yazıcıya bırakılır.
+
+Etiket verileri tek values() sorgusuyla okunur ve çıktı generator olarak
+üretilir; view'lar bunu StreamingHttpResponse ile parça parça gönderir.
+"""
+from .models import PRN_TEMPLATE, UrunVaryanti
+
+# ZPL - stoktakip/tsc_to_zpl_converter.generate_label ile aynı tasarım
+ZPL_KURULUM = "CT~~CD,~CC^~CT~\n^XA~TA000~JSN^LT0^MNW^MTT^PON^PMN^LH0,0^JMA^PR2,2~SD4^JUS^LRN^CI0^XZ\n"
+ZPL_ETIKET = (
+    "^XA\n"
+    "^MMT\n"
+    "^PW432\n"
+    "^LL0320\n"
+    "^LS0\n"
+    "^FT128,75^A0N,66,64^FH\\^FDNUVIA^FS\n"
+    "^FT16,100^A0N,28,28^FH\\^FDPREMIUM WEAR MAN & WOMAN^FS\n"
+    "^FT204,255^A0N,25,24^FH\\^FDBeden:^FS\n"
+    "^FT281,255^A0N,25,24^FH\\^FD{size}^FS\n"
+    "^FT204,286^A0N,25,24^FH\\^FDFiyat:^FS\n"
+    "^FT275,288^A0N,25,24^FH\\^FD{price}^FS\n"
+    "^FT360,289^A0N,25,24^FH\\^FDTL^FS\n"
+    "^FT204,154^A0N,25,24^FH\\^FD{product_code}^FS\n"
+    "^FT204,189^A0N,25,24^FH\\^FD{brand}^FS\n"
+    "^FT204,224^A0N,25,24^FH\\^FDRenk:^FS\n"
+    "^FT272,224^A0N,25,24^FH\\^FD{color}^FS\n"
+    "^FT24,296^BQN,2,8\n"
+    "^FH\\^FDLA,{barcode}^FS\n"
+    "^PQ{adet},0,1,Y^XZ\n"
+)
+
+
+def _prn_sablonlari(sablon):
+    """PRN_TEMPLATE'i iş başlığı, sabit gövde (bitmap'ler) ve değişken alanlar olarak ayır"""
+    satirlar = sablon.splitlines()
+    cls = satirlar.index('CLS')
+    govde = [satir for satir in satirlar[cls:] if not satir.startswith('PRINT')]
+    baslik = '\n'.join(satirlar[:cls]) + '\n'
+    sabit = '\n'.join(satir for satir in govde if '{' not in satir) + '\n'
+    degisken = '\n'.join(satir for satir in govde if '{' in satir) + '\nPRINT 1,{adet}\n'
+    return baslik, sabit, degisken
+
+
+PRN_BASLIK, PRN_SABIT, PRN_DEGISKEN = _prn_sablonlari(PRN_TEMPLATE)
+
+ETIKET_ALANLARI = (
+    'id', 'barkod', 'urun_id', 'urun__ad', 'urun__urun_kodu', 'urun__satis_fiyati',
+    'urun__marka__ad', 'renk__ad', 'beden__ad',
+)
+
+
+def etiket_verisi(satir):
+    """values() satırından etiket alanları"""
+    renk, beden = satir['renk__ad'], satir['beden__ad']
+    varyasyon = " - ".join(ad for ad in (renk, beden) if ad)
+    return {
+        'brand': satir['urun__marka__ad'] or 'NUVIA',
+        'product_code': satir['urun__urun_kodu'] or '00001',
+        'product_name': f"{satir['urun__ad']} {varyasyon}" if varyasyon else satir['urun__ad'],
+        'price': satir['urun__satis_fiyati'],
+        'size': beden or 'Genel',
+        'color': renk or 'Kırmızı',
+        'barcode': satir['barkod'] or f"{satir['urun_id']}{satir['id']}".zfill(12),
+    }
+
+
+def varyant_etiket_verisi(varyant):
+    """Yüklenmiş varyant nesnesinden etiket alanları (sorgu yapmaz, ilişkiler yüklü olmalı)"""
+    urun = varyant.urun
+    return etiket_verisi({
+        'id': varyant.id,
+        'barkod': varyant.barkod,
+        'urun_id': urun.id,
+        'urun__ad': urun.ad,
+        'urun__urun_kodu': urun.urun_kodu,
+        'urun__satis_fiyati': urun.satis_fiyati,
+        'urun__marka__ad': urun.marka.ad if urun.marka_id else None,
+        'renk__ad': varyant.renk.ad if varyant.renk_id else None,
+        'beden__ad': varyant.beden.ad if varyant.beden_id else None,
+    })
+
+
+def urun_etiket_verisi(urun):
+    """Varyantı olmayan ürün için etiket alanları"""
+    return {
+        'brand': urun.marka.ad if urun.marka_id else 'NUVIA',
+        'product_code': urun.urun_kodu or '00001',
+        'product_name': urun.ad,
+        'price': urun.satis_fiyati,
+        'size': 'Genel',
+        'color': 'Kırmızı',
+        'barcode': str(urun.id).zfill(12),
+    }
+
+
+def varyant_etiketleri(istekler):
+    """
+    [(varyant_id, adet), ...] -> [(etiket_verisi, adet), ...] - tek sorgu.
+
+    Sıra korunur; bulunamayan varyantlar ve adedi 1'den küçük satırlar atlanır.
+    """
+    istekler = [(int(varyant_id), int(adet)) for varyant_id, adet in istekler if int(adet) > 0]
+    satirlar = {
+        satir['id']: satir
+        for satir in UrunVaryanti.objects.filter(pk__in={varyant_id for varyant_id, adet in istekler})
+        .values(*ETIKET_ALANLARI)
+    }
+    return [(etiket_verisi(satirlar[varyant_id]), adet) for varyant_id, adet in istekler if varyant_id in satirlar]
+
+
+def _fiyat(fiyat):
+    return str(fiyat).replace(" TL", "").replace("TL", "").strip()
+
+
+def zpl_akisi(etiketler):
+    """[(etiket_verisi, adet), ...] için ZPL: kurulum bloğu bir kez, ardından etiket başına bir blok"""
+    yield ZPL_KURULUM
+    for veri, adet in etiketler:
+        yield ZPL_ETIKET.format(
+            size=veri['size'],
+            price=_fiyat(veri['price']),
+            product_code=veri['product_code'],
+            brand=veri['brand'],
+            color=veri['color'],
+            barcode=veri['barcode'],
+            adet=adet,
+        )
+
+
+def prn_akisi(etiketler, tarih=None):
+    """[(etiket_verisi, adet), ...] için PRN (TSPL): başlık bir kez, kopyalar PRINT 1,n ile"""
+    from datetime import datetime
+
+    tarih = tarih or datetime.now().strftime("%d.%m.%Y")
+    yield PRN_BASLIK
+    for veri, adet in etiketler:
+        yield PRN_SABIT
+        yield PRN_DEGISKEN.format(
+            product_name=veri['product_name'][:30],  # Etiket boyutu limiti
+            barcode=veri['barcode'],
+            price=f"{float(veri['price']):.2f}",
+            date=tarih,
+            adet=adet,
+        )
+
+
+AKISLAR = {
+    'zpl': zpl_akisi,
+    'prn': prn_akisi,
+}
@@ -0,0 +1,135 @@
+"""
+Toplu fiyat güncelleme.
+
+Seçilen ürünlerin satış fiyatı tek bir UPDATE ile veritabanında hesaplanır
+(F() ifadeleri); ürünler Python'a yüklenip tek tek kaydedilmez. Fiyat,
+NUV barkodlarının son hanelerinde (fiyat kodu) bulunduğundan etkilenen
+varyantların barkodu ve arama metni parti parti bulk_update ile yenilenir.
+Sorgu sayısı ürün sayısından bağımsızdır (varyantlar PARTI'lık gruplarla).
+
+Tipler:
+- oran: mevcut fiyata yüzde ekle/çıkar
+- sabit: mevcut fiyata sabit tutar ekle/çıkar (sıfırın altına inmez)
+- kar_orani: alış fiyatı üzerinden yeni kar oranıyla hesapla (alış fiyatı olanlar)
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Avg, Count, DecimalField, F, Value
+from django.db.models.functions import Greatest, Round
+from django.utils import timezone
+
+GUNCELLEME_TIPLERI = ('oran', 'sabit', 'kar_orani')
+ORNEK_SAYISI = 20
+PARTI = 1000
+
+
+def _deger(deger):
+    return Value(Decimal(deger), output_field=DecimalField(max_digits=12, decimal_places=4))
+
+
+def _hedefler(urunler, tip):
+    """Tipe göre güncellenecek ürünler (kar oranında alış fiyatı olmayanlar atlanır)"""
+    if tip not in GUNCELLEME_TIPLERI:
+        raise ValueError(f"Geçersiz güncelleme tipi: {tip}")
+    if tip == 'kar_orani':
+        return urunler.filter(alis_fiyati__gt=0)
+    return urunler
+
+
+def yeni_fiyat_ifadesi(tip, deger):
+    """Yeni satış fiyatını veren veritabanı ifadesi"""
+    deger = Decimal(deger)
+    if tip == 'oran':
+        if deger <= -100:
+            raise ValueError("Fiyat %100 veya daha fazla azaltılamaz.")
+        return Round(F('satis_fiyati') * _deger(Decimal('1') + deger / Decimal('100')), 2)
+    if tip == 'sabit':
+        return Greatest(F('satis_fiyati') + _deger(deger), _deger(0))
+    if tip == 'kar_orani':
+        if deger < 0:
+            raise ValueError("Kar oranı negatif olamaz.")
+        return Round(F('alis_fiyati') * _deger(Decimal('1') + deger / Decimal('100')), 2)
+    raise ValueError(f"Geçersiz güncelleme tipi: {tip}")
+
+
+def fiyat_kodu(fiyat):
+    """Barkodun son hanelerindeki fiyat kodu (UrunVaryanti.olustur_barkod ile aynı)"""
+    return str(int(fiyat)).zfill(4)
+
+
+def yeni_barkod(barkod, eski_fiyat, yeni_fiyat):
+    """
+    NUV barkodundaki fiyat kodunu değiştir.
+
+    Elle girilmiş/eski formatlı barkodlar veya fiyat kodu uyuşmayanlar için None döner.
+    """
+    eski_kod, yeni_kod = fiyat_kodu(eski_fiyat), fiyat_kodu(yeni_fiyat)
+    if eski_kod == yeni_kod or not barkod or not barkod.startswith('NUV') or not barkod.endswith(eski_kod):
+        return None
+    return barkod[:-len(eski_kod)] + yeni_kod
+
+
+def onizle(urunler, tip, deger, ornek_sayisi=ORNEK_SAYISI):
+    """Değişiklik yapmadan etkilenecek ürün/varyant sayısını ve örnek fiyatları döndür"""
+    from .models import UrunVaryanti
+
+    hedefler = _hedefler(urunler, tip).annotate(yeni_fiyat=yeni_fiyat_ifadesi(tip, deger))
+    ozet = hedefler.aggregate(
+        urun_sayisi=Count('id'),
+        eski_ortalama=Avg('satis_fiyati'),
+        yeni_ortalama=Avg('yeni_fiyat'),
+    )
+    ozet['varyant_sayisi'] = UrunVaryanti.objects.filter(urun__in=hedefler.values('pk')).count()
+    ozet['ornekler'] = list(
+        hedefler.order_by('ad').values('urun_kodu', 'ad', 'alis_fiyati', 'satis_fiyati', 'yeni_fiyat')[:ornek_sayisi]
+    )
+    return ozet
+
+
+def uygula(urunler, tip, deger):
+    """
+    Fiyatları tek transaction içinde güncelle, {'urun_sayisi', 'barkod_sayisi'} döndür.
+
+    update()/bulk_update() sinyal tetiklemediğinden barkod indeksi ve arama
+    metinleri burada yenilenir.
+    """
+    from . import barkod_index
+    from .arama import belge_olustur
+    from .models import UrunVaryanti
+
+    hedefler = _hedefler(urunler, tip)
+    degerler = {'satis_fiyati': yeni_fiyat_ifadesi(tip, deger), 'guncelleme_tarihi': timezone.now()}
+    if tip == 'kar_orani':
+        degerler['kar_orani'] = _deger(deger)
+
+    with transaction.atomic():
+        eski_fiyatlar = dict(hedefler.values_list('pk', 'satis_fiyati'))
+        urun_sayisi = hedefler.update(**degerler) if eski_fiyatlar else 0
+
+        barkod_sayisi = 0
+        degisen = []
+        varyantlar = (
+            UrunVaryanti.objects.filter(urun__in=hedefler.values('pk'))
+            .select_related('urun__kategori', 'urun__marka', 'renk', 'beden')
+            .order_by()
+        )
+        for varyant in varyantlar.iterator(chunk_size=PARTI):
+            barkod = yeni_barkod(varyant.barkod, eski_fiyatlar.get(varyant.urun_id, 0), varyant.urun.satis_fiyati)
+            if barkod is None:
+                continue
+            varyant.barkod = barkod
+            varyant.arama_metni = belge_olustur(varyant)
+            degisen.append(varyant)
+            if len(degisen) >= PARTI:
+                UrunVaryanti.objects.bulk_update(degisen, ['barkod', 'arama_metni'])
+                barkod_sayisi += len(degisen)
+                degisen = []
+        if degisen:
+            UrunVaryanti.objects.bulk_update(degisen, ['barkod', 'arama_metni'])
+            barkod_sayisi += len(degisen)
+
+        # Kayıtlardaki fiyat ve barkodlar değişti; indeksin tamamı commit sonrası yenilenir
+        barkod_index.tumunu_gecersiz_kil()
+
+    return {'urun_sayisi': urun_sayisi, 'barkod_sayisi': barkod_sayisi}
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from urun import arama
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the product search documents (UrunVaryanti.arama_metni)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=arama.PARTI, help='Variants per bulk update')
+
+    def handle(self, *args, **options):
+        guncellenen = arama.belgeleri_guncelle(parti=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Search index rebuilt: {guncellenen} variants updated'))
@@ -0,0 +1,66 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+
+from urun import barkod_index
+from urun.models import UrunVaryanti
+
+
+class Command(BaseCommand):
+    help = 'Replay barcode scans against the POS barcode endpoint and report queries/latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scans', type=int, default=5000, help='Number of scans to replay')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the scan sequence')
+
+    def handle(self, *args, **options):
+        from satis.views import barkod_sorgula
+
+        barkodlar = list(UrunVaryanti.objects.filter(aktif=True).values_list('barkod', flat=True))
+        if not barkodlar:
+            self.stdout.write(self.style.WARNING('No active variants to scan'))
+            return
+
+        # Kasadaki gibi: az sayıda ürün çok sık, geri kalanı seyrek okutulur
+        rastgele = random.Random(options['seed'])
+        populer = barkodlar[:max(1, len(barkodlar) // 10)]
+        taramalar = [
+            rastgele.choice(populer) if rastgele.random() < 0.8 else rastgele.choice(barkodlar)
+            for _ in range(options['scans'])
+        ]
+        factory = RequestFactory()
+
+        def eski_yontem(barkod):
+            varyant = UrunVaryanti.objects.get(barkod=barkod, aktif=True)
+            urun = varyant.urun
+            return (urun.ad, varyant.varyasyon_adi, str(urun.kategori), varyant.stok_miktari)
+
+        def endpoint(barkod):
+            return barkod_sorgula(factory.get('/satis/barkod-sorgula/', {'barkod': barkod}))
+
+        def calistir(ad, fonksiyon):
+            sorgu_sayisi = [0]
+
+            def say(execute, sql, params, many, context):
+                sorgu_sayisi[0] += 1
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(say):
+                baslangic = time.perf_counter()
+                for barkod in taramalar:
+                    fonksiyon(barkod)
+                sure = time.perf_counter() - baslangic
+            self.stdout.write(
+                f'{ad:<22} {len(taramalar):>6} scans  {sorgu_sayisi[0]:>6} queries  '
+                f'{sure * 1000:>9.1f} ms total  {sure * 1e6 / len(taramalar):>8.1f} us/scan'
+            )
+
+        calistir('ORM get + relations', eski_yontem)
+        barkod_index.tumunu_gecersiz_kil()
+        calistir('index (cold)', endpoint)
+        calistir('index (warm)', endpoint)
+
+        self.stdout.write(self.style.SUCCESS('Barcode benchmark completed'))
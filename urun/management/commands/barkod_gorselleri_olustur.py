@@ -0,0 +1,35 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from urun import barkod_gorsel
+from urun.models import UrunVaryanti
+
+
+class Command(BaseCommand):
+    help = 'Pre-render barcode images for the catalog into the on-disk cache (MEDIA_ROOT/barkodlar)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tumu', action='store_true', help='Include inactive variants and products')
+        parser.add_argument('--buda', action='store_true', help='Evict least recently used images over the limit afterwards')
+
+    def handle(self, *args, **options):
+        varyantlar = UrunVaryanti.objects.exclude(barkod='')
+        if not options['tumu']:
+            varyantlar = varyantlar.filter(aktif=True, urun__aktif=True)
+
+        olusturulan = mevcut = hatali = 0
+        for barkod in varyantlar.order_by().values_list('barkod', flat=True).distinct().iterator(chunk_size=2000):
+            if os.path.exists(barkod_gorsel.dosya_yolu(barkod)):
+                mevcut += 1
+            elif barkod_gorsel.getir(barkod):
+                olusturulan += 1
+            else:
+                hatali += 1
+                self.stdout.write(self.style.WARNING(f'Could not render barcode {barkod}'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{olusturulan} images rendered, {mevcut} already cached, {hatali} failed'
+        ))
+        if options['buda']:
+            self.stdout.write(f'{barkod_gorsel.buda()} images evicted')
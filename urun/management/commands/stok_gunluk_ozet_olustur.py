@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from urun.models import StokHareketGunlukOzet
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily stock movement summaries (StokHareketGunlukOzet) from live and archived movements'
+
+    def handle(self, *args, **options):
+        ozetler = StokHareketGunlukOzet.hareketlerden_hesapla()
+        with transaction.atomic():
+            StokHareketGunlukOzet.objects.all().delete()
+            StokHareketGunlukOzet.objects.bulk_create(
+                [
+                    StokHareketGunlukOzet(
+                        varyant_id=varyant_id, tarih=tarih, hareket_tipi=tip, hareket_sayisi=adet, toplam_miktar=miktar
+                    )
+                    for (varyant_id, tarih, tip), (adet, miktar) in ozetler.items()
+                ],
+                batch_size=1000,
+            )
+        self.stdout.write(self.style.SUCCESS(f'{len(ozetler)} daily summaries rebuilt'))
@@ -0,0 +1,28 @@
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from urun.models import StokHareket
+
+
+class Command(BaseCommand):
+    help = 'Move stock movements older than N months into the archive table (daily summaries are kept)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ay', type=int, default=12, help='Archive movements from before the start of the month this many months ago (default: 12)')
+        parser.add_argument('--parti', type=int, default=5000, help='Movements moved per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many movements would be archived')
+
+    def handle(self, *args, **options):
+        # Ayın başına yuvarla; bir ayın hareketleri hep birlikte arşivlenir
+        bugun = timezone.localdate()
+        ay_sayisi = bugun.year * 12 + bugun.month - 1 - options['ay']
+        oncesi = timezone.make_aware(datetime.combine(bugun.replace(year=ay_sayisi // 12, month=ay_sayisi % 12 + 1, day=1), time.min))
+        if options['dry_run']:
+            sayi = StokHareket.objects.filter(olusturma_tarihi__lt=oncesi).count()
+            self.stdout.write(f'{sayi} movements older than {oncesi:%Y-%m-%d} would be archived')
+            return
+
+        tasinan = StokHareket.arsivle(oncesi, parti=options['parti'])
+        self.stdout.write(self.style.SUCCESS(f'{tasinan} movements older than {oncesi:%Y-%m-%d} archived'))
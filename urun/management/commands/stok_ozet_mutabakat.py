@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from urun.models import StokHareketGunlukOzet
+
+
+class Command(BaseCommand):
+    help = 'Compare the daily stock movement summaries (StokHareketGunlukOzet) with live and archived movements'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--varyant', type=int, action='append', help='Only this variant (may be repeated)')
+        parser.add_argument('--duzelt', action='store_true', help='Overwrite mismatching summaries with values computed from movements')
+
+    def handle(self, *args, **options):
+        varyant_idleri = options['varyant']
+        farklar = self._farklar(varyant_idleri)
+        for (varyant_id, tarih, tip), beklenen, ozet in farklar:
+            mevcut = (ozet.hareket_sayisi, ozet.toplam_miktar) if ozet else (0, 0)
+            self.stdout.write(self.style.WARNING(
+                f'variant {varyant_id} {tarih} {tip}: summary {mevcut[1]} ({mevcut[0]} movements), '
+                f'movements {beklenen[1]} ({beklenen[0]} movements)'
+            ))
+
+        if not farklar:
+            self.stdout.write(self.style.SUCCESS('Daily stock movement summaries are consistent'))
+            return
+
+        if not options['duzelt']:
+            self.stdout.write(self.style.ERROR(f'{len(farklar)} mismatching daily summaries (use --duzelt to repair)'))
+            return
+
+        with transaction.atomic():
+            # Özet satırları kilitlenip farklar kilit altında yeniden hesaplanır
+            list(self._ozetler(varyant_idleri).select_for_update().values_list('pk', flat=True))
+            farklar = self._farklar(varyant_idleri)
+            for (varyant_id, tarih, tip), (adet, miktar), ozet in farklar:
+                if not adet:
+                    ozet.delete()
+                else:
+                    StokHareketGunlukOzet.objects.update_or_create(
+                        varyant_id=varyant_id, tarih=tarih, hareket_tipi=tip,
+                        defaults={'hareket_sayisi': adet, 'toplam_miktar': miktar},
+                    )
+        self.stdout.write(self.style.SUCCESS(f'{len(farklar)} daily summaries repaired'))
+
+    def _ozetler(self, varyant_idleri):
+        ozetler = StokHareketGunlukOzet.objects.all()
+        if varyant_idleri:
+            ozetler = ozetler.filter(varyant_id__in=varyant_idleri)
+        return ozetler
+
+    def _farklar(self, varyant_idleri):
+        """Hareketlerden hesaplananla uyuşmayan özetler [((varyant_id, tarih, tip), (adet, miktar), ozet)]"""
+        beklenen_ozetler = StokHareketGunlukOzet.hareketlerden_hesapla(varyant_idleri or None)
+        mevcut_ozetler = {
+            (ozet.varyant_id, ozet.tarih, ozet.hareket_tipi): ozet
+            for ozet in self._ozetler(varyant_idleri)
+        }
+
+        farklar = []
+        for anahtar in sorted(set(beklenen_ozetler) | set(mevcut_ozetler)):
+            beklenen = tuple(beklenen_ozetler.get(anahtar, (0, 0)))
+            ozet = mevcut_ozetler.get(anahtar)
+            mevcut = (ozet.hareket_sayisi, ozet.toplam_miktar) if ozet else (0, 0)
+            if mevcut != beklenen:
+                farklar.append((anahtar, beklenen, ozet))
+        return farklar
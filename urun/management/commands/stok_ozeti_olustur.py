@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from urun.models import Urun
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-product stock summary (Urun.toplam_stok / aktif_varyant_sayisi) from variants'
+
+    def handle(self, *args, **options):
+        guncellenen = Urun.stok_ozetini_guncelle()
+        self.stdout.write(self.style.SUCCESS(f'Stock summary rebuilt for {guncellenen} products'))
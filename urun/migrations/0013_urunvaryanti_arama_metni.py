@@ -0,0 +1,76 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:14
+
+from django.db import migrations, models
+
+
+# urun/arama.py normalize()/belge_olustur() fonksiyonlarının bu migration anındaki
+# kopyası; uygulama kodu sonradan değişse de migration aynı sonucu üretir.
+_KATLAMA = str.maketrans({
+    'İ': 'i', 'I': 'i', 'ı': 'i',
+    'Ç': 'c', 'ç': 'c', 'Ğ': 'g', 'ğ': 'g', 'Ö': 'o', 'ö': 'o',
+    'Ş': 's', 'ş': 's', 'Ü': 'u', 'ü': 'u',
+})
+
+
+def belge_olustur(varyant):
+    urun = varyant.urun
+    parcalar = [
+        urun.ad,
+        urun.urun_kodu,
+        varyant.barkod,
+        varyant.renk.ad if varyant.renk_id else None,
+        varyant.beden.ad if varyant.beden_id else None,
+        urun.kategori.ad if urun.kategori_id else None,
+        urun.marka.ad if urun.marka_id else None,
+    ]
+    metin = ' '.join(p for p in parcalar if p)
+    return ' '.join(metin.translate(_KATLAMA).lower().split())
+
+
+def arama_metinlerini_olustur(apps, schema_editor):
+    """Mevcut varyantların arama metnini doldur"""
+    UrunVaryanti = apps.get_model('urun', 'UrunVaryanti')
+    varyantlar = UrunVaryanti.objects.select_related('urun__kategori', 'urun__marka', 'renk', 'beden')
+    parti = []
+    for varyant in varyantlar.iterator(chunk_size=1000):
+        varyant.arama_metni = belge_olustur(varyant)
+        parti.append(varyant)
+        if len(parti) >= 1000:
+            UrunVaryanti.objects.bulk_update(parti, ['arama_metni'])
+            parti = []
+    if parti:
+        UrunVaryanti.objects.bulk_update(parti, ['arama_metni'])
+
+
+def trigram_indeksi_olustur(apps, schema_editor):
+    """PostgreSQL'de arama metni için pg_trgm GIN indeksi (diğer veritabanlarında atlanır)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS urun_varyant_arama_trgm '
+        'ON urun_urunvaryanti USING gin (arama_metni gin_trgm_ops)'
+    )
+
+
+def trigram_indeksini_sil(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS urun_varyant_arama_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('urun', '0012_urun_urun_urun_aktif_2399e5_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='urunvaryanti',
+            name='arama_metni',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Arama Metni'),
+        ),
+        migrations.RunPython(arama_metinlerini_olustur, migrations.RunPython.noop),
+        migrations.RunPython(trigram_indeksi_olustur, trigram_indeksini_sil),
+    ]
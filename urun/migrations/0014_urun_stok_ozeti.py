@@ -0,0 +1,49 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:15
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, Count, OuterRef, Subquery, Sum, When
+from django.db.models.functions import Coalesce
+
+
+def stok_ozetlerini_hesapla(apps, schema_editor):
+    """Mevcut ürünlerin stok özetini varyantlardan doldur (Urun.stok_ozetini_guncelle ile aynı hesap)"""
+    Urun = apps.get_model('urun', 'Urun')
+    UrunVaryanti = apps.get_model('urun', 'UrunVaryanti')
+
+    varyantlar = UrunVaryanti.objects.filter(urun=OuterRef('pk')).order_by()
+    aktif_varyantlar = varyantlar.filter(aktif=True).values('urun')
+    Urun.objects.update(
+        toplam_stok=Case(
+            When(varyasyonlu=True, then=Coalesce(
+                Subquery(aktif_varyantlar.annotate(toplam=Sum('stok_miktari')).values('toplam')), 0)),
+            default=Coalesce(Subquery(varyantlar.order_by('id').values('stok_miktari')[:1]), 0),
+        ),
+        aktif_varyant_sayisi=Coalesce(Subquery(aktif_varyantlar.annotate(sayi=Count('id')).values('sayi')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('urun', '0013_urunvaryanti_arama_metni'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='urun',
+            name='aktif_varyant_sayisi',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Aktif Varyant Sayısı'),
+        ),
+        migrations.AddField(
+            model_name='urun',
+            name='toplam_stok',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Toplam Stok'),
+        ),
+        migrations.AddIndex(
+            model_name='urun',
+            index=models.Index(fields=['toplam_stok'], name='urun_urun_toplam__aa2662_idx'),
+        ),
+        migrations.RunPython(stok_ozetlerini_hesapla, migrations.RunPython.noop),
+    ]
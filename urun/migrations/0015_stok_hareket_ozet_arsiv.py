@@ -0,0 +1,122 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def gunluk_ozetleri_olustur(apps, schema_editor):
+    """Mevcut stok hareketlerinden günlük özetleri doldur"""
+    StokHareket = apps.get_model('urun', 'StokHareket')
+    StokHareketGunlukOzet = apps.get_model('urun', 'StokHareketGunlukOzet')
+
+    satirlar = (
+        StokHareket.objects.annotate(gun=TruncDate('olusturma_tarihi'))
+        .values('varyant_id', 'gun', 'hareket_tipi')
+        .annotate(adet=Count('id'), miktar=Sum('miktar'))
+        .order_by()
+    )
+    StokHareketGunlukOzet.objects.bulk_create(
+        (
+            StokHareketGunlukOzet(
+                varyant_id=satir['varyant_id'], tarih=satir['gun'], hareket_tipi=satir['hareket_tipi'],
+                hareket_sayisi=satir['adet'], toplam_miktar=satir['miktar'] or 0,
+            )
+            for satir in satirlar.iterator(chunk_size=2000)
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('urun', '0014_urun_stok_ozeti'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StokHareketArsiv',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('hareket_tipi', models.CharField(choices=[('giris', 'Stok Girişi'), ('cikis', 'Stok Çıkışı'), ('duzeltme', 'Stok Düzeltmesi'), ('sayim_eksik', 'Sayım Eksiği'), ('sayim_fazla', 'Sayım Fazlası'), ('transfer', 'Transfer'), ('fire', 'Fire')], max_length=20, verbose_name='Hareket Tipi')),
+                ('miktar', models.IntegerField(verbose_name='Miktar')),
+                ('onceki_stok', models.IntegerField(verbose_name='Önceki Stok')),
+                ('yeni_stok', models.IntegerField(verbose_name='Yeni Stok')),
+                ('aciklama', models.TextField(blank=True, null=True, verbose_name='Açıklama')),
+                ('referans_id', models.CharField(blank=True, max_length=100, null=True, verbose_name='Referans ID')),
+                ('olusturma_tarihi', models.DateTimeField(verbose_name='Oluşturma Tarihi')),
+            ],
+            options={
+                'verbose_name': 'Arşivlenmiş Stok Hareketi',
+                'verbose_name_plural': 'Arşivlenmiş Stok Hareketleri',
+                'ordering': ['-olusturma_tarihi'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StokHareketGunlukOzet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tarih', models.DateField(verbose_name='Tarih')),
+                ('hareket_tipi', models.CharField(choices=[('giris', 'Stok Girişi'), ('cikis', 'Stok Çıkışı'), ('duzeltme', 'Stok Düzeltmesi'), ('sayim_eksik', 'Sayım Eksiği'), ('sayim_fazla', 'Sayım Fazlası'), ('transfer', 'Transfer'), ('fire', 'Fire')], max_length=20, verbose_name='Hareket Tipi')),
+                ('hareket_sayisi', models.IntegerField(default=0, verbose_name='Hareket Sayısı')),
+                ('toplam_miktar', models.IntegerField(default=0, verbose_name='Toplam Miktar')),
+            ],
+            options={
+                'verbose_name': 'Stok Hareket Günlük Özeti',
+                'verbose_name_plural': 'Stok Hareket Günlük Özetleri',
+                'ordering': ['-tarih', 'varyant'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='stokdegisikliklog',
+            index=models.Index(fields=['varyant', '-olusturma_tarihi'], name='urun_stokde_varyant_445148_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stokdegisikliklog',
+            index=models.Index(fields=['islem_tipi', '-olusturma_tarihi'], name='urun_stokde_islem_t_783814_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stokhareket',
+            index=models.Index(fields=['varyant', '-olusturma_tarihi'], name='urun_stokha_varyant_36faa7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stokhareket',
+            index=models.Index(fields=['hareket_tipi', '-olusturma_tarihi'], name='urun_stokha_hareket_eae1b9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stokhareket',
+            index=models.Index(fields=['-olusturma_tarihi'], name='urun_stokha_olustur_4194ac_idx'),
+        ),
+        migrations.AddField(
+            model_name='stokhareketarsiv',
+            name='kullanici',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Kullanıcı'),
+        ),
+        migrations.AddField(
+            model_name='stokhareketarsiv',
+            name='varyant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='arsiv_hareketleri', to='urun.urunvaryanti', verbose_name='Ürün Varyantı'),
+        ),
+        migrations.AddField(
+            model_name='stokhareketgunlukozet',
+            name='varyant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gunluk_hareket_ozetleri', to='urun.urunvaryanti', verbose_name='Ürün Varyantı'),
+        ),
+        migrations.AddIndex(
+            model_name='stokhareketarsiv',
+            index=models.Index(fields=['varyant', '-olusturma_tarihi'], name='urun_stokha_varyant_2a6b3e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stokhareketgunlukozet',
+            index=models.Index(fields=['tarih', 'hareket_tipi'], name='urun_stokha_tarih_40f073_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='stokhareketgunlukozet',
+            unique_together={('varyant', 'tarih', 'hareket_tipi')},
+        ),
+        migrations.RunPython(gunluk_ozetleri_olustur, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,8 @@
 from django.db import models
-from barcode import Code128
 from django.contrib.auth.models import User
-from barcode.writer import ImageWriter
 import io
 import base64
 from PIL import Image
-from datetime import datetime
 import os
 from django.conf import settings
 from decimal import Decimal
@@ -130,6 +127,10 @@ class Urun(models.Model):
     aktif = models.BooleanField(default=True, verbose_name="Aktif")
     stok_takibi = models.BooleanField(default=True, verbose_name="Stok Takibi Yapılsın")
     kritik_stok_seviyesi = models.PositiveIntegerField(default=5, verbose_name="Kritik Stok Seviyesi")
+
+    # Stok özeti - varyantlardan hesaplanır (Urun.stok_ozetini_guncelle)
+    toplam_stok = models.IntegerField(default=0, editable=False, verbose_name="Toplam Stok")
+    aktif_varyant_sayisi = models.PositiveIntegerField(default=0, editable=False, verbose_name="Aktif Varyant Sayısı")
     
     # Tarih bilgileri
     olusturma_tarihi = models.DateTimeField(auto_now_add=True)
@@ -147,6 +148,7 @@ class Urun(models.Model):
             models.Index(fields=['urun_kodu']),
             models.Index(fields=['ad']),
             models.Index(fields=['-olusturma_tarihi']),
+            models.Index(fields=['toplam_stok']),
         ]
 
     def save(self, *args, **kwargs):
@@ -164,14 +166,41 @@ class Urun(models.Model):
     def __str__(self):
         return f"{self.urun_kodu} - {self.ad}"
 
-    @property
-    def toplam_stok(self):
-        """Toplam stok miktarını hesapla"""
-        if self.varyasyonlu:
-            return sum(v.stok_miktari for v in self.varyantlar.filter(aktif=True))
-        else:
-            varyant = self.varyantlar.first()
-            return varyant.stok_miktari if varyant else 0
+    @classmethod
+    def stok_ozetini_guncelle(cls, urun_idleri=None):
+        """
+        toplam_stok ve aktif_varyant_sayisi alanlarını varyantlardan tek UPDATE ile yeniden hesapla.
+
+        Varyasyonlu ürünlerde toplam stok aktif varyantların toplamı, diğerlerinde
+        ilk varyantın stoğudur. urun_idleri verilmezse tüm ürünler güncellenir.
+        """
+        from django.db.models import Case, Count, OuterRef, Subquery, Sum, When
+        from django.db.models.functions import Coalesce
+
+        varyantlar = UrunVaryanti.objects.filter(urun=OuterRef('pk')).order_by()
+        aktif_varyantlar = varyantlar.filter(aktif=True).values('urun')
+        aktif_toplam = aktif_varyantlar.annotate(toplam=Sum('stok_miktari')).values('toplam')
+        aktif_sayi = aktif_varyantlar.annotate(sayi=Count('id')).values('sayi')
+        ilk_stok = varyantlar.order_by('id').values('stok_miktari')[:1]
+
+        queryset = cls.objects.all()
+        if urun_idleri is not None:
+            queryset = queryset.filter(pk__in=set(urun_idleri))
+        return queryset.update(
+            toplam_stok=Case(
+                When(varyasyonlu=True, then=Coalesce(Subquery(aktif_toplam), 0)),
+                default=Coalesce(Subquery(ilk_stok), 0),
+            ),
+            aktif_varyant_sayisi=Coalesce(Subquery(aktif_sayi), 0),
+        )
+
+    # (renk var mı, beden var mı) -> barkoddaki özellik kodu
+    OZELLIK_KODLARI = {
+        (True, True): "03",  # Renk + Beden
+        (True, False): "01",  # Sadece renk
+        (False, True): "02",  # Sadece beden
+        (False, False): "00",  # Varyasyonsuz
+    }
 
     @property
     def ozellik_kodu(self):
@@ -184,17 +213,7 @@ class Urun(models.Model):
         if not varyant:
             return "00"
         
-        renk_var = varyant.renk is not None
-        beden_var = varyant.beden is not None
-        
-        if renk_var and beden_var:
-            return "03"  # Renk + Beden
-        elif renk_var:
-            return "01"  # Sadece renk
-        elif beden_var:
-            return "02"  # Sadece beden
-        else:
-            return "00"  # Varyasyonsuz
+        return self.OZELLIK_KODLARI[(varyant.renk_id is not None, varyant.beden_id is not None)]
 
 
 
@@ -221,6 +240,14 @@ TEXT 109,25,"ARIALR.TTF",180,6,6,"{date}"
 PRINT 1,1"""
 
 
+class YetersizStok(ValueError):
+    """Koşullu stok güncellemesinde stoğu yetmeyen varyantlar için hata"""
+
+    def __init__(self, varyant_idleri):
+        self.varyant_idleri = list(varyant_idleri)
+        super().__init__("Yetersiz stok! Stok sıfırın altına düşürülemez.")
+
+
 class UrunVaryanti(models.Model):
     """Ürün varyantları - her renk/beden kombinasyonu için ayrı kayıt"""
     urun = models.ForeignKey(Urun, on_delete=models.CASCADE, related_name='varyantlar', verbose_name="Ürün")
@@ -240,8 +267,8 @@ class UrunVaryanti(models.Model):
         if self.stok_kaydedildi:
             raise ValueError("Bu ürünün stoğu zaten kaydedilmiş. Artık sadece Stok Hareket sistemi kullanılabilir!")
         
-        # Stok miktarını ayarla
-        self.stok_miktari = miktar
+        # Stoğu sıfırdan başlat, giriş hareketi miktarı ekler
+        UrunVaryanti.stok_ayarla(self.pk, 0)
         
         # İlk stok hareketini kaydet
         from .models import StokHareket  # Circular import'u önlemek için burada import
@@ -296,6 +323,9 @@ class UrunVaryanti(models.Model):
     olusturma_tarihi = models.DateTimeField(auto_now_add=True)
     guncelleme_tarihi = models.DateTimeField(auto_now=True)
 
+    # Arama indeksi (urun/arama.py): ürün adı, kodu, barkod, renk, beden, kategori, marka
+    arama_metni = models.TextField(blank=True, default='', editable=False, verbose_name="Arama Metni")
+
     class Meta:
         verbose_name = "Ürün Varyantı"
         verbose_name_plural = "Ürün Varyantları"
@@ -336,6 +366,9 @@ class UrunVaryanti(models.Model):
         # Barkod otomatik oluştur
         if not self.barkod:
             self.barkod = self.olustur_barkod()
+
+        from .arama import belge_olustur
+        self.arama_metni = belge_olustur(self)
         
         super().save(*args, **kwargs)
         
@@ -370,40 +403,22 @@ class UrunVaryanti(models.Model):
         
         return code128_data
     def barkod_gorseli_olustur(self, format='PNG'):
-        """Code 128 barkod görselini oluştur"""
+        """Code 128 barkod görselini oluştur (MEDIA_ROOT altındaki önbellekten, urun/barkod_gorsel.py)"""
+        from . import barkod_gorsel
+
         try:
-            # Barkod verisini al
-            barkod_data = self.olustur_barkod()
-            
-            # Code 128 barkod oluştur
-            code128 = Code128(barkod_data, writer=ImageWriter())
-            
-            # Görsel buffer'ı oluştur
-            buffer = io.BytesIO()
-            
-            # Barkod görselini oluştur
-            code128.write(buffer, options={
-                'module_width': 0.2,
-                'module_height': 15.0,
-                'quiet_zone': 6.5,
-                'font_size': 10,
-                'text_distance': 5.0,
-                'background': 'white',
-                'foreground': 'black',
-            })
-            
-            # Buffer'ı sıfırla
-            buffer.seek(0)
-            
+            # Kayıtlı barkod kullanılır; barkod_gorseli view'ı da aynı dosyayı sunar
+            image_data = barkod_gorsel.png(self.barkod or self.olustur_barkod())
+            if image_data is None:
+                return None
+
             if format.upper() == 'BASE64':
                 # Base64 formatında döndür
-                image_data = buffer.getvalue()
                 base64_data = base64.b64encode(image_data).decode('utf-8')
                 return f"data:image/png;base64,{base64_data}"
             else:
                 # PIL Image olarak döndür
-                image = Image.open(buffer)
-                return image
+                return Image.open(io.BytesIO(image_data))
                 
         except Exception as e:
             # Barkod görseli oluşturulurken hata meydana geldi
@@ -421,36 +436,12 @@ class UrunVaryanti(models.Model):
             # Barkod görseli kaydedilirken hata meydana geldi
             return False
 
-    def etiket_olustur(self, custom_date=None):
-        """Ürün varyantı için PRN etiket oluştur"""
+    def etiket_olustur(self, custom_date=None, adet=1):
+        """Ürün varyantı için PRN etiket oluştur (adet > 1 ise yazıcı kopyalar)"""
+        from .etiket import prn_akisi, varyant_etiket_verisi
+
         try:
-            # Tarih
-            if custom_date:
-                date_str = custom_date
-            else:
-                date_str = datetime.now().strftime("%d.%m.%Y")
-            
-            # Ürün adı ve varyasyon
-            product_name = f"{self.urun.ad}"
-            if self.varyasyon_adi != "Standart":
-                product_name += f" {self.varyasyon_adi}"
-            
-            # Barkod
-            barcode = self.olustur_barkod()
-            
-            # Fiyat
-            price = float(self.urun.satis_fiyati)
-            
-            # PRN içeriği oluştur
-            prn_content = PRN_TEMPLATE.format(
-                product_name=product_name[:30],  # Etiket boyutu limiti
-                barcode=barcode,
-                price=f"{price:.2f}",
-                date=date_str
-            )
-            
-            return prn_content
-            
+            return ''.join(prn_akisi([(varyant_etiket_verisi(self), adet)], custom_date))
         except Exception as e:
             # Etiket oluşturulurken hata meydana geldi
             return None
@@ -469,13 +460,9 @@ class UrunVaryanti(models.Model):
             return False
 
     def toplu_etiket_olustur(self, miktar=1):
-        """Aynı üründen birden fazla etiket oluştur"""
-        etiketler = []
-        for i in range(miktar):
-            etiket = self.etiket_olustur()
-            if etiket:
-                etiketler.append(etiket)
-        return etiketler
+        """Aynı üründen birden fazla etiket: tek iş, kopyaları yazıcı basar (PRINT 1,miktar)"""
+        etiket = self.etiket_olustur(adet=miktar)
+        return [etiket] if etiket else []
 
     @classmethod
     def toplu_etiket_yazdir(cls, varyant_list, output_dir="labels"):
@@ -510,6 +497,184 @@ class UrunVaryanti(models.Model):
     def __str__(self):
         return f"{self.urun.ad} ({self.varyasyon_adi})"
 
+    @classmethod
+    def stok_guncelle(cls, degisimler):
+        """
+        Varyant stoklarını tek bir koşullu UPDATE ile değiştir.
+
+        degisimler: {varyant_id: degisim} - negatif değerler stoktan düşer.
+        Sorgu stoğu sıfırın altına düşecek satırları güncellemez; böyle bir
+        varyant varsa hiçbir değişiklik kalıcı olmaz ve YetersizStok fırlatılır.
+        Başarılı olursa {varyant_id: (onceki_stok, yeni_stok)} döner.
+        """
+        from django.db import connection, transaction
+        from django.utils import timezone
+
+        degisimler = {int(k): int(v) for k, v in degisimler.items() if v}
+        if not degisimler:
+            return {}
+
+        simdi = cls._meta.get_field('guncelleme_tarihi').get_db_prep_value(timezone.now(), connection)
+        qn = connection.ops.quote_name
+        tablo, pk, stok = qn(cls._meta.db_table), qn('id'), qn('stok_miktari')
+
+        with transaction.atomic():
+            if connection.vendor in ('postgresql', 'sqlite'):
+                # UPDATE ... RETURNING: okuma ve yazma tek sorguda
+                case_sql = f"CASE {pk} " + " ".join(["WHEN %s THEN %s"] * len(degisimler)) + " END"
+                case_params = [p for item in degisimler.items() for p in item]
+                id_sql = ", ".join(["%s"] * len(degisimler))
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"UPDATE {tablo} SET {stok} = {stok} + {case_sql}, {qn('guncelleme_tarihi')} = %s "
+                        f"WHERE {pk} IN ({id_sql}) AND {stok} + {case_sql} >= 0 "
+                        f"RETURNING {pk}, {stok}, {qn('barkod')}, {qn('urun_id')}",
+                        case_params + [simdi] + list(degisimler) + case_params,
+                    )
+                    satirlar = cursor.fetchall()
+                yeni_stoklar = {varyant_id: yeni for varyant_id, yeni, barkod, urun_id in satirlar}
+                barkodlar = [barkod for varyant_id, yeni, barkod, urun_id in satirlar]
+                urun_idleri = {urun_id for varyant_id, yeni, barkod, urun_id in satirlar}
+            else:
+                yeni_stoklar = {}
+                mevcut = (
+                    cls.objects.select_for_update()
+                    .filter(pk__in=degisimler)
+                    .values_list('pk', 'stok_miktari', 'barkod', 'urun_id')
+                )
+                barkodlar = [barkod for varyant_id, onceki, barkod, urun_id in mevcut]
+                urun_idleri = {urun_id for varyant_id, onceki, barkod, urun_id in mevcut}
+                for varyant_id, onceki, barkod, urun_id in mevcut:
+                    if onceki + degisimler[varyant_id] >= 0:
+                        yeni_stoklar[varyant_id] = onceki + degisimler[varyant_id]
+                        cls.objects.filter(pk=varyant_id).update(stok_miktari=yeni_stoklar[varyant_id])
+
+            eksik = [varyant_id for varyant_id in degisimler if varyant_id not in yeni_stoklar]
+            if eksik:
+                raise YetersizStok(eksik)
+
+            Urun.stok_ozetini_guncelle(urun_idleri)
+
+            # Barkod indeksindeki stok bilgisi commit sonrası yenilensin
+            from . import barkod_index
+            from .signals import stok_degisti
+            barkod_index.gecersiz_kil(barkodlar)
+            stok_degisti.send(sender=cls, varyant_idleri=list(yeni_stoklar))
+
+        return {
+            varyant_id: (yeni - degisimler[varyant_id], yeni)
+            for varyant_id, yeni in yeni_stoklar.items()
+        }
+
+    @classmethod
+    def stok_ayarla(cls, varyant_id, yeni_miktar):
+        """Stoğu verilen miktara eşitle (düzeltme hareketleri için), (onceki, yeni) döndür"""
+        from django.db import transaction
+        from django.utils import timezone
+
+        from . import barkod_index
+        from .signals import stok_degisti
+
+        with transaction.atomic():
+            onceki, barkod, urun_id = (
+                cls.objects.select_for_update().values_list('stok_miktari', 'barkod', 'urun_id').get(pk=varyant_id)
+            )
+            cls.objects.filter(pk=varyant_id).update(stok_miktari=yeni_miktar, guncelleme_tarihi=timezone.now())
+            Urun.stok_ozetini_guncelle([urun_id])
+            barkod_index.gecersiz_kil([barkod])
+            stok_degisti.send(sender=cls, varyant_idleri=[varyant_id])
+        return onceki, yeni_miktar
+
+    @classmethod
+    def toplu_olustur(cls, urun, renk_idleri, beden_idleri, baslangic_stok=1):
+        """
+        Seçilen renk x beden kombinasyonlarından eksik varyantları toplu oluştur.
+
+        Renkler, bedenler ve mevcut kombinasyonlar üç sorguda okunur; barkod ve
+        arama metni bellekte hesaplanır, varyantlar tek bulk_create ile eklenir.
+        Barkodu başka bir varyantta kullanılan kombinasyonlar atlanır. Varyantlar
+        tek tek oluşturmadaki gibi stok_kaydedildi=False ile eklenir; ilk stok
+        girişi (ve hareketi) sonradan varyasyon stok ekranından veya
+        ilk_stok_ayarla ile yapılır. renk_idleri/beden_idleri içindeki None
+        "renksiz"/"bedensiz" anlamına gelir. (olusturulan_sayisi, atlanan_sayisi) döndürür.
+
+        urun'un kategori ve marka ilişkileri select_related ile yüklenmiş olmalıdır.
+        """
+        from django.db import transaction
+
+        from . import barkod_index
+        from .arama import belge_olustur
+        from .signals import stok_degisti
+
+        renk_idleri = list(dict.fromkeys(int(i) if i else None for i in renk_idleri))
+        beden_idleri = list(dict.fromkeys(int(i) if i else None for i in beden_idleri))
+
+        renkler = Renk.objects.in_bulk([i for i in renk_idleri if i is not None])
+        bedenler = Beden.objects.in_bulk([i for i in beden_idleri if i is not None])
+        eksik = [i for i in renk_idleri if i is not None and i not in renkler]
+        eksik += [i for i in beden_idleri if i is not None and i not in bedenler]
+        if eksik:
+            raise ValueError(f"Renk/beden bulunamadı: {', '.join(map(str, eksik))}")
+        renkler[None] = bedenler[None] = None
+
+        # Varsayılan sıralamayla; ilk varyant barkoddaki özellik kodunu belirler (Urun.ozellik_kodu)
+        mevcut = list(cls.objects.filter(urun=urun).values_list('renk_id', 'beden_id'))
+        mevcut_set = set(mevcut)
+
+        kombinasyonlar = [
+            (renk_id, beden_id)
+            for renk_id in renk_idleri for beden_id in beden_idleri
+            if (renk_id, beden_id) not in mevcut_set
+        ]
+        atlanan = len(renk_idleri) * len(beden_idleri) - len(kombinasyonlar)
+        if not kombinasyonlar:
+            return 0, atlanan
+
+        if not urun.varyasyonlu:
+            ozellik_kodu = "00"
+        else:
+            ilk_renk_id, ilk_beden_id = mevcut[0] if mevcut else kombinasyonlar[0]
+            ozellik_kodu = Urun.OZELLIK_KODLARI[(ilk_renk_id is not None, ilk_beden_id is not None)]
+        fiyat_kodu = str(int(urun.satis_fiyati)).zfill(4)
+
+        yeni_varyantlar = []
+        for renk_id, beden_id in kombinasyonlar:
+            renk, beden = renkler[renk_id], bedenler[beden_id]
+            varyant = cls(
+                urun=urun,
+                renk=renk,
+                beden=beden,
+                stok_miktari=baslangic_stok,
+                stok_kaydedildi=False,
+                aktif=True,
+            )
+            # olustur_barkod ile aynı format, sorgusuz
+            varyant.barkod = (
+                f"NUV{ozellik_kodu}{renk.kod if renk else '0'}{beden.kod if beden else '0'}"
+                f"{urun.urun_kodu}{fiyat_kodu}"
+            )
+            varyant.arama_metni = belge_olustur(varyant)
+            yeni_varyantlar.append(varyant)
+
+        # Barkod tüm varyantlarda benzersiz; çakışanlar eklenmeden ayıklanır
+        kullanilan = set(
+            cls.objects.filter(barkod__in=[v.barkod for v in yeni_varyantlar])
+            .values_list('barkod', flat=True)
+        )
+        olusturulan = [v for v in yeni_varyantlar if v.barkod not in kullanilan]
+        if not olusturulan:
+            return 0, atlanan + len(yeni_varyantlar)
+
+        with transaction.atomic():
+            # PostgreSQL ve SQLite eklenen satırların id'lerini döndürür
+            olusturulan = cls.objects.bulk_create(olusturulan)
+
+            Urun.stok_ozetini_guncelle([urun.pk])
+            barkod_index.gecersiz_kil([varyant.barkod for varyant in olusturulan])
+            stok_degisti.send(sender=cls, varyant_idleri=[varyant.pk for varyant in olusturulan])
+
+        return len(olusturulan), atlanan + len(yeni_varyantlar) - len(olusturulan)
+
     @classmethod
     def barkod_cozumle(cls, barkod):
         """Code 128 formatında barkod çözümleme algoritması"""
@@ -611,6 +776,10 @@ class StokDegisiklikLog(models.Model):
         verbose_name = "Stok Değişiklik Logu"
         verbose_name_plural = "Stok Değişiklik Logları"
         ordering = ['-olusturma_tarihi']
+        indexes = [
+            models.Index(fields=['varyant', '-olusturma_tarihi']),
+            models.Index(fields=['islem_tipi', '-olusturma_tarihi']),
+        ]
     
     def __str__(self):
         return f"{self.varyant} - {self.get_islem_tipi_display()} ({self.eski_miktar}→{self.yeni_miktar})"
@@ -632,6 +801,47 @@ class StokDegisiklikLog(models.Model):
         )
 
 
+class StokHareketQuerySet(models.QuerySet):
+    """
+    Toplu silme ve güncellemelerde de StokHareketGunlukOzet'i güncel tutar
+    (admin "seçilenleri sil" eylemi dahil).
+    """
+    OZET_ALANLARI = ('varyant_id', 'hareket_tipi', 'miktar', 'olusturma_tarihi')
+
+    def _ozet_degerleri(self, kilitle=False):
+        queryset = self.order_by()
+        if kilitle:
+            queryset = queryset.select_for_update()
+        return list(queryset.values('pk', *self.OZET_ALANLARI))
+
+    def delete(self):
+        from django.db import transaction
+
+        with transaction.atomic():
+            eskiler = self._ozet_degerleri(kilitle=True)
+            sonuc = super().delete()
+            StokHareketGunlukOzet.hareketleri_isle(eskiler, isaret=-1)
+        return sonuc
+
+    def ozetten_dusmeden_sil(self):
+        """Hareketleri sil, günlük özetlere dokunma (arşive taşınan hareketler özette kalır)"""
+        return super().delete()
+
+    def update(self, **kwargs):
+        from django.db import transaction
+
+        alanlar = {alan[:-3] if alan.endswith('_id') else alan for alan in kwargs}
+        if not alanlar & {'varyant', 'hareket_tipi', 'miktar', 'olusturma_tarihi'}:
+            return super().update(**kwargs)
+        with transaction.atomic():
+            eskiler = self._ozet_degerleri(kilitle=True)
+            sonuc = super().update(**kwargs)
+            yeniler = StokHareket.objects.filter(pk__in=[eski['pk'] for eski in eskiler])._ozet_degerleri()
+            StokHareketGunlukOzet.hareketleri_isle(eskiler, isaret=-1)
+            StokHareketGunlukOzet.hareketleri_isle(yeniler)
+        return sonuc
+
+
 class StokHareket(models.Model):
     """Stok hareket takip modeli"""
     HAREKET_TIPLERI = [
@@ -644,6 +854,10 @@ class StokHareket(models.Model):
         ('fire', 'Fire'),
     ]
     
+    # Stoğu miktar kadar artıran / azaltan hareket tipleri; diğerleri stoğu miktara eşitler
+    ARTIRAN_TIPLER = ('giris', 'sayim_fazla', 'duzeltme_artis')
+    AZALTAN_TIPLER = ('cikis', 'sayim_eksik', 'duzeltme_azalis')
+    
     varyant = models.ForeignKey('UrunVaryanti', on_delete=models.CASCADE, verbose_name="Ürün Varyantı")
     hareket_tipi = models.CharField(max_length=20, choices=HAREKET_TIPLERI, verbose_name="Hareket Tipi")
     miktar = models.IntegerField(verbose_name="Miktar")
@@ -653,30 +867,96 @@ class StokHareket(models.Model):
     referans_id = models.CharField(max_length=100, blank=True, null=True, verbose_name="Referans ID")  # Satış ID vs.
     kullanici = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, verbose_name="Kullanıcı")
     olusturma_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturma Tarihi")
+
+    objects = StokHareketQuerySet.as_manager()
     
     class Meta:
         verbose_name = "Stok Hareket"
         verbose_name_plural = "Stok Hareketleri"
         ordering = ['-olusturma_tarihi']
+        indexes = [
+            models.Index(fields=['varyant', '-olusturma_tarihi']),
+            models.Index(fields=['hareket_tipi', '-olusturma_tarihi']),
+            models.Index(fields=['-olusturma_tarihi']),
+        ]
     
     def __str__(self):
         return f"{self.varyant} - {self.get_hareket_tipi_display()} ({self.miktar})"
+
+    def save(self, *args, **kwargs):
+        from django.db import transaction
+
+        with transaction.atomic():
+            if self.pk:
+                # Düzenlenen hareketin eski etkisini özetten geri al
+                eski = StokHareket.objects.filter(pk=self.pk).values(
+                    'varyant_id', 'hareket_tipi', 'miktar', 'olusturma_tarihi').first()
+                if eski:
+                    StokHareketGunlukOzet.hareketleri_isle([eski], isaret=-1)
+            super().save(*args, **kwargs)
+            StokHareketGunlukOzet.hareketleri_isle([self])
+
+    def delete(self, *args, **kwargs):
+        from django.db import transaction
+
+        with transaction.atomic():
+            StokHareketGunlukOzet.hareketleri_isle([self], isaret=-1)
+            return super().delete(*args, **kwargs)
+
+    @classmethod
+    def toplu_olustur(cls, hareketler, batch_size=None):
+        """Hareketleri bulk_create ile yaz, günlük özetleri birlikte güncelle (bulk_create save() çağırmaz)"""
+        from django.db import transaction
+
+        with transaction.atomic():
+            hareketler = cls.objects.bulk_create(hareketler, batch_size=batch_size)
+            StokHareketGunlukOzet.hareketleri_isle(hareketler)
+        return hareketler
+
+    @classmethod
+    def arsivle(cls, oncesi, parti=5000):
+        """
+        oncesi tarihinden eski hareketleri parti parti StokHareketArsiv'e taşı, taşınan sayısını döndür.
+
+        Günlük özetler arşivlenen hareketleri de kapsamaya devam eder; her parti
+        kendi transaction'ında taşınır, yarıda kesilen komut kaldığı yerden sürer.
+        """
+        from django.db import transaction
+
+        alanlar = [alan.attname for alan in StokHareketArsiv._meta.concrete_fields]
+        tasinan = 0
+        while True:
+            with transaction.atomic():
+                idler = list(
+                    cls.objects.filter(olusturma_tarihi__lt=oncesi)
+                    .order_by('id').values_list('id', flat=True)[:parti]
+                )
+                if not idler:
+                    return tasinan
+                StokHareketArsiv.objects.bulk_create(
+                    [StokHareketArsiv(**satir) for satir in cls.objects.filter(id__in=idler).values(*alanlar)],
+                    ignore_conflicts=True,
+                )
+                # Arşivlenen hareketler özetlerde kalmaya devam eder
+                cls.objects.filter(id__in=idler).ozetten_dusmeden_sil()
+            tasinan += len(idler)
     
     @classmethod
     def stok_hareketi_olustur(cls, varyant, hareket_tipi, miktar, kullanici, aciklama=None, referans_id=None):
-        """Stok hareketi oluşturur"""
-        onceki_stok = varyant.stok_miktari
-        
-        if hareket_tipi == 'giris':
-            yeni_stok = onceki_stok + miktar
-        elif hareket_tipi == 'cikis':
-            yeni_stok = onceki_stok - miktar
-        elif hareket_tipi == 'sayim_eksik':
-            yeni_stok = onceki_stok - miktar
-        elif hareket_tipi == 'sayim_fazla':
-            yeni_stok = onceki_stok + miktar
+        """
+        Stok hareketi oluşturur.
+
+        Stok tek bir koşullu UPDATE ile değiştirilir; önceki ve yeni stok bu
+        sorgudan alındığı için aynı varyantı eş zamanlı satan kasalar birbirinin
+        düşümünü ezemez. Stok yetmezse YetersizStok fırlatılır.
+        """
+        if hareket_tipi in cls.ARTIRAN_TIPLER:
+            onceki_stok, yeni_stok = UrunVaryanti.stok_guncelle({varyant.pk: miktar})[varyant.pk]
+        elif hareket_tipi in cls.AZALTAN_TIPLER:
+            onceki_stok, yeni_stok = UrunVaryanti.stok_guncelle({varyant.pk: -miktar})[varyant.pk]
         else:
-            yeni_stok = miktar  # Düzeltme vb. için direkt miktar
+            # Düzeltme vb. için direkt miktar
+            onceki_stok, yeni_stok = UrunVaryanti.stok_ayarla(varyant.pk, miktar)
         
         # Stok hareketini kaydet
         hareket = cls.objects.create(
@@ -690,8 +970,154 @@ class StokHareket(models.Model):
             kullanici=kullanici
         )
         
-        # Varyantın stok miktarını güncelle (güvenli güncelleme)
         varyant.stok_miktari = yeni_stok
-        varyant.save(stok_hareket_guncelleme=True)
         
         return hareket
+
+
+class StokHareketGunlukOzet(models.Model):
+    """Varyant, gün ve hareket tipi başına stok hareketi toplamları (StokHareket'ten türetilir)"""
+    varyant = models.ForeignKey(UrunVaryanti, on_delete=models.CASCADE, related_name='gunluk_hareket_ozetleri', verbose_name="Ürün Varyantı")
+    tarih = models.DateField(verbose_name="Tarih")
+    hareket_tipi = models.CharField(max_length=20, choices=StokHareket.HAREKET_TIPLERI, verbose_name="Hareket Tipi")
+    hareket_sayisi = models.IntegerField(default=0, verbose_name="Hareket Sayısı")
+    toplam_miktar = models.IntegerField(default=0, verbose_name="Toplam Miktar")
+
+    class Meta:
+        verbose_name = "Stok Hareket Günlük Özeti"
+        verbose_name_plural = "Stok Hareket Günlük Özetleri"
+        ordering = ['-tarih', 'varyant']
+        unique_together = ['varyant', 'tarih', 'hareket_tipi']
+        indexes = [
+            models.Index(fields=['tarih', 'hareket_tipi']),
+        ]
+
+    def __str__(self):
+        return f"{self.varyant} - {self.tarih} {self.get_hareket_tipi_display()} ({self.toplam_miktar})"
+
+    @classmethod
+    def hareketleri_isle(cls, hareketler, isaret=1):
+        """
+        Hareketlerin etkisini günlük özetlere ekle (isaret=-1 geri alır).
+
+        hareketler: StokHareket nesneleri veya varyant_id/hareket_tipi/miktar/olusturma_tarihi
+        anahtarlı sözlükler. Hareketler önce bellekte (varyant, gün, tip) başına toplanır.
+        """
+        from django.utils import timezone
+
+        ozetler = {}
+        for hareket in hareketler:
+            if isinstance(hareket, dict):
+                varyant_id, tip, miktar, tarih = (
+                    hareket['varyant_id'], hareket['hareket_tipi'], hareket['miktar'], hareket['olusturma_tarihi'])
+            else:
+                varyant_id, tip, miktar, tarih = hareket.varyant_id, hareket.hareket_tipi, hareket.miktar, hareket.olusturma_tarihi
+            gun = timezone.localdate(tarih) if timezone.is_aware(tarih) else tarih.date()
+            ozet = ozetler.setdefault((varyant_id, gun, tip), [0, 0])
+            ozet[0] += 1
+            ozet[1] += miktar
+        if ozetler:
+            cls.ekle({anahtar: (isaret * adet, isaret * miktar) for anahtar, (adet, miktar) in ozetler.items()})
+
+    @classmethod
+    def ekle(cls, ozetler):
+        """
+        {(varyant_id, tarih, hareket_tipi): (adet, miktar)} değerlerini özetlere ekle; satır yoksa oluştur.
+
+        PostgreSQL/SQLite'ta parti başına tek INSERT ... ON CONFLICT DO UPDATE,
+        diğer veritabanlarında anahtar başına F() UPDATE kullanılır.
+        """
+        from django.db import IntegrityError, connection, transaction
+        from django.db.models import F
+
+        if connection.vendor in ('postgresql', 'sqlite'):
+            qn = connection.ops.quote_name
+            tablo = qn(cls._meta.db_table)
+            sutunlar = ', '.join(qn(ad) for ad in ('varyant_id', 'tarih', 'hareket_tipi', 'hareket_sayisi', 'toplam_miktar'))
+            satirlar = list(ozetler.items())
+            with connection.cursor() as cursor:
+                for bas in range(0, len(satirlar), 500):
+                    parca = satirlar[bas:bas + 500]
+                    cursor.execute(
+                        f"INSERT INTO {tablo} ({sutunlar}) VALUES "
+                        + ", ".join(["(%s, %s, %s, %s, %s)"] * len(parca))
+                        + f" ON CONFLICT ({qn('varyant_id')}, {qn('tarih')}, {qn('hareket_tipi')}) DO UPDATE SET "
+                        f"{qn('hareket_sayisi')} = {tablo}.{qn('hareket_sayisi')} + excluded.{qn('hareket_sayisi')}, "
+                        f"{qn('toplam_miktar')} = {tablo}.{qn('toplam_miktar')} + excluded.{qn('toplam_miktar')}",
+                        [deger for (varyant_id, tarih, tip), (adet, miktar) in parca
+                         for deger in (varyant_id, tarih, tip, adet, miktar)],
+                    )
+            return
+
+        for (varyant_id, tarih, tip), (adet, miktar) in ozetler.items():
+            anahtar = {'varyant_id': varyant_id, 'tarih': tarih, 'hareket_tipi': tip}
+            degisim = {'hareket_sayisi': F('hareket_sayisi') + adet, 'toplam_miktar': F('toplam_miktar') + miktar}
+            if cls.objects.filter(**anahtar).update(**degisim):
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(hareket_sayisi=adet, toplam_miktar=miktar, **anahtar)
+            except IntegrityError:
+                # Aynı anda başka bir işlem satırı oluşturdu
+                cls.objects.filter(**anahtar).update(**degisim)
+
+    @classmethod
+    def hareketlerden_hesapla(cls, varyant_idleri=None):
+        """Ham StokHareket ve StokHareketArsiv kayıtlarından özetleri hesapla (veritabanına yazmaz)"""
+        from django.db.models import Count, Sum
+        from django.db.models.functions import TruncDate
+
+        ozetler = {}
+        for model in (StokHareket, StokHareketArsiv):
+            queryset = model.objects.all()
+            if varyant_idleri is not None:
+                queryset = queryset.filter(varyant_id__in=varyant_idleri)
+            satirlar = (
+                queryset.annotate(gun=TruncDate('olusturma_tarihi'))
+                .values('varyant_id', 'gun', 'hareket_tipi')
+                .annotate(adet=Count('id'), miktar=Sum('miktar'))
+                .order_by()
+            )
+            for satir in satirlar.iterator(chunk_size=2000):
+                ozet = ozetler.setdefault((satir['varyant_id'], satir['gun'], satir['hareket_tipi']), [0, 0])
+                ozet[0] += satir['adet']
+                ozet[1] += satir['miktar'] or 0
+        return ozetler
+
+    @classmethod
+    def tip_toplamlari(cls, baslangic, bitis=None):
+        """{hareket_tipi: hareket_sayisi} - tarih aralığı için tek sorgu"""
+        from django.db.models import Sum
+
+        queryset = cls.objects.filter(tarih__gte=baslangic)
+        if bitis is not None:
+            queryset = queryset.filter(tarih__lte=bitis)
+        return dict(
+            queryset.values('hareket_tipi').annotate(toplam=Sum('hareket_sayisi'))
+            .order_by().values_list('hareket_tipi', 'toplam')
+        )
+
+
+class StokHareketArsiv(models.Model):
+    """Eski stok hareketleri (StokHareket.arsivle ile taşınır; id'ler korunur)"""
+    id = models.BigIntegerField(primary_key=True)
+    varyant = models.ForeignKey(UrunVaryanti, on_delete=models.CASCADE, related_name='arsiv_hareketleri', verbose_name="Ürün Varyantı")
+    hareket_tipi = models.CharField(max_length=20, choices=StokHareket.HAREKET_TIPLERI, verbose_name="Hareket Tipi")
+    miktar = models.IntegerField(verbose_name="Miktar")
+    onceki_stok = models.IntegerField(verbose_name="Önceki Stok")
+    yeni_stok = models.IntegerField(verbose_name="Yeni Stok")
+    aciklama = models.TextField(blank=True, null=True, verbose_name="Açıklama")
+    referans_id = models.CharField(max_length=100, blank=True, null=True, verbose_name="Referans ID")
+    kullanici = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='+', verbose_name="Kullanıcı")
+    olusturma_tarihi = models.DateTimeField(verbose_name="Oluşturma Tarihi")
+
+    class Meta:
+        verbose_name = "Arşivlenmiş Stok Hareketi"
+        verbose_name_plural = "Arşivlenmiş Stok Hareketleri"
+        ordering = ['-olusturma_tarihi']
+        indexes = [
+            models.Index(fields=['varyant', '-olusturma_tarihi']),
+        ]
+
+    def __str__(self):
+        return f"{self.varyant} - {self.get_hareket_tipi_display()} ({self.miktar})"
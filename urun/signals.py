@@ -0,0 +1,72 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal, receiver
+
+from . import arama, barkod_index
+from .models import Urun, UrunVaryanti, Renk, Beden, UrunKategoriUst, Marka
+
+# UrunVaryanti.stok_guncelle / stok_ayarla stoğu model kaydetmeden değiştirdiğinde
+# gönderilir (post_save tetiklenmez). Argüman: varyant_idleri
+stok_degisti = Signal()
+
+
+@receiver(post_save, sender=UrunVaryanti)
+@receiver(post_delete, sender=UrunVaryanti)
+def varyant_barkod_index_guncelle(sender, instance, **kwargs):
+    """Varyant değişince barkod indeksindeki kaydını sil"""
+    barkod_index.gecersiz_kil([instance.barkod])
+
+
+@receiver(post_save, sender=Urun)
+def urun_barkod_index_guncelle(sender, instance, created, **kwargs):
+    """Ürün adı/fiyatı/durumu değişince tüm varyantlarının kaydını sil"""
+    if created:
+        return
+    barkod_index.gecersiz_kil(instance.varyantlar.values_list('barkod', flat=True))
+
+
+@receiver(post_save, sender=Renk)
+@receiver(post_save, sender=Beden)
+@receiver(post_save, sender=UrunKategoriUst)
+def tanim_barkod_index_guncelle(sender, instance, created, **kwargs):
+    """Renk/beden/kategori adı değişince tüm indeksi geçersiz kıl"""
+    if not created:
+        barkod_index.tumunu_gecersiz_kil()
+
+
+@receiver(post_save, sender=Urun)
+def urun_arama_metni_guncelle(sender, instance, created, **kwargs):
+    """Ürün adı/kodu/kategorisi/markası değişince varyantlarının arama metnini yenile"""
+    if not created:
+        arama.belgeleri_guncelle(instance.varyantlar.all())
+
+
+@receiver(post_save, sender=Renk)
+@receiver(post_save, sender=Beden)
+def varyasyon_arama_metni_guncelle(sender, instance, created, **kwargs):
+    """Renk/beden adı değişince o renk/bedendeki varyantların arama metnini yenile"""
+    if not created:
+        alan = 'renk' if sender is Renk else 'beden'
+        arama.belgeleri_guncelle(UrunVaryanti.objects.filter(**{alan: instance}))
+
+
+@receiver(post_save, sender=UrunKategoriUst)
+@receiver(post_save, sender=Marka)
+def tanim_arama_metni_guncelle(sender, instance, created, **kwargs):
+    """Kategori/marka adı değişince ilgili ürünlerin varyantlarının arama metnini yenile"""
+    if not created:
+        alan = 'urun__kategori' if sender is UrunKategoriUst else 'urun__marka'
+        arama.belgeleri_guncelle(UrunVaryanti.objects.filter(**{alan: instance}))
+
+
+@receiver(post_save, sender=UrunVaryanti)
+@receiver(post_delete, sender=UrunVaryanti)
+def varyant_stok_ozeti_guncelle(sender, instance, **kwargs):
+    """Varyant eklenince, silinince veya kaydedilince ürünün stok özetini yenile"""
+    Urun.stok_ozetini_guncelle([instance.urun_id])
+
+
+@receiver(post_save, sender=Urun)
+def urun_stok_ozeti_guncelle(sender, instance, created, **kwargs):
+    """Ürün kaydı eski bir özetle yazılmış veya varyasyon tipi değişmiş olabilir"""
+    if not created:
+        Urun.stok_ozetini_guncelle([instance.pk])
@@ -0,0 +1,225 @@
+"""
+Toplu stok girişi ve sayım aktarımı.
+
+Barkod + miktar listesi bir CSV/XLSX dosyasından ya da el terminalinin
+okuttuğu barkod akışından (her satır bir okutma; "barkod;miktar" da olur)
+okunur. Aynı barkodun satırları toplanır, tüm barkodlar tek sorguda
+çözülür ve hareketler tek transaction içinde bulk_update/bulk_create ile
+yazılır; sorgu sayısı satır sayısından bağımsızdır (PARTI'lık gruplarla).
+
+Modlar:
+- giris: miktarlar mevcut stoğa eklenir (Stok Girişi hareketi)
+- sayim: miktarlar sayılan stoktur; farka göre Sayım Fazlası / Sayım Eksiği
+"""
+import csv
+import io
+import os
+
+from django.db import transaction
+from django.utils import timezone
+
+MODLAR = ('giris', 'sayim')
+ORNEK_SAYISI = 50
+PARTI = 1000
+BARKOD_BASLIKLARI = ('barkod', 'barcode')
+MIKTAR_BASLIKLARI = ('miktar', 'adet', 'quantity', 'qty')
+
+
+def _miktar(deger):
+    deger = str(deger if deger is not None else '').strip().replace(',', '.')
+    if not deger:
+        return 1  # El terminali: miktarsız satır bir okutmadır
+    miktar = float(deger)
+    if miktar != int(miktar) or miktar < 0:
+        raise ValueError(f"Geçersiz miktar: {deger}")
+    return int(miktar)
+
+
+def _satirlardan(satirlar):
+    """
+    [(hucre, ...), ...] -> {barkod: miktar}
+
+    İlk satır başlıksa (barkod/miktar) sütunlar ondan bulunur, değilse
+    ilk sütun barkod, ikinci sütun miktar kabul edilir.
+    """
+    sayimlar = {}
+    barkod_sutunu, miktar_sutunu = 0, 1
+    for sira, satir in enumerate(satirlar, start=1):
+        hucreler = [str(hucre).strip() if hucre is not None else '' for hucre in satir]
+        if not any(hucreler):
+            continue
+        if sira == 1:
+            basliklar = [hucre.lower() for hucre in hucreler]
+            if any(baslik in BARKOD_BASLIKLARI for baslik in basliklar):
+                barkod_sutunu = next(i for i, b in enumerate(basliklar) if b in BARKOD_BASLIKLARI)
+                miktar_sutunu = next((i for i, b in enumerate(basliklar) if b in MIKTAR_BASLIKLARI), None)
+                continue
+
+        barkod = hucreler[barkod_sutunu] if barkod_sutunu < len(hucreler) else ''
+        if not barkod:
+            continue
+        if barkod.endswith('.0') and barkod[:-2].isdigit():
+            barkod = barkod[:-2]  # Excel sayısal hücre
+        ham_miktar = hucreler[miktar_sutunu] if miktar_sutunu is not None and miktar_sutunu < len(hucreler) else ''
+        try:
+            miktar = _miktar(ham_miktar)
+        except ValueError as e:
+            raise ValueError(f"{sira}. satır: {e}")
+        sayimlar[barkod] = sayimlar.get(barkod, 0) + miktar
+    return sayimlar
+
+
+def metinden_oku(metin):
+    """El terminali akışı veya yapıştırılan liste: satır başına "barkod" ya da "barkod;miktar" """
+    satirlar = []
+    for satir in (metin or '').splitlines():
+        for ayirici in ('\t', ';', ','):
+            if ayirici in satir:
+                satirlar.append(satir.split(ayirici))
+                break
+        else:
+            satirlar.append([satir])
+    return _satirlardan(satirlar)
+
+
+def dosyadan_oku(dosya):
+    """Yüklenen CSV veya XLSX dosyasından {barkod: miktar}"""
+    uzanti = os.path.splitext(dosya.name or '')[1].lower()
+    if uzanti in ('.xlsx', '.xlsm'):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(dosya, read_only=True, data_only=True)
+        try:
+            return _satirlardan(workbook.active.iter_rows(values_only=True))
+        finally:
+            workbook.close()
+    if uzanti in ('.csv', '.txt', ''):
+        metin = dosya.read().decode('utf-8-sig', errors='replace')
+        try:
+            lehce = csv.Sniffer().sniff(metin[:4096], delimiters=';,\t')
+        except csv.Error:
+            return metinden_oku(metin)
+        return _satirlardan(csv.reader(io.StringIO(metin), lehce))
+    raise ValueError("Desteklenmeyen dosya türü. CSV veya XLSX yükleyin.")
+
+
+def metne_cevir(sayimlar):
+    """{barkod: miktar} -> önizleme formunda taşınan "barkod;miktar" satırları"""
+    return '\n'.join(f"{barkod};{miktar}" for barkod, miktar in sayimlar.items())
+
+
+def _hareket(mod, onceki, miktar):
+    """(hareket_tipi, hareket_miktari, yeni_stok); değişiklik yoksa hareket_tipi None"""
+    if mod == 'giris':
+        return ('giris' if miktar else None), miktar, onceki + miktar
+    if mod == 'sayim':
+        fark = miktar - onceki
+        if fark > 0:
+            return 'sayim_fazla', fark, miktar
+        if fark < 0:
+            return 'sayim_eksik', -fark, miktar
+        return None, 0, onceki
+    raise ValueError(f"Geçersiz aktarım modu: {mod}")
+
+
+def _varyantlar(barkodlar, kilitle=False):
+    """Barkodları tek sorguda çöz: {barkod: (id, urun_id, stok)}"""
+    from .models import UrunVaryanti
+
+    varyantlar = UrunVaryanti.objects.filter(barkod__in=barkodlar).order_by()
+    if kilitle:
+        varyantlar = varyantlar.select_for_update()
+    return {
+        barkod: (varyant_id, urun_id, stok)
+        for varyant_id, barkod, urun_id, stok in varyantlar.values_list('id', 'barkod', 'urun_id', 'stok_miktari')
+    }
+
+
+def onizle(sayimlar, mod, ornek_sayisi=ORNEK_SAYISI):
+    """Değişiklik yapmadan bulunamayan barkodları, değişecek varyantları ve toplam farkı döndür"""
+    from .models import UrunVaryanti
+
+    varyantlar = _varyantlar(list(sayimlar))
+    ozet = {
+        'satir_sayisi': len(sayimlar),
+        'bulunamayanlar': [barkod for barkod in sayimlar if barkod not in varyantlar],
+        'degisecek_sayisi': 0,
+        'artis': 0,
+        'azalis': 0,
+        'ornekler': [],
+    }
+    ornek_idleri = {}
+    for barkod, miktar in sayimlar.items():
+        if barkod not in varyantlar:
+            continue
+        varyant_id, urun_id, onceki = varyantlar[barkod]
+        hareket_tipi, hareket_miktari, yeni = _hareket(mod, onceki, miktar)
+        if hareket_tipi is None:
+            continue
+        ozet['degisecek_sayisi'] += 1
+        if yeni > onceki:
+            ozet['artis'] += yeni - onceki
+        else:
+            ozet['azalis'] += onceki - yeni
+        if len(ozet['ornekler']) < ornek_sayisi:
+            ornek = {'barkod': barkod, 'onceki': onceki, 'yeni': yeni, 'fark': yeni - onceki,
+                     'hareket_tipi': hareket_tipi}
+            ozet['ornekler'].append(ornek)
+            ornek_idleri[varyant_id] = ornek
+
+    for varyant_id, urun_ad, renk, beden in UrunVaryanti.objects.filter(pk__in=ornek_idleri).values_list(
+            'id', 'urun__ad', 'renk__ad', 'beden__ad'):
+        ornek_idleri[varyant_id]['urun'] = urun_ad
+        ornek_idleri[varyant_id]['varyant'] = " - ".join(ad for ad in (renk, beden) if ad) or "Standart"
+    return ozet
+
+
+def uygula(sayimlar, mod, kullanici, aciklama=''):
+    """
+    Hareketleri tek transaction içinde yaz, {'hareket_sayisi', 'bulunamayanlar'} döndür.
+
+    Sayım modunda fark uygulama anındaki stoğa göre hesaplanır (satırlar
+    kilitlenir); önizlemeden sonra yapılan satışlar sayımı bozmaz.
+    """
+    from . import barkod_index
+    from .models import StokHareket, Urun, UrunVaryanti
+    from .signals import stok_degisti
+
+    etiket = dict(StokHareket.HAREKET_TIPLERI)
+    simdi = timezone.now()
+
+    with transaction.atomic():
+        varyantlar = _varyantlar(list(sayimlar), kilitle=True)
+        guncellenen, hareketler, urun_idleri, barkodlar = [], [], set(), []
+        for barkod, miktar in sayimlar.items():
+            if barkod not in varyantlar:
+                continue
+            varyant_id, urun_id, onceki = varyantlar[barkod]
+            hareket_tipi, hareket_miktari, yeni = _hareket(mod, onceki, miktar)
+            if hareket_tipi is None:
+                continue
+            guncellenen.append(UrunVaryanti(pk=varyant_id, stok_miktari=yeni, guncelleme_tarihi=simdi))
+            hareketler.append(StokHareket(
+                varyant_id=varyant_id,
+                hareket_tipi=hareket_tipi,
+                miktar=hareket_miktari,
+                onceki_stok=onceki,
+                yeni_stok=yeni,
+                aciklama=f"Toplu {etiket[hareket_tipi]}: {aciklama}" if aciklama else f"Toplu {etiket[hareket_tipi]}",
+                kullanici=kullanici,
+            ))
+            urun_idleri.add(urun_id)
+            barkodlar.append(barkod)
+
+        UrunVaryanti.objects.bulk_update(guncellenen, ['stok_miktari', 'guncelleme_tarihi'], batch_size=PARTI)
+        StokHareket.toplu_olustur(hareketler, batch_size=PARTI)
+
+        if guncellenen:
+            Urun.stok_ozetini_guncelle(urun_idleri)
+            barkod_index.gecersiz_kil(barkodlar)
+            stok_degisti.send(sender=UrunVaryanti, varyant_idleri=[varyant.pk for varyant in guncellenen])
+
+    return {
+        'hareket_sayisi': len(hareketler),
+        'bulunamayanlar': [barkod for barkod in sayimlar if barkod not in varyantlar],
+    }
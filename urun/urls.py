@@ -21,6 +21,7 @@ urlpatterns = [
     
     # Barkod sorgulama
     path('barkod/', views.barkod_sorgula, name='barkod_sorgula'),
+    path('barkod/gorsel/<str:barkod>.png', views.barkod_gorseli, name='barkod_gorseli'),
     
     # Kategori yönetimi
     path('kategori/', views.kategori_yonetimi, name='kategori'),
@@ -41,6 +42,7 @@ urlpatterns = [
     path('stok/', views.stok_yonetimi_ana, name='stok_yonetimi'),
     path('stok/sayim-eksigi/', views.sayim_eksigi_view, name='sayim_eksigi'),
     path('stok/sayim-fazlasi/', views.sayim_fazlasi_view, name='sayim_fazlasi'),
+    path('stok/toplu/', views.stok_aktarim, name='stok_aktarim'),
     path('stok/hareketler/', views.stok_hareket_listesi, name='stok_hareket_listesi'),
     
     # Fiyat yönetimi
@@ -1,11 +1,11 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import FileResponse, Http404, JsonResponse
 from django.core.paginator import Paginator
 from django.db import transaction
-from django.db.models import Q, Sum, Avg
-from decimal import Decimal
+from django.db.models import Q, Sum, Avg, Count
+from decimal import Decimal, InvalidOperation
 from .models import Urun, UrunKategoriUst, Renk, Beden, Marka, UrunVaryanti, StokHareket
 from .forms import StokGirisForm, StokCikisForm, StokDuzeltmeForm, StokSayimForm
 
@@ -19,8 +19,6 @@ def urun_listesi(request):
 
     urunler_queryset = Urun.objects.select_related(
         'kategori', 'marka'
-    ).prefetch_related(
-        'varyantlar'
     ).all().order_by('-id')
 
     # Pagination - 50 ürün per sayfa
@@ -43,17 +41,8 @@ def urun_listesi(request):
             urun.silme_izni = False
             continue
 
-        # Stok kontrolü - batch olarak hesapla
-        if urun.varyasyonlu:
-            # Varyasyonlu ürünler için varyant stok toplamı
-            has_stock = any(varyant.stok_miktari >
-                            0 for varyant in urun.varyantlar.all())
-        else:
-            # Varyasyonlu olmayan ürünler için ilk varyant stok
-            first_varyant = urun.varyantlar.first()
-            has_stock = first_varyant and first_varyant.stok_miktari > 0
-
-        if has_stock:
+        # Stok kontrolü - ürünün stok özetinden
+        if urun.toplam_stok > 0:
             urun.silme_izni = False
             continue
 
@@ -73,28 +62,18 @@ def urun_listesi(request):
         toplam_urun, aktif_urun, kritik_stok, tukenen_stok = cached_stats
     else:
         # İstatistikleri hesapla ve cache'le
-        # Tek sorguda temel istatistikler
+        # Tek sorguda temel ve stok istatistikleri (stok özeti alanlarından)
         stats = Urun.objects.aggregate(
             toplam=Count('id'),
-            aktif=Count('id', filter=Q(aktif=True))
+            aktif=Count('id', filter=Q(aktif=True)),
+            tukenen=Count('id', filter=Q(toplam_stok=0)),
+            kritik=Count('id', filter=Q(toplam_stok__gt=0, toplam_stok__lte=10)),  # varsayılan kritik seviye
         )
 
         toplam_urun = stats['toplam']
         aktif_urun = stats['aktif']
-
-        # Stok istatistikleri için sadece gerekli alanları al
-        stok_urunler = Urun.objects.prefetch_related('varyantlar').only(
-            'id', 'aktif', 'varyasyonlu', 'kritik_stok_seviyesi'
-        ).all()
-
-        kritik_stok = 0
-        tukenen_stok = 0
-
-        for urun in stok_urunler:
-            if urun.toplam_stok == 0:
-                tukenen_stok += 1
-            elif 0 < urun.toplam_stok <= 10:  # varsayılan kritik seviye
-                kritik_stok += 1
+        kritik_stok = stats['kritik']
+        tukenen_stok = stats['tukenen']
 
         # Cache'e kaydet (5 dakika)
         cache.set(cache_key, (toplam_urun, aktif_urun,
@@ -217,6 +196,23 @@ def urun_ekle(request):
     return render(request, 'urun/ekle.html', context)
 
 
+@login_required
+def barkod_gorseli(request, barkod):
+    """Kayıtlı bir varyantın barkod görselini (PNG) diskteki önbellekten sun"""
+    from . import barkod_gorsel
+
+    # Yalnızca mevcut varyant barkodları çizilir; rastgele metinler önbelleği doldurmasın
+    if not UrunVaryanti.objects.filter(barkod=barkod).exists():
+        raise Http404
+    yol = barkod_gorsel.getir(barkod)
+    if yol is None:
+        raise Http404
+    response = FileResponse(open(yol, 'rb'), content_type='image/png')
+    # Aynı barkod her zaman aynı görseli üretir
+    response['Cache-Control'] = 'private, max-age=31536000, immutable'
+    return response
+
+
 def barkod_sorgula(request):
     """Barkod sorgulama"""
     barkod = request.GET.get('barkod', '').strip()
@@ -224,41 +220,23 @@ def barkod_sorgula(request):
     varyant = None
 
     if barkod:
-        try:
-            # Önce direkt barkod ile varyant ara
+        # Barkod önce çözümlenir (ürün kodu + renk/beden kodu), eski veya
+        # çözülemeyen barkodlar doğrudan barkod alanında aranır
+        from .barkod_index import coz
+        kayit, etiket_fiyati = coz(barkod)
+        if kayit is not None:
             varyant = UrunVaryanti.objects.select_related(
-                'urun').get(barkod=barkod, aktif=True)
+                'urun__kategori', 'urun__marka', 'renk', 'beden').filter(pk=kayit['varyant_id'], aktif=True).first()
+        if varyant:
             urun = varyant.urun
-        except UrunVaryanti.DoesNotExist:
-            # Direkt bulunamazsa barkod çözümleyerek ara
+            if etiket_fiyati is not None:
+                messages.warning(
+                    request, f'Etiket fiyatı güncel değil! (Etiket: {etiket_fiyati} ₺, Güncel: {urun.satis_fiyati} ₺)')
+        else:
             sonuc = UrunVaryanti.barkod_cozumle(barkod)
-
             if sonuc:
-                try:
-                    # Çözümlenen bilgiler ile ürün ve varyant bul
-                    from .models import Urun, UrunRenk, UrunBeden
-
-                    # Ürün numarası ile ürün bul
-                    urun_obj = Urun.objects.get(
-                        urun_numarasi=sonuc['urun_numarasi'], aktif=True)
-
-                    # Renk ve beden bilgileri varsa varyant bul
-                    filters = {'urun': urun_obj, 'aktif': True}
-
-                    if sonuc.get('renk_kodu'):
-                        renk = UrunRenk.objects.get(kod=sonuc['renk_kodu'])
-                        filters['renk'] = renk
-
-                    if sonuc.get('beden_kodu'):
-                        beden = UrunBeden.objects.get(kod=sonuc['beden_kodu'])
-                        filters['beden'] = beden
-
-                    varyant = UrunVaryanti.objects.get(**filters)
-                    urun = urun_obj
-
-                except (Urun.DoesNotExist, UrunVaryanti.DoesNotExist, UrunRenk.DoesNotExist, UrunBeden.DoesNotExist):
-                    messages.error(
-                        request, f'Barkod çözümlendi ancak ürün bulunamadı! (Ürün No: {sonuc.get("urun_numarasi", "?")})')
+                messages.error(
+                    request, f'Barkod çözümlendi ancak ürün bulunamadı! (Ürün No: {sonuc.get("urun_numarasi", "?")})')
             else:
                 messages.error(request, 'Geçersiz barkod formatı!')
 
@@ -802,7 +780,7 @@ def varyasyon_yonet(request, urun_id):
 @login_required
 def varyasyon_olustur(request, urun_id):
     """Seçilen renk ve bedenlerle otomatik varyasyon oluşturma"""
-    urun = get_object_or_404(Urun, id=urun_id)
+    urun = get_object_or_404(Urun.objects.select_related('kategori', 'marka'), id=urun_id)
 
     if not urun.varyasyonlu:
         return JsonResponse({'success': False, 'error': 'Bu ürün varyasyonlu değil!'})
@@ -816,46 +794,13 @@ def varyasyon_olustur(request, urun_id):
             if not renk_ids and not beden_ids:
                 return JsonResponse({'success': False, 'error': 'En az bir renk veya beden seçmelisiniz!'})
 
-            # Eğer hiç renk seçilmemişse None olarak işle
-            if not renk_ids:
-                renk_ids = [None]
-            # Eğer hiç beden seçilmemişse None olarak işle
-            if not beden_ids:
-                beden_ids = [None]
-
-            created_count = 0
-            skipped_count = 0
-
-            with transaction.atomic():
-                # Tüm kombinasyonları oluştur
-                for renk_id in renk_ids:
-                    for beden_id in beden_ids:
-                        # Renk ve beden objelerini al
-                        renk = Renk.objects.get(
-                            id=renk_id) if renk_id else None
-                        beden = Beden.objects.get(
-                            id=beden_id) if beden_id else None
-
-                        # Bu kombinasyon zaten var mı kontrol et
-                        varyant_exists = UrunVaryanti.objects.filter(
-                            urun=urun,
-                            renk=renk,
-                            beden=beden
-                        ).exists()
-
-                        if not varyant_exists:
-                            # Yeni varyant oluştur
-                            UrunVaryanti.objects.create(
-                                urun=urun,
-                                renk=renk,
-                                beden=beden,
-                                stok_miktari=1,  # Başlangıç stoku 1
-                                stok_kaydedildi=False,  # Henüz kaydedilmemiş
-                                aktif=True
-                            )
-                            created_count += 1
-                        else:
-                            skipped_count += 1
+            # Hiç renk/beden seçilmemişse None (renksiz/bedensiz) olarak işle
+            created_count, skipped_count = UrunVaryanti.toplu_olustur(
+                urun,
+                renk_ids or [None],
+                beden_ids or [None],
+                baslangic_stok=1,  # Başlangıç stoku 1
+            )
 
             return JsonResponse({
                 'success': True,
@@ -973,7 +918,7 @@ def varyant_toplu_stok_guncelle(request, urun_id):
                                 # İlk stok girişi ise stok hareketi oluştur
                                 if yeni_stok_miktari > 0:
                                     # İlk stok girişi için varyantın stok miktarını sıfırla
-                                    varyant.stok_miktari = 0
+                                    UrunVaryanti.stok_ayarla(varyant.pk, 0)
 
                                     StokHareket.stok_hareketi_olustur(
                                         varyant=varyant,
@@ -1043,12 +988,13 @@ def stok_yonetimi_ana(request):
     bu_ay_baslangic = datetime.now().replace(
         day=1, hour=0, minute=0, second=0, microsecond=0)
 
-    hareket_istatistikleri = {}
-    for hareket_tipi, hareket_adi in StokHareket.HAREKET_TIPLERI:
-        hareket_istatistikleri[hareket_tipi] = StokHareket.objects.filter(
-            hareket_tipi=hareket_tipi,
-            olusturma_tarihi__gte=bu_ay_baslangic
-        ).count()
+    # Günlük özet tablosundan tek sorgu
+    from .models import StokHareketGunlukOzet
+    tip_toplamlari = StokHareketGunlukOzet.tip_toplamlari(bu_ay_baslangic.date())
+    hareket_istatistikleri = {
+        hareket_tipi: tip_toplamlari.get(hareket_tipi, 0)
+        for hareket_tipi, hareket_adi in StokHareket.HAREKET_TIPLERI
+    }
 
     context = {
         'toplam_urun': toplam_urun,
@@ -1330,6 +1276,54 @@ def sayim_fazlasi_view(request):
     return render(request, 'urun/sayim_islem.html', context)
 
 
+@login_required
+def stok_aktarim(request):
+    """Toplu stok girişi / sayım - CSV, XLSX veya el terminali listesi (urun/stok_aktarim.py), önizlemeli"""
+    from . import stok_aktarim as aktarim
+
+    secimler = {'mod': 'giris', 'aciklama': '', 'satirlar': ''}
+    onizleme = None
+    if request.method == 'POST':
+        secimler = {
+            'mod': request.POST.get('mod', 'giris'),
+            'aciklama': request.POST.get('aciklama', '').strip(),
+            'satirlar': request.POST.get('satirlar', ''),
+        }
+        try:
+            if secimler['mod'] not in aktarim.MODLAR:
+                raise ValueError('Aktarım türü seçilmedi.')
+
+            if request.FILES.get('dosya'):
+                sayimlar = aktarim.dosyadan_oku(request.FILES['dosya'])
+            else:
+                sayimlar = aktarim.metinden_oku(secimler['satirlar'])
+            if not sayimlar:
+                raise ValueError('Dosyada veya listede barkod bulunamadı.')
+            # Onay formu aynı listeyi tekrar gönderir
+            secimler['satirlar'] = aktarim.metne_cevir(sayimlar)
+
+            if request.POST.get('onizleme'):
+                onizleme = aktarim.onizle(sayimlar, secimler['mod'])
+            else:
+                sonuc = aktarim.uygula(sayimlar, secimler['mod'], request.user, secimler['aciklama'])
+                messages.success(request, f'✅ {sonuc["hareket_sayisi"]} varyantın stoğu güncellendi!')
+                if sonuc['bulunamayanlar']:
+                    messages.warning(
+                        request, f'⚠️ {len(sonuc["bulunamayanlar"])} barkod bulunamadı: '
+                                 f'{", ".join(sonuc["bulunamayanlar"][:20])}')
+                return redirect('urun:stok_aktarim')
+
+        except Exception as e:
+            messages.error(request, f'❌ Stok aktarımı sırasında hata: {str(e)}')
+
+    context = {
+        'secimler': secimler,
+        'onizleme': onizleme,
+        'title': 'Toplu Stok Girişi / Sayım'
+    }
+    return render(request, 'urun/stok_aktarim.html', context)
+
+
 @login_required
 def stok_hareket_listesi(request):
     """Stok hareketleri listesi"""
@@ -1370,86 +1364,53 @@ def stok_hareket_listesi(request):
 
 @login_required
 def fiyat_guncelleme(request):
-    """Toplu fiyat güncelleme"""
+    """Toplu fiyat güncelleme - tek UPDATE ile (urun/fiyatlandirma.py), isteğe bağlı önizleme"""
+    from . import fiyatlandirma
+
+    secimler = {}
+    onizleme = None
     if request.method == 'POST':
+        secimler = {
+            'guncelleme_tipi': request.POST.get('guncelleme_tipi', ''),
+            'kategori': request.POST.get('kategori', ''),
+            'marka': request.POST.get('marka', ''),
+            'oran': request.POST.get('oran', ''),
+            'miktar': request.POST.get('miktar', ''),
+            'kar_orani': request.POST.get('kar_orani', ''),
+        }
         try:
-            guncelleme_tipi = request.POST.get('guncelleme_tipi')
-            kategori_id = request.POST.get('kategori')
-            marka_id = request.POST.get('marka')
+            guncelleme_tipi = secimler['guncelleme_tipi']
+            varsayilanlar = {'oran': '0', 'sabit': '0', 'kar_orani': '50'}
+            alan = {'oran': 'oran', 'sabit': 'miktar', 'kar_orani': 'kar_orani'}.get(guncelleme_tipi)
+            if alan is None:
+                raise ValueError('Güncelleme tipi seçilmedi.')
+            try:
+                deger = Decimal(str(secimler[alan] or varsayilanlar[guncelleme_tipi]))
+            except InvalidOperation:
+                raise ValueError('Geçersiz değer.')
 
             # Base queryset
             urunler = Urun.objects.filter(aktif=True)
 
             # Filtreler
-            if kategori_id:
-                urunler = urunler.filter(kategori_id=kategori_id)
-
-            if marka_id:
-                urunler = urunler.filter(marka_id=marka_id)
+            if secimler['kategori']:
+                urunler = urunler.filter(kategori_id=secimler['kategori'])
 
-            updated_count = 0
-            barkod_guncellendi = 0
+            if secimler['marka']:
+                urunler = urunler.filter(marka_id=secimler['marka'])
 
-            with transaction.atomic():
-                if guncelleme_tipi == 'oran':
-                    # Yüzde ile güncelleme
-                    oran = Decimal(str(request.POST.get('oran', 0)))
-                    if oran != 0:
-                        for urun in urunler:
-                            eski_fiyat = urun.satis_fiyati
-                            if oran > 0:  # Artış
-                                urun.satis_fiyati = urun.satis_fiyati * \
-                                    (Decimal('1') + oran / Decimal('100'))
-                            else:  # Azalış
-                                urun.satis_fiyati = urun.satis_fiyati * \
-                                    (Decimal('1') + oran / Decimal('100'))
-                            urun.save()
-                            updated_count += 1
-
-                            # Barkod güncelle
-                            # Barkod güncelle
-                            for varyant in urun.varyantlari.all():
-                                varyant.olustur_barkod()
-                                barkod_guncellendi += 1
-
-                elif guncelleme_tipi == 'sabit':
-                    # Sabit miktar ile güncelleme
-                    miktar = Decimal(str(request.POST.get('miktar', 0)))
-                    if miktar != 0:
-                        for urun in urunler:
-                            yeni_fiyat = urun.satis_fiyati + miktar
-                            urun.satis_fiyati = max(Decimal('0'), yeni_fiyat)
-                            urun.save()
-                            updated_count += 1
-
-                            # Barkod güncelle
-                            for varyant in urun.varyantlari.all():
-                                varyant.olustur_barkod()
-                                barkod_guncellendi += 1
-
-                elif guncelleme_tipi == 'kar_orani':
-                    # Kar oranına göre güncelleme
-                    yeni_kar_orani = Decimal(
-                        str(request.POST.get('kar_orani', 50)))
-                    for urun in urunler:
-                        if urun.alis_fiyati > 0:
-                            urun.kar_orani = yeni_kar_orani
-                            urun.satis_fiyati = urun.alis_fiyati * \
-                                (Decimal('1') + yeni_kar_orani / Decimal('100'))
-                            urun.save()
-                            updated_count += 1
-
-                            # Barkod güncelle
-                            for varyant in urun.varyantlari.all():
-                                varyant.olustur_barkod()
-                                barkod_guncellendi += 1
-
-            if barkod_guncellendi > 0:
-                messages.success(
-                    request, f'✅ {updated_count} ürünün fiyatı güncellendi ve {barkod_guncellendi} varyant barkodu yenilendi!')
+            if request.POST.get('onizleme'):
+                onizleme = fiyatlandirma.onizle(urunler, guncelleme_tipi, deger)
+            elif guncelleme_tipi != 'kar_orani' and deger == 0:
+                messages.info(request, 'Değişiklik yapılmadı: değer 0.')
             else:
-                messages.success(
-                    request, f'✅ {updated_count} ürünün fiyatı başarıyla güncellendi!')
+                sonuc = fiyatlandirma.uygula(urunler, guncelleme_tipi, deger)
+                if sonuc['barkod_sayisi'] > 0:
+                    messages.success(
+                        request, f'✅ {sonuc["urun_sayisi"]} ürünün fiyatı güncellendi ve {sonuc["barkod_sayisi"]} varyant barkodu yenilendi!')
+                else:
+                    messages.success(
+                        request, f'✅ {sonuc["urun_sayisi"]} ürünün fiyatı başarıyla güncellendi!')
 
         except Exception as e:
             messages.error(
@@ -1460,16 +1421,19 @@ def fiyat_guncelleme(request):
     markalar = Marka.objects.filter(aktif=True).order_by('ad')
 
     # İstatistikler
-    toplam_urun = Urun.objects.filter(aktif=True).count()
-    ortalama_fiyat = Urun.objects.filter(aktif=True).aggregate(
-        ortalama=Avg('satis_fiyati')
-    )['ortalama'] or 0
+    istatistik = Urun.objects.filter(aktif=True).aggregate(
+        toplam=Count('id'), ortalama=Avg('satis_fiyati')
+    )
+    toplam_urun = istatistik['toplam']
+    ortalama_fiyat = istatistik['ortalama'] or 0
 
     context = {
         'kategoriler': kategoriler,
         'markalar': markalar,
         'toplam_urun': toplam_urun,
         'ortalama_fiyat': ortalama_fiyat,
+        'secimler': secimler,
+        'onizleme': onizleme,
         'title': 'Toplu Fiyat Güncelleme'
     }
 